@@ -7,13 +7,60 @@
 # - Sales data
 # - User authentication
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify, stream_with_context
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 from datetime import datetime
+from calendar import month_name as month_names, monthrange
+from contextlib import ExitStack, contextmanager, nullcontext
+import bisect
+import copy
+import csv
+import functools
+import hashlib
+import heapq
+import io
+import itertools
 import json
 import os
+import tempfile
+import time
+
+from dataset_lock import DatasetLock
+from group_commit import GroupCommit
+from id_generator import IdGenerator
+from menu_catalog import MenuCatalog, empty_menu
+from metrics import Metrics
+from order_index import OrderIndex
+from order_journal import OrderJournal
+from records import OrderRecord, TicketRecord, as_dict
+from request_profiler import SlowRequestProfiler
+from response_cache import ResponseCache
+from sales_analytics import GROUPINGS, WEEKDAY_NAMES, SalesAnalytics
+from sales_rollup import LEVELS, add_sale, breakdown, build_rollups, parse_day, range_totals
+import serializer
+from sqlite_store import SQLiteStore
+from ticket_feed import FileChangeLog, SQLiteChangeLog, TicketFeed
+from ticket_store import ActiveTickets, TicketArchive
+
+class CompactJSONProvider(JSONProvider):
+    """Send API responses through the same compact (orjson when available) serializer"""
+
+    def dumps(self, obj, **kwargs):
+        return serializer.dumps_text(obj)
+
+    def loads(self, s, **kwargs):
+        return serializer.loads(s)
+
+    def response(self, *args, **kwargs):
+        # As documented for jsonify: one value, several (a list) or keywords (a dict)
+        if args and kwargs:
+            raise TypeError('jsonify() takes either args or kwargs, not both')
+        obj = args[0] if len(args) == 1 else (args or kwargs or None)
+        return self._app.response_class(serializer.dumps(obj), mimetype='application/json')
 
 app = Flask(__name__)
+app.json = CompactJSONProvider(app)
 CORS(app)  # Enable CORS for frontend communication
 
 # ============================================
@@ -21,11 +68,52 @@ CORS(app)  # Enable CORS for frontend communication
 # ============================================
 # In production, use a real database like PostgreSQL
 
-DATA_DIR = os.path.join(os.path.dirname(__file__), 'database')
+DATA_DIR = os.environ.get('COQUI_DATA_DIR') or os.path.join(os.path.dirname(__file__), 'database')
 ORDERS_FILE = os.path.join(DATA_DIR, 'orders.json')
 SALES_FILE = os.path.join(DATA_DIR, 'sales.json')
 TICKETS_FILE = os.path.join(DATA_DIR, 'tickets.json')
 VOIDS_FILE = os.path.join(DATA_DIR, 'voids.json')
+MENU_FILE = os.path.join(DATA_DIR, 'menu.json')
+TICKET_CHANGES_FILE = os.path.join(DATA_DIR, 'ticket_changes.ndjson')
+ORDERS_JOURNAL_DIR = os.path.join(DATA_DIR, 'orders_journal')
+TICKETS_ARCHIVE_DIR = os.path.join(DATA_DIR, 'tickets_archive')
+DATABASE_FILE = os.path.join(DATA_DIR, 'Coqui.db')
+PROFILES_DIR = os.path.join(DATA_DIR, 'profiles')
+
+# Storage mode (set COQUI_STORAGE):
+# - 'json': rewrite the JSON files on every change (default)
+# - 'journal': like 'json', but new orders are appended to an
+#   fsync'd log and folded into orders.json every
+#   JOURNAL_COMPACT_THRESHOLD orders
+# - 'sqlite': keep every dataset in Coqui.db
+#   (run `flask --app app import-json` once to bring over the JSON data)
+STORAGE_MODE = os.environ.get('COQUI_STORAGE', 'json')
+JOURNAL_COMPACT_THRESHOLD = int(os.environ.get('COQUI_JOURNAL_COMPACT_THRESHOLD', 5000))
+# How long a group commit waits for more concurrent writes to batch (ms)
+GROUP_COMMIT_WINDOW_MS = float(os.environ.get('COQUI_GROUP_COMMIT_WINDOW_MS', 2))
+# Cached GET responses kept per worker (0 turns the cache off)
+RESPONSE_CACHE_SIZE = int(os.environ.get('COQUI_RESPONSE_CACHE_SIZE', 256))
+# Request/storage instrumentation for /api/metrics (COQUI_METRICS=1 turns it on)
+METRICS_ENABLED = os.environ.get('COQUI_METRICS', '0') == '1'
+# Requests slower than this (ms) get their profile saved (0 = profiling off)
+PROFILE_SLOW_MS = float(os.environ.get('COQUI_PROFILE_SLOW_MS', 0))
+# Slow request profiles kept on disk (oldest are dropped)
+PROFILE_KEEP = int(os.environ.get('COQUI_PROFILE_KEEP', 100))
+# Keep the order index and open tickets in memory as compact records
+# (COQUI_COMPACT_RECORDS=1, see records.py). Orders stay dicts in 'json'
+# mode, where every order write re-encodes the whole history from the index.
+COMPACT_RECORDS = os.environ.get('COQUI_COMPACT_RECORDS', '0') == '1'
+
+# Disabled metrics leave every function as it is (see metrics.py)
+metrics = Metrics(METRICS_ENABLED)
+metrics.watch_serializer(serializer)
+
+# Order, ticket and void IDs: unique across workers, sorted by creation time
+ids = IdGenerator()
+
+def empty_sales():
+    """Fresh sales statistics document"""
+    return {'total_sales': 0, 'total_orders': 0, 'sales_by_date': {}}
 
 # Ensure data directory exists
 if not os.path.exists(DATA_DIR):
@@ -33,101 +121,769 @@ if not os.path.exists(DATA_DIR):
 
 # Initialize files if they don't exist
 if not os.path.exists(ORDERS_FILE):
-    with open(ORDERS_FILE, 'w') as f:
-        json.dump([], f)
+    with open(ORDERS_FILE, 'wb') as f:
+        f.write(serializer.dumps([]))
 
 if not os.path.exists(SALES_FILE):
-    with open(SALES_FILE, 'w') as f:
-        json.dump({'total_sales': 0, 'total_orders': 0, 'sales_by_date': {}}, f)
+    with open(SALES_FILE, 'wb') as f:
+        f.write(serializer.dumps(empty_sales()))
 
 if not os.path.exists(TICKETS_FILE):
-    with open(TICKETS_FILE, 'w') as f:
-        json.dump([], f)
+    with open(TICKETS_FILE, 'wb') as f:
+        f.write(serializer.dumps([]))
 
 if not os.path.exists(VOIDS_FILE):
-    with open(VOIDS_FILE, 'w') as f:
-        json.dump([], f)
+    with open(VOIDS_FILE, 'wb') as f:
+        f.write(serializer.dumps([]))
+
+if not os.path.exists(MENU_FILE):
+    with open(MENU_FILE, 'wb') as f:
+        f.write(serializer.dumps(empty_menu()))
+
+order_journal = OrderJournal(ORDERS_JOURNAL_DIR) if STORAGE_MODE == 'journal' else None
+db = SQLiteStore(DATABASE_FILE) if STORAGE_MODE == 'sqlite' else None
+
+# Closed/voided tickets leave tickets.json for dated archive files
+# (SQLite keeps them in the same table - only open ones are cached)
+ticket_archive = TicketArchive(TICKETS_ARCHIVE_DIR) if not db else None
+
+# Every load -> modify -> save holds its datasets' locks (see dataset_lock.py)
+DATASET_LOCKS = {
+    name: DatasetLock(os.path.join(DATA_DIR, f'.{name}.lock'))
+    for name in ('menu', 'orders', 'sales', 'tickets', 'voids')
+}
+
+# Serialized GET responses, invalidated by writes (see cached_response)
+response_cache = ResponseCache(RESPONSE_CACHE_SIZE)
+
+@contextmanager
+def locked(*datasets):
+    """Hold the locks of several datasets (always taken in the same order)"""
+    with ExitStack() as stack:
+        for name in sorted(datasets):
+            stack.enter_context(DATASET_LOCKS[name])
+        try:
+            yield
+        finally:
+            # Every write happens under its lock, so this is every save path
+            response_cache.bump(*datasets)
 
 # ============================================
 # HELPER FUNCTIONS
 # ============================================
 
-def load_orders():
-    """Load orders from JSON file"""
+def read_json_file(path, default):
+    """Load a JSON file, or return the default if it doesn't exist"""
+    try:
+        with open(path, 'rb') as f:
+            return serializer.loads(f.read())
+    except FileNotFoundError:
+        return default
+
+def iter_json_file(path, chunk_size=64 * 1024):
+    """Yield the records of a JSON array file one at a time (bounded memory)"""
+    decoder = json.JSONDecoder()
     try:
-        with open(ORDERS_FILE, 'r') as f:
-            return json.load(f)
-    except:
-        return []
+        f = open(path, 'r', encoding='utf-8')
+    except OSError:
+        return
+
+    with f:
+        buffer = ''
+        pos = 0
+        started = False
+        eof = False
+        while True:
+            # Skip separators, reading more of the file when the buffer runs out
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos == len(buffer):
+                if eof:
+                    return
+                buffer = f.read(chunk_size)
+                pos = 0
+                eof = not buffer
+                continue
+
+            if not started:
+                if buffer[pos] != '[':
+                    raise ValueError(f'{path} does not contain a JSON array')
+                started = True
+                pos += 1
+                continue
+
+            if buffer[pos] == ']':
+                return
+
+            try:
+                record, pos = decoder.raw_decode(buffer, pos)
+            except ValueError:
+                # Record continues past the buffer: read more and retry
+                more = f.read(chunk_size)
+                if not more:
+                    raise
+                buffer = buffer[pos:] + more
+                pos = 0
+                continue
+            yield record
+
+def write_json_file(path, data):
+    """Save data to a JSON file atomically (readers see the old or new file, never half)"""
+    fd, temp_file = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(serializer.dumps(data))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, path)
+    except BaseException:
+        os.remove(temp_file)
+        raise
+
+@metrics.storage
+def load_orders():
+    """Load orders from storage"""
+    if db:
+        return db.load('orders')
+    return read_json_orders(order_journal)
+
+def read_json_orders(journal=None):
+    """orders.json with the records of an order journal replayed over it"""
+    orders = read_json_file(ORDERS_FILE, [])
+
+    if journal:
+        # Journal records win over the snapshot (a refund re-journals the order)
+        positions = {o.get('orderId'): i for i, o in enumerate(orders)}
+        for order in journal.replay():
+            index = positions.get(order.get('orderId'))
+            if index is None:
+                positions[order.get('orderId')] = len(orders)
+                orders.append(order)
+            else:
+                orders[index] = order
+
+    return orders
 
+@metrics.storage
 def save_orders(orders):
-    """Save orders to JSON file"""
-    with open(ORDERS_FILE, 'w') as f:
-        json.dump(orders, f, indent=2)
+    """Save orders to storage"""
+    if db:
+        db.save('orders', orders)
+        order_index.reset(orders)
+        return
+
+    if order_journal:
+        # Full rewrite doubles as a compaction: write the snapshot,
+        # then drop the segments it now contains
+        write_json_file(ORDERS_FILE, orders)
+        order_journal.clear()
+        order_index.reset(orders)
+        return
+
+    write_json_file(ORDERS_FILE, orders)
+    order_index.reset(orders)
+
+def file_signature(paths):
+    """mtime/size of a set of files (changes whenever one is written)"""
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append((path, None, None))
+    return tuple(signature)
+
+def order_storage_signature():
+    """Signature of the orders' storage (changes whenever they are written)"""
+    if db:
+        return db.signature('orders')
+    paths = [ORDERS_FILE]
+    if order_journal:
+        paths += [order_journal.segment_path(n) for n in order_journal.segments()]
+    return file_signature(paths)
+
+@metrics.storage
+def append_orders(new_orders):
+    """Add orders to storage with a single write"""
+    if db:
+        db.append('orders', new_orders)
+    elif order_journal:
+        order_journal.append(new_orders)
+    else:
+        # The index already holds the older orders; only the new ones are added to it
+        write_json_file(ORDERS_FILE, order_index.orders() + list(new_orders))
+
+    order_index.add(*new_orders)
+    compact_orders_if_due()
+
+def find_order(order_id):
+    """Look up one order by ID (returns a copy that is safe to modify)"""
+    order = order_index.get(order_id)
+    return dict(as_dict(order)) if order else None
+
+@metrics.storage
+def update_order(order):
+    """Persist a change to one existing order"""
+    if db:
+        db.update('orders', order)
+    elif order_journal:
+        # The journal is replayed by orderId, so the newer copy wins
+        order_journal.append(order)
+    else:
+        orders = list(order_index.orders())
+        orders[order_index.position(order.get('orderId'))] = order
+        save_orders(orders)
 
-def load_sales():
-    """Load sales data from JSON file"""
-    try:
-        with open(SALES_FILE, 'r') as f:
-            return json.load(f)
-    except:
-        return {'total_sales': 0, 'total_orders': 0, 'sales_by_date': {}}
+    order_index.replace(order)
+    compact_orders_if_due()
 
-def save_sales(sales):
-    """Save sales data to JSON file"""
-    with open(SALES_FILE, 'w') as f:
-        json.dump(sales, f, indent=2)
+def compact_orders():
+    """Fold the order journal into orders.json"""
+    if order_journal:
+        with locked('orders'):
+            save_orders(load_orders())
 
-def load_tickets():
-    """Load tickets from JSON file"""
-    try:
-        with open(TICKETS_FILE, 'r') as f:
-            return json.load(f)
-    except:
-        return []
+def compact_orders_if_due():
+    """
+    Compact once the journal holds JOURNAL_COMPACT_THRESHOLD orders. The write
+    that got it there has succeeded either way, so a failed compaction is only
+    logged (the journal keeps the orders; the next write tries again).
+    """
+    if order_journal and order_journal.record_count >= JOURNAL_COMPACT_THRESHOLD:
+        try:
+            compact_orders()
+        except Exception:
+            app.logger.exception('Order journal compaction failed')
 
-def save_tickets(tickets):
-    """Save tickets to JSON file"""
-    with open(TICKETS_FILE, 'w') as f:
-        json.dump(tickets, f, indent=2)
+@metrics.storage
+def load_sales():
+    """Load sales data from storage"""
+    if db:
+        return db.load_document('sales', empty_sales())
+    return read_json_file(SALES_FILE, empty_sales())
 
+@metrics.storage
+def save_sales(sales):
+    """Save sales data to storage"""
+    if db:
+        db.save_document('sales', sales)
+        return
+    write_json_file(SALES_FILE, sales)
+
+@metrics.storage
+def load_open_tickets():
+    """Load the open (hot) tickets from storage"""
+    if db:
+        return db.load_where('tickets', 'status', 'open')
+    return read_json_file(TICKETS_FILE, [])
+
+def ticket_storage_signature():
+    """Signature of the file(s) open tickets live in"""
+    if db:
+        return db.signature('tickets')
+    return file_signature([TICKETS_FILE])
+
+def ticket_archive_day(ticket):
+    """Day a closed or voided ticket is archived under (YYYY-MM-DD)"""
+    finished = ticket.get('voidedAt') or ticket.get('closedAt') or ticket.get('createdAt')
+    return (finished or datetime.now().isoformat())[:10]
+
+def archive_tickets(tickets):
+    """Append closed/voided tickets to their day's archive file"""
+    by_day = {}
+    for ticket in tickets:
+        by_day.setdefault(ticket_archive_day(ticket), []).append(ticket)
+    for day, day_tickets in sorted(by_day.items()):
+        ticket_archive.append(day_tickets, day)
+
+@metrics.storage
+def load_tickets():
+    """Load all tickets (open and archived) from storage"""
+    if db:
+        return db.load('tickets')
+
+    return with_archived_tickets(active_tickets.tickets(), ticket_archive)
+
+def with_archived_tickets(open_tickets, archive):
+    """Open tickets plus everything in a ticket archive, oldest first"""
+    # The archived copy wins if a crash left a ticket in both places
+    tickets = {t.get('ticketId'): t for t in open_tickets}
+    for ticket in archive.iterate():
+        tickets.pop(ticket.get('ticketId'), None)
+        tickets[ticket.get('ticketId')] = ticket
+    return sorted(tickets.values(), key=lambda t: t.get('createdAt') or '')
+
+@metrics.storage
+def store_tickets(tickets):
+    """Write new or changed tickets to tickets.json or, once finished, the archive"""
+    was_open = any(active_tickets.get(t.get('ticketId')) is not None for t in tickets)
+    open_tickets = active_tickets.with_change(*tickets)
+
+    finished = [t for t in tickets if t.get('status') != 'open']
+    archive_tickets(finished)
+    if was_open or len(finished) < len(tickets):
+        # Only the open tickets are rewritten
+        write_json_file(TICKETS_FILE, open_tickets)
+
+def ticket_transaction():
+    """Context for a ticket write: a transaction in SQLite mode"""
+    return db.transaction() if db else nullcontext()
+
+@metrics.storage
+def append_tickets(tickets):
+    """Add tickets to storage with a single write (and publish them to the change feed)"""
+    # In SQLite the tickets and their change feed entries are one transaction
+    with ticket_transaction(), ticket_feed.recording(*tickets):
+        if db:
+            db.append('tickets', tickets)
+        else:
+            store_tickets(tickets)
+        active_tickets.apply(*tickets)
+
+def find_ticket(ticket_id):
+    """Look up one ticket by ID (returns a copy that is safe to modify)"""
+    ticket = active_tickets.get(ticket_id)
+    if ticket is None:
+        ticket = db.get('tickets', ticket_id) if db else ticket_archive.find(ticket_id)
+    return copy.deepcopy(as_dict(ticket))
+
+@metrics.storage
+def update_ticket(ticket):
+    """Persist a change to one existing ticket (and publish it to the change feed)"""
+    with ticket_transaction(), ticket_feed.recording(ticket):
+        if db:
+            db.update('tickets', ticket)
+        else:
+            store_tickets([ticket])
+        active_tickets.apply(ticket)
+
+def iter_tickets():
+    """Yield tickets one at a time (archived, then open)"""
+    if db:
+        return db.iterate('tickets')
+    return itertools.chain(ticket_archive.iterate(), active_tickets.tickets())
+
+# Open tickets stay in memory, indexed by ticketId
+active_tickets = ActiveTickets(load_open_tickets, ticket_storage_signature,
+                               record=TicketRecord.of if COMPACT_RECORDS else None)
+
+if ticket_archive:
+    # tickets.json from before the archive existed holds finished tickets too
+    with locked('tickets'):
+        stored_tickets = read_json_file(TICKETS_FILE, [])
+        finished_tickets = [t for t in stored_tickets if t.get('status') != 'open']
+        if finished_tickets:
+            archive_tickets(finished_tickets)
+            write_json_file(TICKETS_FILE, [t for t in stored_tickets if t.get('status') == 'open'])
+
+active_tickets.refresh()
+
+# Kitchen screens follow ticket changes by version (see ticket_feed.py);
+# the numbering and recent changes are shared by all worker processes
+ticket_feed = TicketFeed(change_log=SQLiteChangeLog(db) if db else FileChangeLog(TICKET_CHANGES_FILE))
+ticket_feed.seed(max((t.get('version', 0) for t in iter_tickets()), default=0))
+
+@metrics.storage
 def load_voids():
-    """Load void log from JSON file"""
-    try:
-        with open(VOIDS_FILE, 'r') as f:
-            return json.load(f)
-    except:
-        return []
+    """Load void log from storage"""
+    if db:
+        return db.load('voids')
+    return read_json_file(VOIDS_FILE, [])
 
+@metrics.storage
 def save_voids(voids):
-    """Save void log to JSON file"""
-    with open(VOIDS_FILE, 'w') as f:
-        json.dump(voids, f, indent=2)
+    """Save void log to storage"""
+    if db:
+        db.save('voids', voids)
+        return
+    write_json_file(VOIDS_FILE, voids)
+
+def iter_voids():
+    """Yield void records one at a time, oldest first"""
+    if db:
+        return db.iterate('voids')
+    return iter_json_file(VOIDS_FILE)
+
+@metrics.storage
+def append_void(void):
+    """Add a single void record to the log"""
+    if db:
+        db.append('voids', [void])
+        return
+
+    voids = load_voids()
+    voids.append(void)
+    save_voids(voids)
+
+@metrics.storage
+def load_menu():
+    """Load the menu catalog document from storage"""
+    if db:
+        # Until a manager first edits it, SQLite mode starts from menu.json
+        return db.load_document('menu', read_json_file(MENU_FILE, empty_menu()))
+    return read_json_file(MENU_FILE, empty_menu())
+
+@metrics.storage
+def save_menu(menu):
+    """Save the menu catalog document to storage"""
+    if db:
+        db.save_document('menu', menu)
+    else:
+        write_json_file(MENU_FILE, menu)
+    menu_catalog.reset(menu)
+
+def menu_storage_signature():
+    """Signature of the file the menu catalog lives in"""
+    if db:
+        return db.signature('menu')
+    return file_signature([MENU_FILE])
+
+# Menu items stay in memory, indexed by id (see menu_catalog.py)
+menu_catalog = MenuCatalog(load_menu, menu_storage_signature)
+
+def compact_lines(items):
+    """Order/ticket lines as stored (catalog id and version, quantity, price)"""
+    return menu_catalog.compact_lines(items or [])
+
+def with_full_items(record):
+    """Copy of an order/ticket with its lines' menu details filled back in"""
+    if not record.get('items'):
+        return record
+    return dict(record, items=menu_catalog.rehydrate_lines(record['items']))
+
+def wants_full_items():
+    """Whether the caller asked for full menu details on lines (items=full)"""
+    return request.args.get('items') == 'full'
+
+def count_order_items(item_counts, order, sign=1):
+    """Add (sign=1) or remove (sign=-1) an order's items from a name -> quantity tally"""
+    for item in order.get('items', []):
+        item_name = item.get('name')
+        quantity = item.get('quantity', 1) * sign
+        
+        item_counts[item_name] = item_counts.get(item_name, 0) + quantity
+        if item_counts[item_name] <= 0:
+            del item_counts[item_name]
+
+def parse_register_time(timestamp):
+    """Parse a register timestamp (locale text like '3/19/2026, 1:50:39 PM' or ISO), or None"""
+    for fmt in ('%m/%d/%Y, %I:%M:%S %p', '%Y-%m-%dT%H:%M:%S.%f', '%Y-%m-%dT%H:%M:%S'):
+        try:
+            return datetime.strptime(timestamp or '', fmt)
+        except ValueError:
+            continue
+    return None
+
+def normalize_order_time(order):
+    """Stamp an incoming order with placedAt: when it was rung up, as ISO 8601 to the second"""
+    moment = parse_register_time(order.get('timestamp')) or datetime.now()
+    order['placedAt'] = moment.isoformat(timespec='seconds')
+
+def order_timestamp(order):
+    """When the register rang the order up (a datetime), or None if unreadable"""
+    if order.get('placedAt'):
+        return datetime.fromisoformat(order['placedAt'])
+    
+    # Orders from before placedAt was recorded: parse the register text
+    return parse_register_time(order.get('timestamp'))
+
+def order_time_key(order):
+    """placedAt-style ISO timestamp an order is indexed under ('' if unknown)"""
+    if order.get('placedAt'):
+        return order['placedAt']
+    moment = order_timestamp(order)
+    return moment.isoformat(timespec='seconds') if moment else ''
+
+def order_sales_date(order):
+    """The YYYY-MM-DD sales_by_date key an order was counted under"""
+    if order.get('salesDate'):
+        return order['salesDate']
+    
+    # Orders from before salesDate was recorded: use the register timestamp
+    moment = order_timestamp(order)
+    return moment.strftime('%Y-%m-%d') if moment else None
+
+def find_invalid_date(*values):
+    """Return the first value that isn't a YYYY-MM-DD date (None if all are valid)"""
+    for value in values:
+        if value:
+            try:
+                datetime.strptime(value, '%Y-%m-%d')
+            except ValueError:
+                return value
+    return None
+
+def time_bound(value, end=False):
+    """
+    ISO timestamp (to the second) for a from/to query value, or None if invalid.
+    A bare date stands for the start of the day, or with end=True its last second.
+    """
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if moment.tzinfo:
+        moment = moment.astimezone().replace(tzinfo=None)  # Registers record local time
+    if end and len(value) == 10:
+        moment = moment.replace(hour=23, minute=59, second=59)
+    return moment.isoformat(timespec='seconds')
+
+# Orders stay in memory, indexed by orderId, sales date and time; the index
+# is built at startup and reloads whenever the storage signature changes
+order_index = OrderIndex(load_orders, order_storage_signature, order_sales_date, order_time_key,
+                         record=OrderRecord.of if COMPACT_RECORDS and STORAGE_MODE != 'json' else None)
+order_index.refresh()
+
+# Columnar copy of the orders for dashboard queries (needs NumPy)
+sales_analytics = SalesAnalytics(order_index, order_sales_date, order_timestamp)
+
+def empty_sales_by_hour():
+    """Weekday (Monday first) x hour of day grid of revenue and order counts"""
+    return {
+        'revenue': [[0] * 24 for _ in range(7)],
+        'orders': [[0] * 24 for _ in range(7)]
+    }
 
-def get_popular_items_data(orders):
-    """Helper function to get popular items from orders"""
+def count_order_hour(sales_by_hour, order, sign=1):
+    """Add (sign=1) or remove (sign=-1) an order in its weekday x hour cell"""
+    moment = order_timestamp(order)
+    if not moment:
+        return  # No readable register time, so never bucketed
+    weekday, hour = moment.weekday(), moment.hour
+    sales_by_hour['revenue'][weekday][hour] += order.get('total', 0) * sign
+    sales_by_hour['orders'][weekday][hour] += sign
+
+def build_sales_by_hour(orders):
+    """Fill the weekday x hour grid from all non-refunded orders"""
+    sales_by_hour = empty_sales_by_hour()
+    for order in orders:
+        if not order.get('refunded'):
+            count_order_hour(sales_by_hour, order)
+    return sales_by_hour
+
+def build_item_counts(orders):
+    """Tally item quantities over all non-refunded orders, overall and per day"""
     item_counts = {}
-    
+    items_by_date = {}
     for order in orders:
         if order.get('refunded'):
             continue  # Skip refunded orders
-        for item in order.get('items', []):
-            item_name = item.get('name')
-            quantity = item.get('quantity', 1)
-            
-            if item_name in item_counts:
-                item_counts[item_name] += quantity
-            else:
-                item_counts[item_name] = quantity
+        count_order_items(item_counts, order)
+        
+        date = order_sales_date(order)
+        if date:
+            count_order_items(items_by_date.setdefault(date, {}), order)
+    return item_counts, items_by_date
+
+def rebuild_item_counts():
+    """Recompute the popular items tallies in sales.json from the order history"""
+    with locked('orders', 'sales'):
+        sales = load_sales()
+        sales['item_counts'], sales['items_by_date'] = build_item_counts(order_index.orders())
+        save_sales(sales)
+    return sales['item_counts']
+
+@metrics.timed
+def get_popular_items_data(sales, dates=None):
+    """
+    Helper function to get popular items from the running item tallies
+    dates: only count these YYYY-MM-DD days (default: all time)
+    """
+    if dates is None:
+        item_counts = sales.get('item_counts', {})
+    else:
+        # Merge the per-day tallies (at most a month's worth)
+        item_counts = {}
+        items_by_date = sales.get('items_by_date', {})
+        for date in dates:
+            for item_name, quantity in items_by_date.get(date, {}).items():
+                item_counts[item_name] = item_counts.get(item_name, 0) + quantity
     
-    # Sort by popularity
-    popular = sorted(item_counts.items(), key=lambda x: x[1], reverse=True)
+    # Top 10 via a heap instead of sorting every item
+    popular = heapq.nlargest(10, item_counts.items(), key=lambda x: x[1])
     
     return [
         {'name': name, 'timesOrdered': count}
-        for name, count in popular[:10]  # Top 10
+        for name, count in popular
     ]
 
+def add_order_to_sales(sales, order):
+    """Count a new order in the sales statistics"""
+    date = order_sales_date(order)
+    sales['total_sales'] += order.get('total', 0)
+    sales['total_orders'] += 1
+    
+    # Track sales by date (and its week, month and year)
+    add_sale(sales, date, order.get('total', 0))
+    
+    # Track item popularity (overall and for the day)
+    count_order_items(sales['item_counts'], order)
+    count_order_items(sales['items_by_date'].setdefault(date, {}), order)
+    
+    # Track when in the week orders come in (staffing heatmap)
+    count_order_hour(sales['sales_by_hour'], order)
+
+def remove_order_from_sales(sales, order):
+    """Take a refunded order back out of the sales statistics"""
+    sales['total_sales'] -= order.get('total', 0)
+    sales['total_orders'] -= 1
+    
+    # Update date-specific sales (and its week, month and year)
+    date = order_sales_date(order)
+    if date in sales['sales_by_date']:
+        add_sale(sales, date, -order.get('total', 0), orders=-1)
+    
+    # Refunded items no longer count towards popularity
+    count_order_items(sales['item_counts'], order, sign=-1)
+    if date in sales['items_by_date']:
+        count_order_items(sales['items_by_date'][date], order, sign=-1)
+    count_order_hour(sales['sales_by_hour'], order, sign=-1)
+
+def upgrade_sales():
+    """Add aggregates missing from a sales.json written by an older version"""
+    with locked('orders', 'sales'):
+        sales = load_sales()
+        upgraded = False
+        if 'item_counts' not in sales or 'items_by_date' not in sales:
+            sales['item_counts'], sales['items_by_date'] = build_item_counts(order_index.orders())
+            upgraded = True
+        if 'sales_by_hour' not in sales:
+            sales['sales_by_hour'] = build_sales_by_hour(order_index.orders())
+            upgraded = True
+        if any(field not in sales for field in LEVELS.values()):
+            sales.update(build_rollups(sales['sales_by_date']))
+            upgraded = True
+        if upgraded:
+            save_sales(sales)
+
+upgrade_sales()
+
+def commit_orders(orders):
+    """
+    Store a batch of new orders and count them in the sales statistics
+    (all or nothing). Returns, per order, whether it was stored: False
+    for one whose orderId was already stored.
+    """
+    with locked('orders', 'sales'):
+        # A resent order (even one racing its first copy) is stored and
+        # counted once: its ID is checked here, under the lock
+        new_orders = unstored_orders(orders)
+        new_ids = {id(order) for order in new_orders}
+        stored = [id(order) in new_ids for order in orders]
+        orders = new_orders
+        if not orders:
+            return stored
+
+        # Counted first: an order the statistics can't take fails the
+        # batch before anything is written
+        sales = load_sales()
+        for order in orders:
+            add_order_to_sales(sales, order)
+
+        if db:
+            # The orders and their sales land in one transaction
+            try:
+                with db.transaction():
+                    append_orders(orders)
+                    save_sales(sales)
+            except Exception:
+                order_index.reset(load_orders())  # It took the batch in already
+                raise
+            return stored
+
+        save_sales(sales)
+        try:
+            append_orders(orders)
+        except Exception:
+            # The orders weren't stored: take them back out of the statistics
+            for order in orders:
+                remove_order_from_sales(sales, order)
+            save_sales(sales)
+            raise
+        return stored
+
+def unstored_orders(orders):
+    """The orders whose orderId isn't stored yet (first copy of each)"""
+    seen = set()
+    new_orders = []
+    for order in orders:
+        if order['orderId'] in seen or order_index.position(order['orderId']) is not None:
+            continue
+        seen.add(order['orderId'])
+        new_orders.append(order)
+    return new_orders
+
+def commit_tickets(tickets):
+    """Store a batch of new kitchen tickets"""
+    with locked('tickets'):
+        append_tickets(tickets)
+
+# Concurrent checkouts / sends to the kitchen share one write per batch
+order_writer = GroupCommit(commit_orders, window=GROUP_COMMIT_WINDOW_MS / 1000)
+ticket_writer = GroupCommit(commit_tickets, window=GROUP_COMMIT_WINDOW_MS / 1000)
+
+# ============================================
+# RESPONSE CACHE
+# ============================================
+
+def sales_storage_signature():
+    """Signature of the file the sales statistics live in"""
+    if db:
+        return db.signature('sales')
+    return file_signature([SALES_FILE])
+
+def voids_storage_signature():
+    """Signature of the file the void log lives in"""
+    if db:
+        return db.signature('voids')
+    return file_signature([VOIDS_FILE])
+
+def tickets_storage_signature():
+    """Signature of the open tickets and the archive"""
+    return (ticket_storage_signature(), ticket_archive.signature() if ticket_archive else None)
+
+# Storage signatures catch writes made by other worker processes
+DATASET_SIGNATURES = {
+    'menu': menu_storage_signature,
+    'orders': order_storage_signature,
+    'sales': sales_storage_signature,
+    'tickets': tickets_storage_signature,
+    'voids': voids_storage_signature,
+}
+
+def cached_response(*datasets):
+    """
+    Cache a GET route's successful responses until one of the datasets
+    it reads is written, and answer a matching If-None-Match with 304.
+    Goes below @app.route, naming the datasets the route reads.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            # Routes that default to "today" change at midnight without a write
+            tag = (datetime.now().strftime('%Y-%m-%d'),) + tuple(
+                (response_cache.generation(name), DATASET_SIGNATURES[name]())
+                for name in datasets
+            )
+            key = request.full_path
+            cached = response_cache.get(key, tag)
+            
+            if cached is None:
+                response = app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                body = response.get_data()
+                cached = (body, response.mimetype, hashlib.sha1(body).hexdigest())
+                response_cache.put(key, tag, cached)
+            
+            body, mimetype, etag = cached
+            response = Response(body, mimetype=mimetype)
+            response.set_etag(etag)
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
+
 # ============================================
 # API ROUTES
 # ============================================
@@ -141,10 +897,214 @@ def home():
         'version': '1.0.0'
     })
 
+# ============================================
+# MENU ROUTES
+# ============================================
+
+def menu_item_fields(data):
+    """A menu item as sent by the Menu Manager (catalog bookkeeping left out)"""
+    return {k: v for k, v in data.items() if k not in ('managerPassword', 'version')}
+
+def find_menu_item_error(item):
+    """Why a menu item can't be stored, or None"""
+    if not isinstance(item.get('name'), str) or not item['name'].strip():
+        return 'name is required'
+    if not isinstance(item.get('category'), str) or not item['category']:
+        return 'category is required'
+    price = item.get('price')
+    if isinstance(price, bool) or not isinstance(price, (int, float)) or price < 0:
+        return 'price must be a number of at least 0'
+    return None
+
+@app.route('/api/menu', methods=['GET'])
+@cached_response('menu')
+def get_menu():
+    """
+    The menu catalog
+    Query params: since (catalog version the terminal already has:
+    only items changed and ids removed after it are returned)
+    """
+    try:
+        since = request.args.get('since', type=int)
+        version = menu_catalog.version
+        
+        if since is None or since > version:
+            return jsonify({
+                'status': 'success',
+                'version': version,
+                'full': True,
+                'items': menu_catalog.items()
+            })
+        
+        items, removed = menu_catalog.changes_since(since)
+        return jsonify({
+            'status': 'success',
+            'version': version,
+            'full': False,
+            'since': since,
+            'items': items,
+            'removed': removed
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@app.route('/api/menu', methods=['PUT'])
+def replace_menu():
+    """Replace the whole menu, e.g. to reset it (requires manager password)"""
+    try:
+        data = request.json
+        if data.get('managerPassword') != 'admin123':
+            return jsonify({'status': 'error', 'message': 'Invalid manager password'}), 403
+        
+        items = [menu_item_fields(item) for item in data.get('items') or []]
+        seen = set()
+        for item in items:
+            error = 'id is required' if not item.get('id') else find_menu_item_error(item)
+            if not error and item['id'] in seen:
+                error = 'duplicate id'
+            seen.add(item.get('id'))
+            if error:
+                return jsonify({'status': 'error', 'message': f"{item.get('id')}: {error}"}), 400
+        
+        with locked('menu'):
+            menu = menu_catalog.with_items(items)
+            save_menu(menu)
+        
+        return jsonify({
+            'status': 'success',
+            'version': menu['version'],
+            'count': len(menu['items'])
+        })
+        
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/api/menu/items', methods=['POST'])
+def add_menu_item():
+    """Add an item to the menu (requires manager password)"""
+    try:
+        data = request.json
+        if data.get('managerPassword') != 'admin123':
+            return jsonify({'status': 'error', 'message': 'Invalid manager password'}), 403
+        
+        item = menu_item_fields(data)
+        error = find_menu_item_error(item)
+        if error:
+            return jsonify({'status': 'error', 'message': error}), 400
+        
+        with locked('menu'):
+            if not item.get('id'):
+                item['id'] = menu_catalog.next_id(item['category'])
+            elif menu_catalog.get(item['id']):
+                return jsonify({'status': 'error', 'message': 'Menu item already exists'}), 409
+            
+            menu = menu_catalog.with_changes([item])
+            save_menu(menu)
+        
+        return jsonify({
+            'status': 'success',
+            'version': menu['version'],
+            'item': menu_catalog.get(item['id'])
+        }), 201
+        
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/api/menu/items/<item_id>', methods=['PATCH'])
+def update_menu_item(item_id):
+    """Change a menu item, e.g. its price (requires manager password)"""
+    try:
+        data = request.json
+        if data.get('managerPassword') != 'admin123':
+            return jsonify({'status': 'error', 'message': 'Invalid manager password'}), 403
+        
+        with locked('menu'):
+            current = menu_catalog.get(item_id)
+            if not current:
+                return jsonify({'status': 'error', 'message': 'Menu item not found'}), 404
+            
+            item = dict(current, **menu_item_fields(data))
+            item['id'] = item_id
+            error = find_menu_item_error(item)
+            if error:
+                return jsonify({'status': 'error', 'message': error}), 400
+            
+            menu = menu_catalog.with_changes([item])
+            save_menu(menu)
+        
+        return jsonify({
+            'status': 'success',
+            'version': menu['version'],
+            'item': menu_catalog.get(item_id)
+        })
+        
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/api/menu/items/<item_id>', methods=['DELETE'])
+def remove_menu_item(item_id):
+    """Take an item off the menu (requires manager password)"""
+    try:
+        data = request.json
+        if data.get('managerPassword') != 'admin123':
+            return jsonify({'status': 'error', 'message': 'Invalid manager password'}), 403
+        
+        with locked('menu'):
+            if not menu_catalog.get(item_id):
+                return jsonify({'status': 'error', 'message': 'Menu item not found'}), 404
+            
+            menu = menu_catalog.with_changes(removals=[item_id])
+            save_menu(menu)
+        
+        return jsonify({
+            'status': 'success',
+            'version': menu['version']
+        })
+        
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
 # ============================================
 # ORDER MANAGEMENT ROUTES
 # ============================================
 
+def find_order_error(order):
+    """Why an incoming order can't be stored, or None"""
+    if not isinstance(order, dict):
+        return 'order must be an object'
+    if not isinstance(order.get('orderId'), str) or not order['orderId']:
+        return 'orderId is required'
+    if not isinstance(order.get('items'), list):
+        return 'items must be a list'
+    for number, item in enumerate(order['items'], 1):
+        error = find_line_error(item)
+        if error:
+            return f'item {number}: {error}'
+    if not is_number(order.get('total')):
+        return 'total must be a number'
+    return None
+
+def find_line_error(item):
+    """Why an order line can't be stored (or counted in sales), or None"""
+    if not isinstance(item, dict):
+        return 'must be an object'
+    if not isinstance(item.get('id'), str) or menu_catalog.item_at(item['id'], item.get('version')) is None:
+        return 'id must be a menu item'
+    quantity = item.get('quantity', 1)
+    if isinstance(quantity, bool) or not isinstance(quantity, int) or quantity <= 0:
+        return 'quantity must be a whole number above 0'
+    if 'price' in item and not is_number(item['price']):
+        return 'price must be a number'
+    return None
+
+def is_number(value):
+    """An int or float (JSON true/false don't count)"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
 @app.route('/api/orders', methods=['POST'])
 def create_order():
     """
@@ -157,29 +1117,43 @@ def create_order():
     try:
         order_data = request.json
         
-        # Load existing orders
-        orders = load_orders()
-        
-        # Add order to list
-        orders.append(order_data)
+        # Registers mint the ID (so a resent order keeps it); give one if missing
+        if isinstance(order_data, dict) and not order_data.get('orderId'):
+            order_data['orderId'] = ids.new('ORD')
         
-        # Save updated orders
-        save_orders(orders)
+        # Checked before it joins a batch, so it can't fail anyone else's checkout
+        error = find_order_error(order_data)
+        if error:
+            return jsonify({'status': 'error', 'message': error}), 400
         
-        # Update sales statistics
-        sales = load_sales()
-        sales['total_sales'] += order_data.get('total', 0)
-        sales['total_orders'] += 1
+        # Sent again (e.g. the register retried after a timeout): already counted.
+        # Only a shortcut - commit_orders checks again under the lock
+        if order_index.position(order_data['orderId']) is not None:
+            return jsonify({
+                'status': 'success',
+                'message': 'Order already stored',
+                'orderId': order_data['orderId'],
+                'duplicate': True
+            }), 200
         
-        # Track sales by date
-        date = datetime.now().strftime('%Y-%m-%d')
-        if date not in sales['sales_by_date']:
-            sales['sales_by_date'][date] = {'revenue': 0, 'orders': 0}
+        # Remember which day the sale is counted under (for refunds)
+        # and when it was rung up, in a sortable form
+        order_data['salesDate'] = datetime.now().strftime('%Y-%m-%d')
+        normalize_order_time(order_data)
         
-        sales['sales_by_date'][date]['revenue'] += order_data.get('total', 0)
-        sales['sales_by_date'][date]['orders'] += 1
+        # Lines reference the menu catalog instead of copying whole menu items
+        order_data['items'] = compact_lines(order_data.get('items'))
         
-        save_sales(sales)
+        # Store the order and update sales statistics
+        # (batched with any other orders arriving at the same time);
+        # a copy racing this one may have been stored first
+        if not order_writer.submit(order_data):
+            return jsonify({
+                'status': 'success',
+                'message': 'Order already stored',
+                'orderId': order_data['orderId'],
+                'duplicate': True
+            }), 200
         
         return jsonify({
             'status': 'success',
@@ -193,31 +1167,166 @@ def create_order():
             'message': str(e)
         }), 500
 
+# Most orders one bulk request may carry
+BULK_ORDER_LIMIT = 1000
+
+@app.route('/api/orders/bulk', methods=['POST'])
+def create_orders_bulk():
+    """
+    Store a batch of orders at once (a register catching up after an outage)
+    Expected data: { orders: [order, ...] } - each order as for POST /api/orders
+    Orders already stored (same orderId) are skipped, so a batch can safely be
+    sent again; the new ones are saved with a single write. Returns a result
+    per order: created, duplicate or error (also if storing it failed).
+    """
+    try:
+        data = request.get_json(silent=True)
+        orders = data.get('orders') if isinstance(data, dict) else None
+        if not isinstance(orders, list):
+            return jsonify({'status': 'error', 'message': 'orders must be a list'}), 400
+        if len(orders) > BULK_ORDER_LIMIT:
+            return jsonify({
+                'status': 'error',
+                'message': f'At most {BULK_ORDER_LIMIT} orders per request'
+            }), 400
+
+        results = []
+        valid = []
+        for order in orders:
+            error = find_order_error(order)
+            if error:
+                order_id = order.get('orderId') if isinstance(order, dict) else None
+                results.append({'orderId': order_id, 'status': 'error', 'message': error})
+                continue
+            result = {'orderId': order['orderId']}
+            results.append(result)
+            valid.append((result, order))
+
+        # Skip orders already stored (or sent twice in this batch) before
+        # preparing them; commit_orders checks again under the lock
+        pending = []
+        seen = set()
+        for result, order in valid:
+            if order['orderId'] in seen or order_index.position(order['orderId']) is not None:
+                result['status'] = 'duplicate'
+                continue
+            seen.add(order['orderId'])
+
+            # Counted under the day it was rung up, not the day it arrived
+            order = dict(order)
+            normalize_order_time(order)
+            order['salesDate'] = order['placedAt'][:10]
+            order['items'] = compact_lines(order['items'])
+            pending.append((result, order))
+
+        # Joins the group commit with any checkouts arriving meanwhile (one
+        # write); if that write fails, only the orders that can't be stored fail
+        outcomes = order_writer.submit_all([order for _, order in pending])
+        for (result, _), outcome in zip(pending, outcomes):
+            if isinstance(outcome, Exception):
+                result['status'] = 'error'
+                result['message'] = str(outcome)
+            else:
+                result['status'] = 'created' if outcome else 'duplicate'
+
+        statuses = [result['status'] for result in results]
+        return jsonify({
+            'status': 'success',
+            'created': statuses.count('created'),
+            'duplicates': statuses.count('duplicate'),
+            'errors': statuses.count('error'),
+            'results': results
+        })
+
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
 @app.route('/api/orders', methods=['GET'])
+@cached_response('orders', 'menu')
 def get_orders():
     """
-    Get all orders
+    Get orders, oldest first
     Optional query params:
-    - date: filter by date (YYYY-MM-DD)
-    - limit: number of orders to return
+    - date: only orders from this day (YYYY-MM-DD)
+    - from / to: only orders from this range of days (YYYY-MM-DD, inclusive),
+      or of times when either has one (e.g. 2026-03-19T11:00, inclusive)
+    - limit: page size (without a cursor: the most recent orders)
+    - before: orderId cursor - the page of orders just before it
+    - after: orderId cursor - the page of orders just after it
+    - fields: comma-separated order fields to return (e.g. orderId,total)
+    - items=full: lines with their full menu details (from the catalog)
     """
     try:
-        orders = load_orders()
+        orders = order_index.orders()
+        
+        # Filter by date range using the sales date index
+        start = request.args.get('from') or request.args.get('date')
+        end = request.args.get('to') or request.args.get('date')
+        timed = any(value and len(value) > 10 for value in (start, end))
+        if timed:
+            # ...or by time range using the placedAt index
+            bounds = (start and time_bound(start), end and time_bound(end, end=True))
+            invalid = next((v for v, b in zip((start, end), bounds) if v and not b), None)
+        else:
+            invalid = find_invalid_date(start, end)
+        if invalid:
+            return jsonify({
+                'status': 'error',
+                'message': f"Invalid date '{invalid}' (expected YYYY-MM-DD or YYYY-MM-DDTHH:MM[:SS])"
+            }), 400
+        
+        if timed:
+            positions = order_index.positions_at(*bounds)
+        elif start or end:
+            positions = order_index.positions_between(start, end)
+        else:
+            positions = range(len(orders))
+        
+        # Keyset pagination: cursors are orderIds, resolved through the index
+        after = request.args.get('after')
+        before = request.args.get('before')
+        for cursor in (after, before):
+            if cursor and order_index.position(cursor) is None:
+                return jsonify({
+                    'status': 'error',
+                    'message': f"Unknown cursor '{cursor}'"
+                }), 400
         
-        # Filter by date if provided
-        date_filter = request.args.get('date')
-        if date_filter:
-            orders = [o for o in orders if date_filter in o.get('timestamp', '')]
+        if after:
+            positions = positions[bisect.bisect_right(positions, order_index.position(after)):]
+        if before:
+            positions = positions[:bisect.bisect_left(positions, order_index.position(before))]
         
         # Limit results if specified
         limit = request.args.get('limit', type=int)
-        if limit:
-            orders = orders[-limit:]  # Get most recent orders
+        has_more = False
+        if limit and limit < len(positions):
+            has_more = True
+            if after:
+                positions = positions[:limit]  # Next page forward
+            else:
+                positions = positions[-limit:]  # Get most recent orders
+        
+        page = [orders[p] for p in positions]
+        
+        # Only send the requested fields
+        fields = request.args.get('fields')
+        if fields:
+            fields = fields.split(',')
+            page = [{f: o[f] for f in fields if f in o} for o in page]
+        
+        if wants_full_items():
+            page = [with_full_items(o) for o in page]
         
         return jsonify({
             'status': 'success',
-            'count': len(orders),
-            'orders': orders
+            'count': len(page),
+            'orders': page,
+            'hasMore': has_more,
+            'cursors': {
+                'before': orders[positions[0]].get('orderId') if page else None,
+                'after': orders[positions[-1]].get('orderId') if page else None
+            }
         })
         
     except Exception as e:
@@ -227,13 +1336,15 @@ def get_orders():
         }), 500
 
 @app.route('/api/orders/<order_id>', methods=['GET'])
+@cached_response('orders', 'menu')
 def get_order(order_id):
-    """Get a specific order by ID"""
+    """Get a specific order by ID (items=full: lines with full menu details)"""
     try:
-        orders = load_orders()
-        order = next((o for o in orders if o.get('orderId') == order_id), None)
+        order = find_order(order_id)
         
         if order:
+            if wants_full_items():
+                order = with_full_items(order)
             return jsonify({
                 'status': 'success',
                 'order': order
@@ -255,13 +1366,18 @@ def get_order(order_id):
 # ============================================
 
 @app.route('/api/sales/stats', methods=['GET'])
+@cached_response('sales')
 def get_sales_stats():
     """Get overall sales statistics"""
     try:
         sales = load_sales()
         return jsonify({
             'status': 'success',
-            'stats': sales
+            'stats': {
+                'total_sales': sales['total_sales'],
+                'total_orders': sales['total_orders'],
+                'sales_by_date': sales['sales_by_date']
+            }
         })
     except Exception as e:
         return jsonify({
@@ -270,6 +1386,7 @@ def get_sales_stats():
         }), 500
 
 @app.route('/api/sales/today', methods=['GET'])
+@cached_response('sales')
 def get_today_sales():
     """Get today's sales summary"""
     try:
@@ -277,9 +1394,8 @@ def get_today_sales():
         today = datetime.now().strftime('%Y-%m-%d')
         today_sales = sales['sales_by_date'].get(today, {'revenue': 0, 'orders': 0})
         
-        # Get popular items
-        orders = load_orders()
-        popular_items = get_popular_items_data(orders)
+        # Get today's popular items
+        popular_items = get_popular_items_data(sales, [today])
         
         return jsonify({
             'status': 'success',
@@ -294,9 +1410,19 @@ def get_today_sales():
             'message': str(e)
         }), 500
 
+def requested_month():
+    """(year, month) from the query string, defaulting to the current month"""
+    now = datetime.now()
+    year = request.args.get('year', now.year, type=int)
+    month = request.args.get('month', now.month, type=int)
+    if not 1 <= month <= 12 or not 1 <= year <= 9999:
+        return None
+    return year, month
+
 @app.route('/api/sales/day', methods=['GET'])
+@cached_response('sales')
 def get_specific_day_sales():
-    """Get sales for a specific day of current month"""
+    """Get sales for a specific day (of the current month unless month/year are given)"""
     try:
         day = request.args.get('day', type=int)
         if not day or day < 1 or day > 31:
@@ -305,20 +1431,22 @@ def get_specific_day_sales():
                 'message': 'Invalid day parameter'
             }), 400
         
-        sales = load_sales()
-        orders = load_orders()
+        selected_month = requested_month()
+        if not selected_month:
+            return jsonify({
+                'status': 'error',
+                'message': 'Invalid month or year parameter'
+            }), 400
+        year, month = selected_month
         
-        # Get current year and month
-        now = datetime.now()
-        year = now.year
-        month = now.month
+        sales = load_sales()
         
         # Build date string
         date_str = f"{year}-{month:02d}-{day:02d}"
         day_sales = sales['sales_by_date'].get(date_str, {'revenue': 0, 'orders': 0})
         
-        # Get popular items
-        popular_items = get_popular_items_data(orders)
+        # Get the day's popular items
+        popular_items = get_popular_items_data(sales, [date_str])
         
         return jsonify({
             'status': 'success',
@@ -334,52 +1462,51 @@ def get_specific_day_sales():
         }), 500
 
 @app.route('/api/sales/week', methods=['GET'])
+@cached_response('sales')
 def get_week_sales():
-    """Get weekly sales summary for a specific week of the current month"""
+    """Get sales for week 1-5 (days 1-7, 8-14, ...) of the current or a given month"""
     try:
         week_num = request.args.get('week', 1, type=int)
-        sales = load_sales()
-        orders = load_orders()
         
-        # Calculate week dates
-        from calendar import monthrange
-        now = datetime.now()
-        year = now.year
-        month = now.month
+        selected_month = requested_month()
+        if not selected_month:
+            return jsonify({
+                'status': 'error',
+                'message': 'Invalid month or year parameter'
+            }), 400
+        year, month = selected_month
         
         # Calculate start and end dates for the week
         days_in_month = monthrange(year, month)[1]
+        if week_num < 1 or (week_num - 1) * 7 >= days_in_month:
+            return jsonify({
+                'status': 'error',
+                'message': 'Invalid week parameter'
+            }), 400
         week_start = ((week_num - 1) * 7) + 1
         week_end = min(week_num * 7, days_in_month)
+        start = parse_day(f"{year}-{month:02d}-{week_start:02d}")
+        end = parse_day(f"{year}-{month:02d}-{week_end:02d}")
         
-        # Collect sales for the week
-        week_revenue = 0
-        week_orders = 0
-        daily_breakdown = []
-        
-        for day in range(week_start, week_end + 1):
-            date_str = f"{year}-{month:02d}-{day:02d}"
-            day_sales = sales['sales_by_date'].get(date_str, {'revenue': 0, 'orders': 0})
-            week_revenue += day_sales['revenue']
-            week_orders += day_sales['orders']
-            
-            if day_sales['orders'] > 0:  # Only include days with sales
-                daily_breakdown.append({
-                    'date': date_str,
-                    'revenue': day_sales['revenue'],
-                    'orders': day_sales['orders']
-                })
+        # Totals from the rollups, plus the days that had sales
+        sales = load_sales()
+        week_sales = range_totals(sales, start, end)
+        daily_breakdown = [
+            {'date': row['period'], 'revenue': row['revenue'], 'orders': row['orders']}
+            for row in breakdown(sales, start, end, 'day')
+        ]
         
-        # Get popular items
-        popular_items = get_popular_items_data(orders)
+        # Get the week's popular items
+        week_dates = [f"{year}-{month:02d}-{day:02d}" for day in range(week_start, week_end + 1)]
+        popular_items = get_popular_items_data(sales, week_dates)
         
         return jsonify({
             'status': 'success',
             'weekData': {
                 'week': week_num,
-                'dateRange': f"{year}-{month:02d}-{week_start:02d} to {year}-{month:02d}-{week_end:02d}",
-                'revenue': week_revenue,
-                'orders': week_orders,
+                'dateRange': f"{start.isoformat()} to {end.isoformat()}",
+                'revenue': week_sales['revenue'],
+                'orders': week_sales['orders'],
                 'dailyBreakdown': daily_breakdown
             },
             'popularItems': popular_items
@@ -391,69 +1518,55 @@ def get_week_sales():
         }), 500
 
 @app.route('/api/sales/month', methods=['GET'])
+@cached_response('sales')
 def get_month_sales():
-    """Get monthly sales summary"""
+    """Get monthly sales summary (current month unless month/year are given)"""
     try:
-        sales = load_sales()
-        orders = load_orders()
-        
-        # Get month parameter or use current month
-        month = request.args.get('month', type=int)
-        now = datetime.now()
-        year = now.year
-        
-        if not month:
-            month = now.month
-        elif month < 1 or month > 12:
+        selected_month = requested_month()
+        if not selected_month:
             return jsonify({
                 'status': 'error',
                 'message': 'Invalid month parameter'
             }), 400
+        year, month = selected_month
         
-        # Get month name
-        from calendar import month_name as month_names
+        sales = load_sales()
         month_name = f"{month_names[month]} {year}"
         
-        # Calculate monthly totals
-        month_revenue = 0
-        month_orders = 0
-        weekly_breakdown = []
+        # Monthly totals are a single rollup row
+        month_sales = sales.get('sales_by_month', {}).get(
+            f"{year}-{month:02d}", {'revenue': 0, 'orders': 0}
+        )
         
-        # Calculate sales for each week
-        from calendar import monthrange
+        # Calculate sales for each week (days 1-7, 8-14, ... up to the 31st)
         days_in_month = monthrange(year, month)[1]
+        weekly_breakdown = []
         
-        for week in range(1, 5):  # 4 weeks
+        for week in range(1, (days_in_month + 6) // 7 + 1):
             week_start = ((week - 1) * 7) + 1
             week_end = min(week * 7, days_in_month)
-            
-            week_revenue = 0
-            week_orders = 0
-            
-            for day in range(week_start, week_end + 1):
-                date_str = f"{year}-{month:02d}-{day:02d}"
-                day_sales = sales['sales_by_date'].get(date_str, {'revenue': 0, 'orders': 0})
-                week_revenue += day_sales['revenue']
-                week_orders += day_sales['orders']
-            
-            month_revenue += week_revenue
-            month_orders += week_orders
+            week_sales = range_totals(
+                sales,
+                parse_day(f"{year}-{month:02d}-{week_start:02d}"),
+                parse_day(f"{year}-{month:02d}-{week_end:02d}")
+            )
             
             weekly_breakdown.append({
                 'week': week,
-                'revenue': week_revenue,
-                'orders': week_orders
+                'revenue': week_sales['revenue'],
+                'orders': week_sales['orders']
             })
         
-        # Get popular items
-        popular_items = get_popular_items_data(orders)
+        # Get the month's popular items
+        month_dates = [f"{year}-{month:02d}-{day:02d}" for day in range(1, days_in_month + 1)]
+        popular_items = get_popular_items_data(sales, month_dates)
         
         return jsonify({
             'status': 'success',
             'monthData': {
                 'month': month_name,
-                'revenue': month_revenue,
-                'orders': month_orders,
+                'revenue': month_sales['revenue'],
+                'orders': month_sales['orders'],
                 'weeklyBreakdown': weekly_breakdown
             },
             'popularItems': popular_items
@@ -464,6 +1577,60 @@ def get_month_sales():
             'message': str(e)
         }), 500
 
+@app.route('/api/sales/range', methods=['GET'])
+@cached_response('sales')
+def get_range_sales():
+    """
+    Sales for any date range, answered from the day/week/month/year rollups
+    Query params: from, to (YYYY-MM-DD, inclusive; default: first/last day with sales),
+    by (day, week, month or year) for a breakdown
+    """
+    try:
+        start = request.args.get('from')
+        end = request.args.get('to')
+        group_by = request.args.get('by')
+        
+        invalid = find_invalid_date(start, end)
+        if invalid:
+            return jsonify({
+                'status': 'error',
+                'message': f'Invalid date: {invalid} (expected YYYY-MM-DD)'
+            }), 400
+        if group_by and group_by not in LEVELS:
+            return jsonify({
+                'status': 'error',
+                'message': f"Invalid by parameter (expected one of: {', '.join(LEVELS)})"
+            }), 400
+        
+        sales = load_sales()
+        sold_days = sorted(sales['sales_by_date'])
+        start = start or (sold_days[0] if sold_days else datetime.now().strftime('%Y-%m-%d'))
+        end = end or (sold_days[-1] if sold_days else start)
+        
+        range_sales = range_totals(sales, parse_day(start), parse_day(end))
+        range_data = {
+            'from': start,
+            'to': end,
+            'revenue': range_sales['revenue'],
+            'orders': range_sales['orders']
+        }
+        if group_by:
+            range_data['breakdown'] = breakdown(sales, parse_day(start), parse_day(end), group_by)
+        
+        # Only days that had sales can have popular items
+        range_dates = [day for day in sales.get('items_by_date', {}) if start <= day <= end]
+        
+        return jsonify({
+            'status': 'success',
+            'rangeData': range_data,
+            'popularItems': get_popular_items_data(sales, range_dates)
+        })
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
 # ============================================
 # REFUND ROUTE
 # ============================================
@@ -482,36 +1649,35 @@ def refund_order(order_id):
                 'message': 'Invalid manager password'
             }), 403
         
-        # Load orders and find the one to refund
-        orders = load_orders()
-        order = next((o for o in orders if o.get('orderId') == order_id), None)
-        
-        if not order:
-            return jsonify({
-                'status': 'error',
-                'message': 'Order not found'
-            }), 404
-        
-        # Mark as refunded
-        order['refunded'] = True
-        order['refundedAt'] = datetime.now().isoformat()
-        order['refundedBy'] = data.get('userRole', 'Manager')
-        
-        # Save updated orders
-        save_orders(orders)
-        
-        # Update sales statistics
-        sales = load_sales()
-        sales['total_sales'] -= order.get('total', 0)
-        sales['total_orders'] -= 1
-        
-        # Update date-specific sales
-        date = order.get('timestamp', '').split(',')[0]  # Extract date from timestamp
-        if date in sales['sales_by_date']:
-            sales['sales_by_date'][date]['revenue'] -= order.get('total', 0)
-            sales['sales_by_date'][date]['orders'] -= 1
-        
-        save_sales(sales)
+        with locked('orders', 'sales'):
+            # Find the order to refund
+            order = find_order(order_id)
+            
+            if not order:
+                return jsonify({
+                    'status': 'error',
+                    'message': 'Order not found'
+                }), 404
+
+            # Already taken out of the sales statistics once
+            if order.get('refunded'):
+                return jsonify({
+                    'status': 'error',
+                    'message': 'Order already refunded'
+                }), 409
+
+            # Mark as refunded
+            order['refunded'] = True
+            order['refundedAt'] = datetime.now().isoformat()
+            order['refundedBy'] = data.get('userRole', 'Manager')
+            
+            # Save updated order
+            update_order(order)
+            
+            # Update sales statistics
+            sales = load_sales()
+            remove_order_from_sales(sales, order)
+            save_sales(sales)
         
         return jsonify({
             'status': 'success',
@@ -538,15 +1704,10 @@ def create_ticket():
         now = datetime.now().isoformat()
 
         ticket = {
-            'ticketId': f"TKT-{int(datetime.now().timestamp() * 1000)}",
+            'ticketId': ids.new('TKT'),
             'items': [
-                {
-                    'id': item.get('id'),  # Save ID so we can look up price later
-                    'name': item.get('name'),
-                    'quantity': item.get('quantity', 1),
-                    'sentAt': now
-                }
-                for item in data.get('items', [])
+                dict(line, sentAt=now)  # Catalog id/version: price and details are looked up later
+                for line in compact_lines(data.get('items'))
             ],
             'createdAt': now,
             'status': 'open',
@@ -554,9 +1715,7 @@ def create_ticket():
             'sentBy': data.get('sentBy', 'Employee')
         }
 
-        tickets = load_tickets()
-        tickets.append(ticket)
-        save_tickets(tickets)
+        ticket_writer.submit(ticket)
 
         return jsonify({
             'status': 'success',
@@ -568,17 +1727,66 @@ def create_ticket():
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 @app.route('/api/tickets', methods=['GET'])
+@cached_response('tickets', 'menu')
 def get_tickets():
-    """Get all tickets, optionally filtered by status"""
+    """Get all tickets, optionally filtered by status (items=full: full menu details)"""
     try:
-        tickets = load_tickets()
+        # Read the version first so no change can slip in unseen
+        version = ticket_feed.version
         status_filter = request.args.get('status')
 
-        if status_filter:
-            tickets = [t for t in tickets if t.get('status') == status_filter]
+        if status_filter == 'open':
+            # Served from memory - history is never touched
+            tickets = active_tickets.tickets()
+        else:
+            tickets = load_tickets()
+            if status_filter:
+                tickets = [t for t in tickets if t.get('status') == status_filter]
+
+        if wants_full_items():
+            tickets = [with_full_items(t) for t in tickets]
+
+        return jsonify({
+            'status': 'success',
+            'count': len(tickets),
+            'tickets': tickets,
+            'version': version
+        })
+
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+# Longest a client may hold a changes/stream request open between updates
+TICKET_FEED_MAX_WAIT = 30
+
+def get_ticket_changes(since):
+    """Tickets changed after version `since`, from memory or (if too old) storage"""
+    changes = ticket_feed.changes_since(since)
+    if changes is None:
+        changes = [t for t in iter_tickets() if t.get('version', 0) > since]
+    return changes
+
+@app.route('/api/tickets/changes', methods=['GET'])
+def get_ticket_changes_route():
+    """
+    Get tickets changed since a feed version (long-poll)
+    Query params:
+    - since: last version the client has seen (from GET /api/tickets or a previous call)
+    - wait: seconds to wait for a change if there is none yet (max 30, default 0)
+    """
+    try:
+        since = request.args.get('since', 0, type=int)
+        wait = min(request.args.get('wait', 0, type=float), TICKET_FEED_MAX_WAIT)
+
+        if wait > 0:
+            ticket_feed.wait(since, wait)
+
+        version = ticket_feed.version
+        tickets = get_ticket_changes(since)
 
         return jsonify({
             'status': 'success',
+            'version': version,
             'count': len(tickets),
             'tickets': tickets
         })
@@ -586,14 +1794,47 @@ def get_tickets():
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+@app.route('/api/tickets/stream', methods=['GET'])
+def stream_ticket_changes():
+    """
+    Server-Sent Events stream of ticket changes
+    Query params:
+    - since: last version the client has seen
+    Each event's id is the feed version and its data is {version, tickets}.
+    """
+    since = request.args.get('since', 0, type=int)
+    last_event_id = request.headers.get('Last-Event-ID')
+    if last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)  # Browser reconnecting after a drop
+
+    def generate():
+        last_seen = since
+        while True:
+            if ticket_feed.wait(last_seen, TICKET_FEED_MAX_WAIT):
+                version = ticket_feed.version
+                tickets = get_ticket_changes(last_seen)
+                last_seen = version
+                data = serializer.dumps_text({'version': version, 'tickets': tickets})
+                yield f"id: {version}\nevent: tickets\ndata: {data}\n\n"
+            else:
+                yield ': keep-alive\n\n'
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/api/tickets/<ticket_id>', methods=['GET'])
+@cached_response('tickets', 'menu')
 def get_ticket(ticket_id):
-    """Get a single ticket with full detail"""
+    """Get a single ticket with full detail (items=full: lines with full menu details)"""
     try:
-        tickets = load_tickets()
-        ticket = next((t for t in tickets if t.get('ticketId') == ticket_id), None)
+        ticket = find_ticket(ticket_id)
 
         if ticket:
+            if wants_full_items():
+                ticket = with_full_items(ticket)
             return jsonify({'status': 'success', 'ticket': ticket})
         else:
             return jsonify({'status': 'error', 'message': 'Ticket not found'}), 404
@@ -605,15 +1846,15 @@ def get_ticket(ticket_id):
 def close_ticket(ticket_id):
     """Close a kitchen ticket (called when order is paid)"""
     try:
-        tickets = load_tickets()
-        ticket = next((t for t in tickets if t.get('ticketId') == ticket_id), None)
+        with locked('tickets'):
+            ticket = find_ticket(ticket_id)
 
-        if not ticket:
-            return jsonify({'status': 'error', 'message': 'Ticket not found'}), 404
+            if not ticket:
+                return jsonify({'status': 'error', 'message': 'Ticket not found'}), 404
 
-        ticket['status'] = 'closed'
-        ticket['closedAt'] = datetime.now().isoformat()
-        save_tickets(tickets)
+            ticket['status'] = 'closed'
+            ticket['closedAt'] = datetime.now().isoformat()
+            update_ticket(ticket)
 
         return jsonify({
             'status': 'success',
@@ -640,38 +1881,36 @@ def void_ticket_item(ticket_id):
         if item_index is None:
             return jsonify({'status': 'error', 'message': 'itemIndex required'}), 400
 
-        tickets = load_tickets()
-        ticket = next((t for t in tickets if t.get('ticketId') == ticket_id), None)
+        with locked('tickets', 'voids'):
+            ticket = find_ticket(ticket_id)
 
-        if not ticket:
-            return jsonify({'status': 'error', 'message': 'Ticket not found'}), 404
+            if not ticket:
+                return jsonify({'status': 'error', 'message': 'Ticket not found'}), 404
 
-        if item_index < 0 or item_index >= len(ticket['items']):
-            return jsonify({'status': 'error', 'message': 'Invalid item index'}), 400
+            if item_index < 0 or item_index >= len(ticket['items']):
+                return jsonify({'status': 'error', 'message': 'Invalid item index'}), 400
 
-        voided_item = ticket['items'].pop(item_index)
-        now = datetime.now().isoformat()
+            voided_item = ticket['items'].pop(item_index)
+            now = datetime.now().isoformat()
 
-        # Log the void
-        voids = load_voids()
-        voids.append({
-            'voidId': f"VOID-{int(datetime.now().timestamp() * 1000)}",
-            'type': 'item',
-            'ticketId': ticket_id,
-            'item': voided_item,
-            'voidedAt': now,
-            'voidedBy': data.get('voidedBy', 'Manager'),
-            'originalSentBy': ticket.get('sentBy', 'Unknown'),
-            'reason': data.get('reason', '')
-        })
-        save_voids(voids)
+            # Log the void
+            append_void({
+                'voidId': ids.new('VOID'),
+                'type': 'item',
+                'ticketId': ticket_id,
+                'item': voided_item,
+                'voidedAt': now,
+                'voidedBy': data.get('voidedBy', 'Manager'),
+                'originalSentBy': ticket.get('sentBy', 'Unknown'),
+                'reason': data.get('reason', '')
+            })
 
-        # If no items left, void the whole ticket
-        if len(ticket['items']) == 0:
-            ticket['status'] = 'voided'
-            ticket['voidedAt'] = now
+            # If no items left, void the whole ticket
+            if len(ticket['items']) == 0:
+                ticket['status'] = 'voided'
+                ticket['voidedAt'] = now
 
-        save_tickets(tickets)
+            update_ticket(ticket)
 
         return jsonify({
             'status': 'success',
@@ -690,31 +1929,29 @@ def void_ticket(ticket_id):
         if data.get('managerPassword') != 'admin123':
             return jsonify({'status': 'error', 'message': 'Invalid manager password'}), 403
 
-        tickets = load_tickets()
-        ticket = next((t for t in tickets if t.get('ticketId') == ticket_id), None)
+        with locked('tickets', 'voids'):
+            ticket = find_ticket(ticket_id)
 
-        if not ticket:
-            return jsonify({'status': 'error', 'message': 'Ticket not found'}), 404
+            if not ticket:
+                return jsonify({'status': 'error', 'message': 'Ticket not found'}), 404
 
-        now = datetime.now().isoformat()
+            now = datetime.now().isoformat()
 
-        # Log the void
-        voids = load_voids()
-        voids.append({
-            'voidId': f"VOID-{int(datetime.now().timestamp() * 1000)}",
-            'type': 'ticket',
-            'ticketId': ticket_id,
-            'items': ticket.get('items', []),
-            'voidedAt': now,
-            'voidedBy': data.get('voidedBy', 'Manager'),
-            'originalSentBy': ticket.get('sentBy', 'Unknown'),
-            'reason': data.get('reason', '')
-        })
-        save_voids(voids)
+            # Log the void
+            append_void({
+                'voidId': ids.new('VOID'),
+                'type': 'ticket',
+                'ticketId': ticket_id,
+                'items': ticket.get('items', []),
+                'voidedAt': now,
+                'voidedBy': data.get('voidedBy', 'Manager'),
+                'originalSentBy': ticket.get('sentBy', 'Unknown'),
+                'reason': data.get('reason', '')
+            })
 
-        ticket['status'] = 'voided'
-        ticket['voidedAt'] = now
-        save_tickets(tickets)
+            ticket['status'] = 'voided'
+            ticket['voidedAt'] = now
+            update_ticket(ticket)
 
         return jsonify({
             'status': 'success',
@@ -726,6 +1963,7 @@ def void_ticket(ticket_id):
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 @app.route('/api/voids', methods=['GET'])
+@cached_response('voids')
 def get_voids():
     """Get all void records (manager only)"""
     try:
@@ -738,6 +1976,110 @@ def get_voids():
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+# ============================================
+# EXPORT ROUTES
+# ============================================
+
+def items_summary(items):
+    """One-line item list for CSV exports, e.g. '2x Mofongo; 1x Flan'"""
+    return '; '.join(f"{item.get('quantity', 1)}x {item.get('name')}" for item in items or [])
+
+# dataset -> (CSV columns, function turning a record into a CSV row)
+EXPORT_COLUMNS = {
+    'orders': (
+        ['orderId', 'salesDate', 'timestamp', 'items', 'subtotal', 'tax', 'tip', 'total',
+         'paymentMethod', 'refunded', 'refundedAt'],
+        lambda o: [o.get('orderId'), order_sales_date(o), o.get('timestamp'),
+                   items_summary(o.get('items')), o.get('subtotal'), o.get('tax'), o.get('tip'),
+                   o.get('total'), o.get('paymentMethod'), bool(o.get('refunded')), o.get('refundedAt')]
+    ),
+    'tickets': (
+        ['ticketId', 'createdAt', 'status', 'closedAt', 'voidedAt', 'sentBy', 'items'],
+        lambda t: [t.get('ticketId'), t.get('createdAt'), t.get('status'), t.get('closedAt'),
+                   t.get('voidedAt'), t.get('sentBy'), items_summary(t.get('items'))]
+    ),
+    'voids': (
+        ['voidId', 'type', 'ticketId', 'voidedAt', 'voidedBy', 'originalSentBy', 'reason', 'items'],
+        lambda v: [v.get('voidId'), v.get('type'), v.get('ticketId'), v.get('voidedAt'),
+                   v.get('voidedBy'), v.get('originalSentBy'), v.get('reason'),
+                   items_summary([v['item']] if v.get('item') else v.get('items'))]
+    ),
+}
+
+def iter_export_records(dataset, start, end):
+    """Yield the records of a dataset dated start..end (YYYY-MM-DD, inclusive)"""
+    if dataset == 'orders':
+        orders = order_index.orders()
+        for position in order_index.positions_between(start, end):
+            yield orders[position]
+        return
+
+    if dataset == 'tickets':
+        records, date_field = iter_tickets(), 'createdAt'
+    else:
+        records, date_field = iter_voids(), 'voidedAt'
+
+    for record in records:
+        date = (record.get(date_field) or '')[:10]
+        if (start and date < start) or (end and date > end):
+            continue
+        yield record
+
+@app.route('/api/export/<dataset>', methods=['GET'])
+def export_dataset(dataset):
+    """
+    Stream orders, tickets or voids for accounting
+    Optional query params:
+    - format: 'ndjson' (default) or 'csv'
+    - from / to: only records from this range of days (YYYY-MM-DD, inclusive)
+    """
+    if dataset not in EXPORT_COLUMNS:
+        return jsonify({'status': 'error', 'message': f"Unknown dataset '{dataset}'"}), 404
+
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({'status': 'error', 'message': 'format must be ndjson or csv'}), 400
+
+    start = request.args.get('from')
+    end = request.args.get('to')
+    invalid = find_invalid_date(start, end)
+    if invalid:
+        return jsonify({
+            'status': 'error',
+            'message': f"Invalid date '{invalid}' (expected YYYY-MM-DD)"
+        }), 400
+
+    records = iter_export_records(dataset, start, end)
+
+    def generate_ndjson():
+        for record in records:
+            yield serializer.dumps(record) + b'\n'
+
+    def generate_csv():
+        columns, to_row = EXPORT_COLUMNS[dataset]
+        line = io.StringIO()
+        writer = csv.writer(line)
+        writer.writerow(columns)
+        for record in records:
+            writer.writerow(to_row(record))
+            yield line.getvalue()
+            line.seek(0)
+            line.truncate()
+        # Header only if there were no records
+        yield line.getvalue()
+
+    if export_format == 'csv':
+        body, mimetype = generate_csv(), 'text/csv'
+    else:
+        body, mimetype = generate_ndjson(), 'application/x-ndjson'
+
+    filename = f"coqui-{dataset}-{datetime.now().strftime('%Y-%m-%d')}.{export_format}"
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
 # ============================================
 # AI ASSISTANT - COQUITO
 # ============================================
@@ -907,11 +2249,12 @@ def get_fallback_response(message, user_role='Employee'):
 # ============================================
 
 @app.route('/api/analytics/popular-items', methods=['GET'])
+@cached_response('sales')
 def get_popular_items():
     """Get most popular menu items"""
     try:
-        orders = load_orders()
-        popular_items = get_popular_items_data(orders)
+        sales = load_sales()
+        popular_items = get_popular_items_data(sales)
         
         return jsonify({
             'status': 'success',
@@ -924,6 +2267,289 @@ def get_popular_items():
             'message': str(e)
         }), 500
 
+# ============================================
+# SALES ANALYTICS
+# ============================================
+
+def shift_years(date_str, years):
+    """Move a YYYY-MM-DD date by whole years (Feb 29 becomes Feb 28)"""
+    day = datetime.strptime(date_str, '%Y-%m-%d')
+    try:
+        return day.replace(year=day.year + years).strftime('%Y-%m-%d')
+    except ValueError:
+        return day.replace(year=day.year + years, day=28).strftime('%Y-%m-%d')
+
+@metrics.timed
+def analytics_report(columns, start, end, group_by):
+    """Totals, breakdown and top items for the orders sold start..end"""
+    mask = columns.select(start, end)
+    return {
+        'from': start,
+        'to': end,
+        'totals': columns.totals(mask),
+        'breakdown': columns.group(mask, group_by),
+        'paymentMethods': columns.payment_breakdown(mask),
+        'popularItems': columns.top_items(mask)
+    }
+
+@app.route('/api/analytics/heatmap', methods=['GET'])
+@cached_response('sales')
+def get_sales_heatmap():
+    """Revenue and orders by weekday and hour of day (for staffing)"""
+    try:
+        sales_by_hour = load_sales().get('sales_by_hour') or empty_sales_by_hour()
+        
+        return jsonify({
+            'status': 'success',
+            'heatmap': {
+                'weekdays': list(WEEKDAY_NAMES),
+                'hours': list(range(24)),
+                'revenue': sales_by_hour['revenue'],
+                'orders': sales_by_hour['orders']
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@app.route('/api/analytics/sales', methods=['GET'])
+@cached_response('orders')
+def get_sales_analytics():
+    """
+    Sales over any date range, grouped by day, week, month, year, hour or weekday
+    Query params: from, to (YYYY-MM-DD, inclusive), by (default day),
+    compare=year (adds the same range one year earlier)
+    """
+    try:
+        if not sales_analytics.available:
+            return jsonify({
+                'status': 'error',
+                'message': 'Sales analytics requires NumPy (pip install -r requirements.txt)'
+            }), 501
+        
+        start = request.args.get('from')
+        end = request.args.get('to')
+        group_by = request.args.get('by', 'day')
+        compare = request.args.get('compare')
+        
+        invalid = find_invalid_date(start, end)
+        if invalid:
+            return jsonify({
+                'status': 'error',
+                'message': f'Invalid date: {invalid} (expected YYYY-MM-DD)'
+            }), 400
+        if group_by not in GROUPINGS:
+            return jsonify({
+                'status': 'error',
+                'message': f"Invalid by parameter (expected one of: {', '.join(GROUPINGS)})"
+            }), 400
+        if compare and (compare != 'year' or not start or not end):
+            return jsonify({
+                'status': 'error',
+                'message': 'compare=year needs both from and to'
+            }), 400
+        
+        columns = sales_analytics.columns()
+        report = analytics_report(columns, start, end, group_by)
+        report['by'] = group_by
+        
+        if compare:
+            report['previousYear'] = analytics_report(
+                columns, shift_years(start, -1), shift_years(end, -1), group_by
+            )
+        
+        return jsonify({
+            'status': 'success',
+            'analytics': report
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+# ============================================
+# METRICS
+# ============================================
+
+if metrics.enabled:
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request_time(response):
+        started = g.pop('request_started', None)
+        if started is not None:
+            # The route pattern, not the path, so IDs don't each get a series
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            metrics.observe_request(request.method, route, response.status_code,
+                                    time.perf_counter() - started)
+        return response
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Request, storage and aggregation metrics in Prometheus text format"""
+    if not metrics.enabled:
+        return jsonify({
+            'status': 'error',
+            'message': 'Metrics are disabled (set COQUI_METRICS=1)'
+        }), 404
+    
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+# ============================================
+# SLOW REQUEST PROFILING
+# ============================================
+
+slow_profiler = SlowRequestProfiler(
+    PROFILES_DIR, PROFILE_SLOW_MS / 1000, keep=PROFILE_KEEP,
+    source_dir=os.path.dirname(os.path.abspath(__file__))
+) if PROFILE_SLOW_MS > 0 else None
+
+def dataset_sizes():
+    """Record counts a slow request profile is saved with"""
+    return {
+        'orders': len(order_index.orders()),
+        'openTickets': len(active_tickets.tickets())
+    }
+
+if slow_profiler:
+    @app.before_request
+    def start_profiling():
+        g.profile = slow_profiler.start()
+
+    @app.after_request
+    def save_slow_profile(response):
+        token = g.pop('profile', None)
+        if token is not None:
+            samples, elapsed = slow_profiler.stop(token)
+            if elapsed >= slow_profiler.threshold:
+                slow_profiler.record({
+                    'method': request.method,
+                    'route': request.url_rule.rule if request.url_rule else None,
+                    'path': request.path,
+                    'query': {k: v for k, v in request.args.items() if k != 'managerPassword'},
+                    'status': response.status_code,
+                    'datasets': dataset_sizes()
+                }, samples, elapsed)
+        return response
+
+    @app.teardown_request
+    def stop_profiling(error=None):
+        # after_request is skipped when a route raises
+        token = g.pop('profile', None)
+        if token is not None:
+            slow_profiler.stop(token)
+
+def manager_header_valid():
+    """Whether a GET request carries the manager password (X-Manager-Password)"""
+    return request.headers.get('X-Manager-Password') == 'admin123'
+
+@app.route('/api/profiles', methods=['GET'])
+def get_profiles():
+    """
+    Slow requests recorded by the profiler, newest first (manager only)
+    Query params: limit (default 50)
+    """
+    try:
+        if not manager_header_valid():
+            return jsonify({'status': 'error', 'message': 'Invalid manager password'}), 403
+        if not slow_profiler:
+            return jsonify({
+                'status': 'error',
+                'message': 'Profiling is disabled (set COQUI_PROFILE_SLOW_MS)'
+            }), 404
+        
+        limit = request.args.get('limit', 50, type=int)
+        profiles = slow_profiler.profiles(limit)
+        
+        return jsonify({
+            'status': 'success',
+            'thresholdMs': PROFILE_SLOW_MS,
+            'count': len(profiles),
+            'profiles': profiles
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@app.route('/api/profiles/<profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    """One slow request's top stacks and hot functions (manager only)"""
+    try:
+        if not manager_header_valid():
+            return jsonify({'status': 'error', 'message': 'Invalid manager password'}), 403
+        
+        profile = slow_profiler.get(profile_id) if slow_profiler else None
+        if profile is None:
+            return jsonify({'status': 'error', 'message': 'Profile not found'}), 404
+        
+        return jsonify({
+            'status': 'success',
+            'profile': profile
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+# ============================================
+# MAINTENANCE COMMANDS
+# ============================================
+
+@app.cli.command('compact-orders')
+def compact_orders_command():
+    """Fold the order journal into orders.json (flask --app app compact-orders)"""
+    pending = order_journal.record_count if order_journal else 0
+    compact_orders()
+    print(f'🐸 Compacted {pending} journaled orders')
+
+@app.cli.command('rebuild-item-counts')
+def rebuild_item_counts_command():
+    """Recompute the popular items tally from orders (flask --app app rebuild-item-counts)"""
+    item_counts = rebuild_item_counts()
+    print(f'🐸 Rebuilt popular items tally for {len(item_counts)} menu items')
+
+@app.cli.command('compact-order-lines')
+def compact_order_lines_command():
+    """Store older orders' lines compactly (flask --app app compact-order-lines)"""
+    with locked('orders'):
+        orders = load_orders()
+        compacted = [dict(o, items=compact_lines(o.get('items'))) for o in orders]
+        save_orders(compacted)
+    print(f'🐸 Compacted the lines of {len(compacted)} orders '
+          f'({len(serializer.dumps(orders)) // 1024} KB -> {len(serializer.dumps(compacted)) // 1024} KB)')
+
+@app.cli.command('import-json')
+def import_json_command():
+    """Copy the JSON files into Coqui.db (flask --app app import-json)"""
+    store = db or SQLiteStore(DATABASE_FILE)
+    # Whatever the current mode, the JSON data includes any journaled
+    # orders and archived tickets (sales.json already counts them)
+    journal = order_journal or (
+        OrderJournal(ORDERS_JOURNAL_DIR) if os.path.isdir(ORDERS_JOURNAL_DIR) else None)
+    archive = ticket_archive or (
+        TicketArchive(TICKETS_ARCHIVE_DIR) if os.path.isdir(TICKETS_ARCHIVE_DIR) else None)
+    with locked('menu', 'orders', 'sales', 'tickets', 'voids'):
+        store.save('orders', read_json_orders(journal))
+        open_tickets = read_json_file(TICKETS_FILE, [])
+        store.save('tickets', with_archived_tickets(open_tickets, archive) if archive else open_tickets)
+        store.save('voids', read_json_file(VOIDS_FILE, []))
+        store.save_document('sales', read_json_file(SALES_FILE, empty_sales()))
+        store.save_document('menu', read_json_file(MENU_FILE, empty_menu()))
+    print(f"🐸 Imported {store.count('orders')} orders, {store.count('tickets')} tickets "
+          f"and {store.count('voids')} voids into {DATABASE_FILE}")
+
 # ============================================
 # RUN SERVER
 # ============================================
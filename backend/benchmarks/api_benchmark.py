@@ -0,0 +1,114 @@
+# ============================================
+# COQUI POS - API BENCHMARK (FLASK TEST CLIENT)
+# ============================================
+# Seeds a synthetic history, then times every main API
+# operation in-process through the Flask test client
+# (no network), one request at a time. Throughput here is
+# for a single caller; see load_test.py for concurrency.
+#
+#   cd backend && python benchmarks/api_benchmark.py --orders 10000 --storage json
+
+import argparse
+import time
+
+from harness import cleanup_environment, load_app, prepare_environment, print_report
+from synthetic import MENU
+
+MANAGER = {'managerPassword': 'admin123'}
+
+
+def new_order(number):
+    """A small order as the register would send it"""
+    item = dict(MENU[number % len(MENU)], quantity=1)
+    return {
+        'orderId': f'BENCH-{number}',
+        'items': [item],
+        'subtotal': item['price'],
+        'tax': 0,
+        'tip': 0,
+        'total': item['price'],
+        'paymentMethod': 'card',
+        'timestamp': time.strftime('%m/%d/%Y, %I:%M:%S %p'),
+    }
+
+
+def run(client, iterations):
+    """Time each operation `iterations` times; returns {operation: [seconds]}"""
+    results = {}
+
+    def timed(name, call, expected=(200, 201)):
+        start = time.perf_counter()
+        response = call()
+        results.setdefault(name, []).append(time.perf_counter() - start)
+        if response.status_code not in expected:
+            raise RuntimeError(f'{name}: HTTP {response.status_code} {response.get_data(as_text=True)[:200]}')
+        return response
+
+    order_ids = []
+    for i in range(iterations):
+        order = new_order(i)
+        timed('POST /api/orders', lambda: client.post('/api/orders', json=order))
+        order_ids.append(order['orderId'])
+
+    for i in range(iterations):
+        timed('GET /api/orders?limit=50', lambda: client.get('/api/orders?limit=50'))
+        timed('GET /api/orders?from&to (1 week)',
+              lambda: client.get('/api/orders?from=2025-06-01&to=2025-06-07'))
+        timed('GET /api/orders/:id', lambda: client.get(f'/api/orders/{order_ids[i]}'))
+
+    for order_id in order_ids:
+        timed('POST /api/orders/:id/refund',
+              lambda: client.post(f'/api/orders/{order_id}/refund', json=MANAGER))
+
+    for i in range(iterations):
+        ticket = timed('POST /api/tickets', lambda: client.post('/api/tickets', json={
+            'items': [dict(MENU[0], quantity=1), dict(MENU[1], quantity=2)], 'sentBy': 'Employee'
+        })).get_json()
+        ticket_id = ticket['ticketId']
+        timed('GET /api/tickets?status=open', lambda: client.get('/api/tickets?status=open'))
+        if i % 3 == 0:
+            timed('PATCH /api/tickets/:id/void-item', lambda: client.patch(
+                f'/api/tickets/{ticket_id}/void-item', json=dict(MANAGER, itemIndex=0)))
+        if i % 3 == 1:
+            timed('PATCH /api/tickets/:id/void', lambda: client.patch(
+                f'/api/tickets/{ticket_id}/void', json=MANAGER))
+        else:
+            timed('PATCH /api/tickets/:id/close', lambda: client.patch(
+                f'/api/tickets/{ticket_id}/close'))
+
+    sales_routes = [
+        '/api/sales/stats',
+        '/api/sales/today',
+        '/api/sales/day?day=15',
+        '/api/sales/week?week=2',
+        '/api/sales/month?month=6&year=2025',
+        '/api/sales/range?from=2025-01-01&to=2025-12-31&by=month',
+    ]
+    for i in range(iterations):
+        for route in sales_routes:
+            timed(f'GET {route.split("?")[0]}', lambda: client.get(route))
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time the Coqui POS API through the Flask test client')
+    parser.add_argument('--orders', type=int, default=10000, help='orders (and tickets) to seed')
+    parser.add_argument('--storage', choices=('json', 'journal', 'sqlite'), default='json')
+    parser.add_argument('--iterations', type=int, default=200, help='requests per operation')
+    parser.add_argument('--no-cache', action='store_true', help='turn the GET response cache off')
+    args = parser.parse_args()
+
+    data_dir = prepare_environment(args.orders, args.storage, cache=not args.no_cache)
+    try:
+        started = time.perf_counter()
+        coqui = load_app()
+        print(f'🐸 Seeded {args.orders} orders ({args.storage} storage), '
+              f'startup {time.perf_counter() - started:.2f}s')
+        print_report(run(coqui.app.test_client(), args.iterations))
+    finally:
+        cleanup_environment(data_dir)
+
+
+if __name__ == '__main__':
+    main()
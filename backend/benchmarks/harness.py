@@ -0,0 +1,73 @@
+# ============================================
+# COQUI POS - BENCHMARK HARNESS
+# ============================================
+# Shared by the benchmarks: points the backend at a
+# throwaway data directory seeded with a synthetic
+# history (never backend/database), loads the app, and
+# summarizes latencies as percentiles.
+
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, BACKEND_DIR)
+
+from synthetic import seed_data_dir
+
+
+def prepare_environment(orders, storage='json', cache=True):
+    """Seed a temporary data directory and configure the backend to use it"""
+    data_dir = tempfile.mkdtemp(prefix='coqui-bench-')
+    seed_data_dir(data_dir, orders)
+    os.environ['COQUI_DATA_DIR'] = data_dir
+    os.environ['COQUI_STORAGE'] = storage
+    if not cache:
+        os.environ['COQUI_RESPONSE_CACHE_SIZE'] = '0'
+    return data_dir
+
+
+def cleanup_environment(data_dir):
+    """Delete a directory made by prepare_environment"""
+    shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def load_app():
+    """Import the backend (after prepare_environment) with the seeded data loaded"""
+    import app as coqui
+
+    if coqui.db and not coqui.db.count('orders'):
+        # SQLite mode starts from the seeded JSON files
+        result = coqui.app.test_cli_runner().invoke(args=['import-json'])
+        if result.exit_code:
+            raise RuntimeError(f'import-json failed: {result.output}')
+        coqui.upgrade_sales()
+    return coqui
+
+
+def percentiles(latencies):
+    """p50/p95/p99 (milliseconds) of a list of latencies in seconds"""
+    if len(latencies) < 2:
+        value = latencies[0] * 1000 if latencies else 0
+        return value, value, value
+    cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+    return cuts[49] * 1000, cuts[94] * 1000, cuts[98] * 1000
+
+
+def print_report(results, elapsed=None):
+    """
+    Print a latency table. results: {operation: [latency seconds, ...]};
+    with elapsed (seconds of wall time) throughput is shown per operation
+    """
+    print(f"{'operation':<40}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>10}")
+    total = 0
+    for name, latencies in results.items():
+        p50, p95, p99 = percentiles(latencies)
+        span = elapsed or sum(latencies)
+        rate = len(latencies) / span if span else 0
+        total += len(latencies)
+        print(f'{name:<40}{len(latencies):>8}{p50:>10.2f}{p95:>10.2f}{p99:>10.2f}{rate:>10.0f}')
+    if elapsed:
+        print(f'{"total":<40}{total:>8}{"":>30}{total / elapsed:>10.0f}')
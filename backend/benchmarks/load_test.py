@@ -0,0 +1,230 @@
+# ============================================
+# COQUI POS - HTTP LOAD TEST
+# ============================================
+# Many simulated registers and kitchen screens hitting a
+# running backend at once, over real HTTP (keep-alive
+# connections, one per worker thread), with a rush-hour
+# mix of orders, refunds, tickets and dashboard polls.
+#
+# Without --url it seeds a synthetic history and starts a
+# local threaded server for the run:
+#
+#   cd backend && python benchmarks/load_test.py --orders 10000 --concurrency 16 --duration 10
+#
+# or point it at a server you started yourself (e.g. under
+# gunicorn with several workers). It writes orders and
+# tickets, so never aim it at real data:
+#
+#   python benchmarks/load_test.py --url http://127.0.0.1:8000
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+from harness import cleanup_environment, prepare_environment, print_report
+from synthetic import MENU
+
+MANAGER = {'managerPassword': 'admin123'}
+
+# operation -> relative weight in the traffic mix
+MIX = {
+    'create_order': 20,
+    'refund_order': 2,
+    'get_orders': 8,
+    'ticket_lifecycle': 10,
+    'open_tickets': 20,
+    'sales_today': 15,
+    'sales_stats': 5,
+    'sales_week': 5,
+    'sales_month': 5,
+    'sales_range': 5,
+    'popular_items': 5,
+}
+
+
+class Register:
+    """One load-generating client with its own keep-alive connection"""
+
+    def __init__(self, host, port, number):
+        self.connection = http.client.HTTPConnection(host, port, timeout=30)
+        self.number = number
+        self.sequence = 0
+        self.my_orders = []
+        self.results = {}
+        self.errors = 0
+
+    def request(self, name, method, path, body=None):
+        """Send one request and record its latency under `name`"""
+        payload = json.dumps(body).encode('utf-8') if body is not None else None
+        headers = {'Content-Type': 'application/json'} if payload else {}
+        start = time.perf_counter()
+        try:
+            self.connection.request(method, path, body=payload, headers=headers)
+            response = self.connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            self.errors += 1
+            self.connection.close()  # Reconnects on the next request
+            return None
+        self.results.setdefault(name, []).append(time.perf_counter() - start)
+        if response.status >= 400:
+            self.errors += 1
+            return None
+        return json.loads(data) if data else {}
+
+    def create_order(self):
+        self.sequence += 1
+        order_id = f'LOAD-{self.number}-{self.sequence}'
+        item = dict(MENU[self.sequence % len(MENU)], quantity=1)
+        if self.request('POST /api/orders', 'POST', '/api/orders', {
+            'orderId': order_id, 'items': [item], 'subtotal': item['price'], 'tax': 0,
+            'tip': 0, 'total': item['price'], 'paymentMethod': 'card',
+            'timestamp': time.strftime('%m/%d/%Y, %I:%M:%S %p'),
+        }) is not None:
+            self.my_orders.append(order_id)
+
+    def refund_order(self):
+        if not self.my_orders:
+            return self.create_order()
+        order_id = self.my_orders.pop()
+        self.request('POST /api/orders/:id/refund', 'POST', f'/api/orders/{order_id}/refund', MANAGER)
+
+    def get_orders(self):
+        self.request('GET /api/orders?limit=50', 'GET', '/api/orders?limit=50')
+
+    def ticket_lifecycle(self):
+        ticket = self.request('POST /api/tickets', 'POST', '/api/tickets', {
+            'items': [dict(MENU[0], quantity=1), dict(MENU[5], quantity=1)], 'sentBy': 'Employee'
+        })
+        if not ticket:
+            return
+        ticket_id = ticket['ticketId']
+        if random.random() < 0.1:
+            self.request('PATCH /api/tickets/:id/void', 'PATCH', f'/api/tickets/{ticket_id}/void', MANAGER)
+        else:
+            self.request('PATCH /api/tickets/:id/close', 'PATCH', f'/api/tickets/{ticket_id}/close', {})
+
+    def open_tickets(self):
+        self.request('GET /api/tickets?status=open', 'GET', '/api/tickets?status=open')
+
+    def sales_today(self):
+        self.request('GET /api/sales/today', 'GET', '/api/sales/today')
+
+    def sales_stats(self):
+        self.request('GET /api/sales/stats', 'GET', '/api/sales/stats')
+
+    def sales_week(self):
+        self.request('GET /api/sales/week', 'GET', '/api/sales/week?week=2')
+
+    def sales_month(self):
+        self.request('GET /api/sales/month', 'GET', '/api/sales/month')
+
+    def sales_range(self):
+        self.request('GET /api/sales/range', 'GET', '/api/sales/range?from=2025-01-01&to=2025-12-31&by=month')
+
+    def popular_items(self):
+        self.request('GET /api/analytics/popular-items', 'GET', '/api/analytics/popular-items')
+
+    def run(self, deadline, seed):
+        """Send requests from the traffic mix until the deadline"""
+        rng = random.Random(seed)
+        names, weights = zip(*MIX.items())
+        while time.perf_counter() < deadline:
+            getattr(self, rng.choices(names, weights)[0])()
+        self.connection.close()
+
+
+def free_port():
+    """A TCP port nothing is listening on"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_local_server(port):
+    """Run the backend on a threaded local server in a child process"""
+    server = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve', str(port)])
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError('Local server exited during startup')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError('Local server did not start')
+
+
+def serve(port):
+    """Child process: serve the backend until killed"""
+    from werkzeug.serving import make_server
+    from harness import load_app
+
+    make_server('127.0.0.1', port, load_app().app, threaded=True).serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent HTTP load test for the Coqui POS API')
+    parser.add_argument('--url', help='server to test (default: start a local one on seeded data)')
+    parser.add_argument('--orders', type=int, default=10000, help='orders (and tickets) to seed')
+    parser.add_argument('--storage', choices=('json', 'journal', 'sqlite'), default='json')
+    parser.add_argument('--concurrency', type=int, default=16, help='simultaneous clients')
+    parser.add_argument('--duration', type=float, default=10, help='seconds of load')
+    parser.add_argument('--no-cache', action='store_true', help='turn the GET response cache off')
+    parser.add_argument('--serve', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        return serve(args.serve)
+
+    data_dir = server = None
+    try:
+        if args.url:
+            url = urlsplit(args.url)
+            host, port = url.hostname, url.port or 80
+        else:
+            data_dir = prepare_environment(args.orders, args.storage, cache=not args.no_cache)
+            host, port = '127.0.0.1', free_port()
+            server = start_local_server(port)
+            print(f'🐸 Local server on port {port}: {args.orders} seeded orders, {args.storage} storage')
+
+        registers = [Register(host, port, number) for number in range(args.concurrency)]
+        deadline = time.perf_counter() + args.duration
+        threads = [
+            threading.Thread(target=register.run, args=(deadline, number))
+            for number, register in enumerate(registers)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        results = {}
+        for register in registers:
+            for name, latencies in register.results.items():
+                results.setdefault(name, []).extend(latencies)
+        print(f'{args.concurrency} clients for {elapsed:.1f}s, '
+              f'{sum(r.errors for r in registers)} errors')
+        print_report(dict(sorted(results.items())), elapsed)
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+        if data_dir:
+            cleanup_environment(data_dir)
+
+
+if __name__ == '__main__':
+    main()
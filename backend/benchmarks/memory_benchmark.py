@@ -0,0 +1,67 @@
+# ============================================
+# COQUI POS - MEMORY BENCHMARK
+# ============================================
+# Memory the order history takes in the order index:
+# held as the dicts json.loads returns, against the
+# compact records of records.py (COQUI_COMPACT_RECORDS=1),
+# plus what converting between the two costs.
+#
+#   cd backend && python benchmarks/memory_benchmark.py [orders]
+
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from records import OrderRecord
+import serializer
+from synthetic import make_orders
+
+
+def traced_size(build):
+    """Bytes still allocated by what build() returns (and the result)"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        gc.collect()
+        return tracemalloc.get_traced_memory()[0] - before, result
+    finally:
+        tracemalloc.stop()
+
+
+def timed(action):
+    """Wall time of one run (seconds) and its result"""
+    start = time.perf_counter()
+    result = action()
+    return time.perf_counter() - start, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    # As the index gets them: freshly decoded, no strings shared between orders
+    data = serializer.dumps(make_orders(count))
+
+    dict_size, orders = traced_size(lambda: serializer.loads(data))
+    del orders
+    record_size, records = traced_size(lambda: [OrderRecord(o) for o in serializer.loads(data)])
+
+    orders = serializer.loads(data)
+    convert_time, records = timed(lambda: [OrderRecord(o) for o in orders])
+    back_time, restored = timed(lambda: [r.to_dict() for r in records])
+    assert restored == orders, 'records did not convert back to the same orders'
+
+    print(f'🐸 {count} orders ({serializer.BACKEND})')
+    print(f"{'held as':<16}{'total (MB)':>12}{'per order (B)':>15}{'per 100k (MB)':>15}")
+    for name, size in (('dicts', dict_size), ('records', record_size)):
+        print(f'{name:<16}{size / 1e6:>12.1f}{size / count:>15.0f}{size / count * 100000 / 1e6:>15.1f}')
+    print(f'records use {100 * (1 - record_size / dict_size):.0f}% less memory')
+    print(f'convert to records: {convert_time * 1000:.0f} ms, back to dicts: {back_time * 1000:.0f} ms')
+
+
+if __name__ == '__main__':
+    main()
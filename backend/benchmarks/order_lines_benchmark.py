@@ -0,0 +1,66 @@
+# ============================================
+# COQUI POS - ORDER LINE BENCHMARK
+# ============================================
+# Size and parse time of an order history whose lines
+# are whole menu items (as PaymentModal.jsx sends them)
+# against the same history stored as compact catalog
+# lines (id, version, name, quantity, price).
+#
+#   cd backend && python benchmarks/order_lines_benchmark.py [orders]
+
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from menu_catalog import MenuCatalog
+import serializer
+from synthetic import make_orders
+
+MENU_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'database', 'menu.json')
+ROUNDS = 5
+
+
+def median_time(action):
+    """Median wall time of a few runs (seconds)"""
+    times = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        action()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    with open(MENU_FILE, 'rb') as f:
+        menu = serializer.loads(f.read())
+    catalog = MenuCatalog(lambda: menu, lambda: 'menu.json')
+
+    # The synthetic orders, with each line swapped for a full menu item
+    rng = random.Random(42)
+    orders = make_orders(count)
+    for order in orders:
+        order['items'] = [dict(item, quantity=line['quantity'])
+                          for line, item in zip(order['items'], rng.sample(menu['items'], len(order['items'])))]
+    compact = [dict(order, items=catalog.compact_lines(order['items'])) for order in orders]
+
+    print(f'🐸 {count} orders ({serializer.BACKEND}), median of {ROUNDS} runs')
+    print(f"{'lines':<22}{'size (KB)':>12}{'dump (ms)':>12}{'load (ms)':>12}")
+    for name, history in (('full menu items', orders), ('catalog references', compact)):
+        data = serializer.dumps(history)
+        dump_time = median_time(lambda: serializer.dumps(history))
+        load_time = median_time(lambda: serializer.loads(data))
+        print(f'{name:<22}{len(data) / 1024:>12.0f}{dump_time * 1000:>12.1f}{load_time * 1000:>12.1f}')
+
+    started = time.perf_counter()
+    for order in compact:
+        catalog.rehydrate_lines(order['items'])
+    print(f'rehydrating every line: {(time.perf_counter() - started) * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
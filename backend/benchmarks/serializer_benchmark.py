@@ -0,0 +1,62 @@
+# ============================================
+# COQUI POS - SERIALIZER BENCHMARK
+# ============================================
+# Time to encode/decode an order history with the old
+# pretty-printed stdlib format, compact stdlib output,
+# orjson (if installed) and the backend's serializer.
+#
+#   cd backend && python benchmarks/serializer_benchmark.py [orders]
+
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import serializer
+from synthetic import make_orders
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ROUNDS = 5
+
+
+def median_time(action):
+    """Median wall time of a few runs (seconds)"""
+    times = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        action()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    orders = make_orders(count)
+
+    encoders = {
+        'json indent=2 (old)': (lambda: json.dumps(orders, indent=2).encode('utf-8'), json.loads),
+        'json compact': (lambda: json.dumps(orders, separators=(',', ':'), ensure_ascii=False)
+                         .encode('utf-8'), json.loads),
+    }
+    if orjson:
+        encoders['orjson'] = (lambda: orjson.dumps(orders), orjson.loads)
+    encoders[f'serializer ({serializer.BACKEND})'] = (lambda: serializer.dumps(orders), serializer.loads)
+
+    print(f'🐸 {count} orders, median of {ROUNDS} runs')
+    print(f"{'format':<26}{'size (KB)':>12}{'dump (ms)':>12}{'load (ms)':>12}")
+    for name, (dump, load) in encoders.items():
+        data = dump()
+        dump_time = median_time(dump)
+        load_time = median_time(lambda: load(data))
+        print(f'{name:<26}{len(data) / 1024:>12.0f}{dump_time * 1000:>12.1f}{load_time * 1000:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+# ============================================
+# COQUI POS - SYNTHETIC DATA FOR BENCHMARKS
+# ============================================
+# Deterministic (seeded) order, ticket and void histories
+# shaped like the ones the registers write, so benchmark
+# runs can be compared with each other.
+
+from datetime import datetime, timedelta
+import json
+import os
+import random
+
+# A slice of the menu (frontend/src/data/menuData.js)
+MENU = [
+    {'id': 'bev-1', 'name': 'Piña Colada', 'price': 8.99, 'category': 'beverages'},
+    {'id': 'bev-2', 'name': 'Mojito', 'price': 7.99, 'category': 'beverages'},
+    {'id': 'bev-4', 'name': 'Café con Leche', 'price': 3.99, 'category': 'beverages'},
+    {'id': 'app-1', 'name': 'Empanadillas', 'price': 8.99, 'category': 'appetizers'},
+    {'id': 'sal-1', 'name': 'Caesar Salad', 'price': 9.99, 'category': 'salads'},
+    {'id': 'main-1', 'name': 'Mofongo', 'price': 18.99, 'category': 'mainCourse'},
+    {'id': 'main-2', 'name': 'Pernil Asado', 'price': 16.99, 'category': 'mainCourse'},
+    {'id': 'des-1', 'name': 'Flan de Coco', 'price': 6.99, 'category': 'desserts'},
+    {'id': 'des-2', 'name': 'Tembleque', 'price': 5.99, 'category': 'desserts'},
+]
+
+TAX_RATE = 0.115
+
+
+def make_order(rng, moment, number):
+    """One order rung up at `moment`, like PaymentModal.jsx sends it"""
+    items = []
+    for dish in rng.sample(MENU, rng.randint(1, 4)):
+        items.append(dict(dish, quantity=rng.randint(1, 3), sentAt=moment.isoformat()))
+    subtotal = round(sum(item['price'] * item['quantity'] for item in items), 2)
+    tax = subtotal * TAX_RATE
+    tip = subtotal * rng.choice((0, 0.15, 0.18, 0.2))
+    return {
+        'orderId': f'ORD-{int(moment.timestamp() * 1000)}-{number}',
+        'items': items,
+        'subtotal': subtotal,
+        'tax': tax,
+        'tip': tip,
+        'total': subtotal + tax + tip,
+        'paymentMethod': rng.choice(('cash', 'card')),
+        'timestamp': f'{moment.month}/{moment.day}/{moment.year}, '
+                     f'{moment.strftime("%I:%M:%S %p").lstrip("0")}',
+        'salesDate': moment.strftime('%Y-%m-%d'),
+        'placedAt': moment.isoformat(timespec='seconds'),
+        'userRole': 'Employee',
+    }
+
+
+def make_orders(count, seed=42, days=365, start=datetime(2025, 1, 1, 11)):
+    """`count` orders spread evenly over `days` days of service, oldest first"""
+    rng = random.Random(seed)
+    step = timedelta(days=days) / max(count, 1)
+    return [make_order(rng, start + step * number, number) for number in range(count)]
+
+
+def make_ticket(rng, moment, number, status='closed'):
+    """One kitchen ticket sent at `moment` (closed a little later unless open)"""
+    items = [
+        {'id': dish['id'], 'name': dish['name'], 'quantity': rng.randint(1, 3),
+         'sentAt': moment.isoformat()}
+        for dish in rng.sample(MENU, rng.randint(1, 4))
+    ]
+    finished = (moment + timedelta(minutes=rng.randint(10, 60))).isoformat()
+    return {
+        'ticketId': f'TKT-{int(moment.timestamp() * 1000)}-{number}',
+        'items': items,
+        'createdAt': moment.isoformat(),
+        'status': status,
+        'closedAt': finished if status == 'closed' else None,
+        'voidedAt': finished if status == 'voided' else None,
+        'sentBy': 'Employee',
+    }
+
+
+def make_tickets(count, seed=42, days=365, start=datetime(2025, 1, 1, 11), open_tickets=20):
+    """`count` tickets over `days` days: the newest `open_tickets` still open, ~2% voided"""
+    rng = random.Random(seed)
+    step = timedelta(days=days) / max(count, 1)
+    tickets = []
+    for number in range(count):
+        if number >= count - open_tickets:
+            status = 'open'
+        else:
+            status = 'voided' if rng.random() < 0.02 else 'closed'
+        tickets.append(make_ticket(rng, start + step * number, number, status))
+    return tickets
+
+
+def make_voids(tickets):
+    """Void log entries for the voided tickets"""
+    return [
+        {
+            'voidId': f"VOID-{ticket['ticketId'][4:]}",
+            'type': 'ticket',
+            'ticketId': ticket['ticketId'],
+            'items': ticket['items'],
+            'voidedAt': ticket['voidedAt'],
+            'voidedBy': 'Manager',
+            'originalSentBy': ticket['sentBy'],
+            'reason': 'Customer changed order',
+        }
+        for ticket in tickets
+        if ticket['status'] == 'voided'
+    ]
+
+
+def make_sales(orders):
+    """The running totals sales.json holds for these orders (the backend adds the rest)"""
+    sales = {'total_sales': 0, 'total_orders': 0, 'sales_by_date': {}}
+    for order in orders:
+        day = sales['sales_by_date'].setdefault(order['salesDate'], {'revenue': 0, 'orders': 0})
+        day['revenue'] += order['total']
+        day['orders'] += 1
+        sales['total_sales'] += order['total']
+        sales['total_orders'] += 1
+    return sales
+
+
+def seed_data_dir(path, orders, tickets=None, seed=42):
+    """Write a synthetic history (JSON files) into a backend data directory"""
+    tickets = make_tickets(orders if tickets is None else tickets, seed=seed)
+    order_list = make_orders(orders, seed=seed)
+    files = {
+        'orders.json': order_list,
+        'sales.json': make_sales(order_list),
+        'tickets.json': tickets,
+        'voids.json': make_voids(tickets),
+    }
+    os.makedirs(path, exist_ok=True)
+    for name, data in files.items():
+        with open(os.path.join(path, name), 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'), ensure_ascii=False)
@@ -0,0 +1,52 @@
+# ============================================
+# COQUI POS - DATASET LOCKS
+# ============================================
+# One lock per dataset (orders, sales, tickets, voids)
+# that is held across a whole load -> modify -> save.
+# It excludes other threads in this process and, through
+# an flock on a lock file, other worker processes, so
+# simultaneous checkouts can't lose each other's writes.
+#
+# Platforms without fcntl (Windows) get the thread lock
+# only, which still covers the threaded dev server.
+
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class DatasetLock:
+    """Re-entrant lock shared by threads and processes through a lock file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        if self._depth == 0 and fcntl:
+            try:
+                self._file = open(self.path, 'a')
+                fcntl.flock(self._file, fcntl.LOCK_EX)
+            except Exception:
+                if self._file:
+                    self._file.close()
+                    self._file = None
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._depth -= 1
+        if self._depth == 0 and self._file:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+        self._thread_lock.release()
+        return False
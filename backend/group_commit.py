@@ -0,0 +1,127 @@
+# ============================================
+# COQUI POS - GROUP COMMIT
+# ============================================
+# When several registers save at once, each request
+# would otherwise take the dataset lock and rewrite the
+# files on its own, one after another. Instead, requests
+# hand their record to a GroupCommit and wait: one of
+# them (the leader) collects everything that arrives
+# within a short window, writes the whole batch with a
+# single commit, and then wakes every caller in it. Any
+# records that arrive during that write form the next
+# batch, led by one of their own callers.
+#
+# A commit must be all or nothing. If a batch fails, its
+# records are committed again one at a time, so a bad
+# record fails only its own caller.
+
+import itertools
+import threading
+
+
+class _Entry:
+    """One caller's record(s) and, once committed, their outcomes"""
+
+    __slots__ = ('records', 'done', 'results', 'errors')
+
+    def __init__(self, records):
+        self.records = records
+        self.done = False
+        self.results = [None] * len(records)
+        self.errors = [None] * len(records)
+
+
+class GroupCommit:
+    """Batches records from concurrent callers into single commits"""
+
+    def __init__(self, commit, window=0.002, max_batch=100):
+        # commit(records) writes a batch durably, all or nothing, and may
+        # return a result per record (e.g. whether it was new)
+        self._commit = commit
+        self._window = window
+        self._max_batch = max_batch
+        self._condition = threading.Condition()
+        self._pending = []
+        self._pending_records = 0
+        self._leading = False
+
+    def submit(self, record):
+        """
+        Add a record to the next batch and block until that batch
+        is committed. Returns the commit's result for the record, or
+        raises the commit's exception if it could not be committed.
+        """
+        entry = self._wait(_Entry([record]))
+        if entry.errors[0] is not None:
+            raise entry.errors[0]
+        return entry.results[0]
+
+    def submit_all(self, records):
+        """
+        Add records to the next batch together (never split over
+        batches) and block until they are committed. Returns each
+        record's outcome: the commit's result for it, or the exception
+        that kept it from being committed.
+        """
+        if not records:
+            return []
+        entry = self._wait(_Entry(list(records)))
+        return [error if error is not None else result
+                for result, error in zip(entry.results, entry.errors)]
+
+    def _wait(self, entry):
+        with self._condition:
+            self._pending.append(entry)
+            self._pending_records += len(entry.records)
+            self._condition.notify_all()
+            # Wait for our batch, or take over whenever no one is leading
+            while not entry.done:
+                self._condition.wait_for(lambda: entry.done or not self._leading)
+                if not entry.done:
+                    self._leading = True
+                    self._lead()
+        return entry
+
+    def _lead(self):
+        # Called holding the condition; gather a batch, then commit it unlocked
+        self._condition.wait_for(
+            lambda: self._pending_records >= self._max_batch, self._window
+        )
+        batch = []
+        count = 0
+        while self._pending and (not batch or count + len(self._pending[0].records) <= self._max_batch):
+            entry = self._pending.pop(0)
+            batch.append(entry)
+            count += len(entry.records)
+        self._pending_records -= count
+
+        self._condition.release()
+        try:
+            self._commit_isolated(batch)
+        finally:
+            self._condition.acquire()
+            for entry in batch:
+                entry.done = True
+            self._leading = False
+            self._condition.notify_all()
+
+    def _commit_isolated(self, batch):
+        records = [record for entry in batch for record in entry.records]
+        try:
+            results = self._commit(records)
+        except Exception as e:
+            if len(records) == 1:
+                batch[0].errors[0] = e
+                return
+            # Nothing of the batch was stored: find the record(s) that fail
+            for entry in batch:
+                for i, record in enumerate(entry.records):
+                    try:
+                        entry.results[i] = (self._commit([record]) or [None])[0]
+                    except Exception as e:
+                        entry.errors[i] = e
+            return
+
+        results = iter(results) if results is not None else itertools.repeat(None)
+        for entry in batch:
+            entry.results = [next(results) for _ in entry.records]
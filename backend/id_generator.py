@@ -0,0 +1,69 @@
+# ============================================
+# COQUI POS - ID GENERATOR
+# ============================================
+# Order, ticket and void IDs used to be a prefix and the
+# millisecond timestamp, so two created in the same
+# millisecond (two workers, or a batch) got the same ID.
+# An ID from here is
+#
+#   PREFIX-<ms since epoch, 13 digits>-<worker, 6 hex><sequence, 6 hex>
+#   e.g. TKT-1773432078549-00a1f3000001
+#
+# The worker part is the process id (renewed in a forked
+# child, e.g. a gunicorn worker), and the sequence counts
+# up within the process (shared by every generator in it,
+# under a lock), so no two IDs are the same. The
+# timestamp never goes backwards within a process (if the
+# clock does, the last one is kept) and every part has a
+# fixed width, so IDs sort as strings in the order they
+# were made, after the plain timestamp IDs of older
+# records. That makes them usable as index keys and as
+# keyset pagination cursors.
+
+import itertools
+import os
+import threading
+import time
+
+WORKER_IDS = 16 ** 6
+SEQUENCES = 16 ** 6
+
+# One sequence per process: two generators (e.g. the app imported
+# twice) share the process id, so they mustn't count separately
+_lock = threading.Lock()
+_sequence = itertools.count()
+
+
+def _reset_sequence():
+    global _lock, _sequence
+    _lock = threading.Lock()  # A fork can copy it held by another thread
+    _sequence = itertools.count()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_sequence)
+
+
+class IdGenerator:
+    """Unique, time-ordered IDs for one process"""
+
+    def __init__(self, worker_id=None):
+        self._worker_id = worker_id  # Default: the process id
+        self._reset()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        worker = self._worker_id if self._worker_id is not None else os.getpid()
+        self._worker = f'{worker % WORKER_IDS:06x}'
+        self._last_ms = 0
+
+    def new(self, prefix):
+        """A new ID starting with prefix (e.g. 'TKT')"""
+        # Under the lock, so a thread can't take the next sequence number
+        # with an older timestamp and sort before an ID made earlier
+        with _lock:
+            sequence = next(_sequence) % SEQUENCES
+            ms = max(time.time_ns() // 1_000_000, self._last_ms)
+            self._last_ms = ms
+        return f'{prefix}-{ms:013d}-{self._worker}{sequence:06x}'
@@ -0,0 +1,200 @@
+# ============================================
+# COQUI POS - MENU CATALOG
+# ============================================
+# The menu, served by the backend so every register
+# shows the same items and prices. Items are kept in
+# memory indexed by id. The catalog has a version that
+# goes up by one with every manager edit, and each item
+# remembers the version it last changed in (removed
+# items leave a tombstone with theirs), so a terminal
+# that has version N can ask for just what changed
+# since N instead of the whole menu.
+#
+# Every version of every item is kept as a snapshot, so
+# order and ticket lines can be stored compactly as the
+# item id and catalog version they were sold under (plus
+# quantity and price charged) and expanded again later,
+# even after the item was edited or removed.
+#
+# Stored as one document (menu.json, or the 'menu'
+# document in SQLite):
+#   {"version": 7, "items": [...], "removed": {"bev-9": 6},
+#    "history": {"bev-1": {"1": {...}, "5": {...}}}}
+
+import threading
+
+# What an order/ticket line keeps; the rest comes from the item's snapshot.
+# The name stays on the line so reports, kitchen screens and the void log
+# can read it without a catalog lookup.
+LINE_FIELDS = ('id', 'version', 'name', 'quantity', 'price', 'modifiers')
+
+
+def empty_menu():
+    """Fresh menu catalog document"""
+    return {'version': 0, 'items': [], 'removed': {}, 'history': {}}
+
+
+class MenuCatalog:
+    """In-memory menu items indexed by id, with a catalog version"""
+
+    def __init__(self, loader, signature):
+        self._loader = loader
+        self._signature = signature
+        self._lock = threading.RLock()
+        self._document = empty_menu()
+        self._items = {}
+        self._history = {}  # item id -> {version (str): item as of that version}
+        self._loaded_signature = None
+
+    def refresh(self):
+        """Reload from storage if it changed since we last saw it"""
+        with self._lock:
+            current = self._signature()
+            if self._loaded_signature is None or current != self._loaded_signature:
+                self._set(self._loader())
+                self._loaded_signature = current
+
+    @property
+    def version(self):
+        """Current catalog version"""
+        self.refresh()
+        return self._document['version']
+
+    def items(self):
+        """All menu items, in menu order"""
+        self.refresh()
+        return list(self._document['items'])
+
+    def get(self, item_id):
+        """Look up one menu item by id, or None"""
+        self.refresh()
+        return self._items.get(item_id)
+
+    def item_at(self, item_id, version):
+        """A menu item as it was in a catalog version (or its latest, if unknown)"""
+        self.refresh()
+        return self._snapshot(item_id, version)
+
+    def _snapshot(self, item_id, version):
+        versions = self._history.get(item_id) or {}
+        snapshot = versions.get(str(version))
+        if snapshot is None:
+            snapshot = self._items.get(item_id)
+        if snapshot is None and versions:
+            snapshot = versions[max(versions, key=int)]  # Since removed from the menu
+        return snapshot
+
+    def changes_since(self, version):
+        """Items changed and ids removed after a catalog version"""
+        self.refresh()
+        changed = [item for item in self._document['items'] if item.get('version', 0) > version]
+        removed = [item_id for item_id, at in self._document['removed'].items() if at > version]
+        return changed, removed
+
+    # ----- edits (return the document to store, then reset() with it) -----
+
+    def with_changes(self, upserts=(), removals=()):
+        """Menu document after adding/replacing and removing items"""
+        self.refresh()
+        version = self._document['version'] + 1
+        items = {item['id']: item for item in self._document['items']}
+        removed = dict(self._document['removed'])
+        history = dict(self._history)
+
+        for item in upserts:
+            stored = items[item['id']] = dict(item, version=version)
+            history[item['id']] = dict(history.get(item['id'], {}), **{str(version): stored})
+            removed.pop(item['id'], None)
+        for item_id in removals:
+            if items.pop(item_id, None) is not None:
+                removed[item_id] = version
+
+        return {'version': version, 'items': list(items.values()), 'removed': removed,
+                'history': history}
+
+    def with_items(self, new_items):
+        """Menu document with the whole menu replaced by these items"""
+        self.refresh()
+        new_ids = {item['id'] for item in new_items}
+        # Unchanged items keep their version, so deltas only carry real edits
+        changed = [item for item in new_items if not self._same(self._items.get(item['id']), item)]
+        menu = self.with_changes(
+            changed, [item_id for item_id in self._items if item_id not in new_ids]
+        )
+        # In the order given
+        items = {item['id']: item for item in menu['items']}
+        menu['items'] = [items[item['id']] for item in new_items]
+        return menu
+
+    def next_id(self, category):
+        """Unused item id for a category (first three letters + counter)"""
+        self.refresh()
+        prefix = category[:3]
+        counter = 1
+        while f'{prefix}-{counter}' in self._items or f'{prefix}-{counter}' in self._document['removed']:
+            counter += 1
+        return f'{prefix}-{counter}'
+
+    # ----- order and ticket lines -----
+
+    def compact_lines(self, items):
+        """
+        Order/ticket lines as stored: the catalog item and version each was
+        sold as, its quantity, the unit price charged and any modifiers
+        (the version sent with a line, e.g. from a kitchen ticket, is kept)
+        """
+        self.refresh()
+        return [self._compact(item) for item in items]
+
+    def rehydrate_lines(self, lines):
+        """Stored lines with the rest of their menu items filled back in"""
+        self.refresh()
+        return [self._rehydrate(line) for line in lines]
+
+    def _compact(self, item):
+        snapshot = self._snapshot(item.get('id'), item.get('version'))
+        if snapshot is None:
+            # Not on the menu: nothing to look it up in later
+            return {field: item[field] for field in LINE_FIELDS if field in item}
+
+        line = {
+            'id': snapshot['id'],
+            'version': snapshot.get('version', 0),
+            'name': snapshot.get('name'),
+            'quantity': item.get('quantity', 1),
+            'price': item['price'] if 'price' in item else snapshot.get('price')
+        }
+        if item.get('modifiers'):
+            line['modifiers'] = item['modifiers']
+        return line
+
+    def _rehydrate(self, line):
+        if 'version' not in line:
+            return line  # Stored in full (older orders) or not on the menu
+        snapshot = self._snapshot(line.get('id'), line['version'])
+        return dict(snapshot, **line) if snapshot else line
+
+    @staticmethod
+    def _same(current, item):
+        if current is None:
+            return False
+        return ({k: v for k, v in current.items() if k != 'version'}
+                == {k: v for k, v in item.items() if k != 'version'})
+
+    # ----- called after this process writes to storage -----
+
+    def reset(self, document):
+        """Record a stored menu document"""
+        with self._lock:
+            self._set(document)
+            self._loaded_signature = self._signature()
+
+    def _set(self, document):
+        self._document = document
+        self._items = {item['id']: item for item in document['items']}
+        self._history = dict(document.get('history') or {})
+        # A catalog saved without history: its current items are the snapshots
+        for item in document['items']:
+            versions = self._history.get(item['id'], {})
+            if str(item.get('version', 0)) not in versions:
+                self._history[item['id']] = dict(versions, **{str(item.get('version', 0)): item})
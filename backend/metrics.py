@@ -0,0 +1,208 @@
+# ============================================
+# COQUI POS - METRICS
+# ============================================
+# Where does a slow checkout spend its time: loading the
+# orders, writing the JSON, or aggregating? When enabled
+# (COQUI_METRICS=1) this records
+#
+#   - request latency per route (histogram)
+#   - every storage load/save: calls, latency, records,
+#     and bytes read/written (counted at the serializer,
+#     so JSON files, the journal, the ticket archive and
+#     SQLite rows are all covered)
+#   - latency of the main aggregation helpers
+#
+# and renders it in the Prometheus text format for
+# /api/metrics. Metrics are per worker process.
+#
+# When disabled, the decorators hand back the original
+# functions untouched, so there is no overhead at all.
+
+import functools
+import threading
+import time
+
+# Histogram bucket upper bounds (seconds)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# metric name -> (type, help text)
+METRICS = {
+    'coqui_http_request_duration_seconds': (
+        'histogram', 'Time spent handling API requests, by route'),
+    'coqui_storage_duration_seconds': (
+        'histogram', 'Time spent in storage load/save calls, by operation'),
+    'coqui_storage_records_total': (
+        'counter', 'Records loaded or saved, by operation'),
+    'coqui_storage_bytes_read_total': (
+        'counter', 'Serialized bytes decoded by storage calls, by operation'),
+    'coqui_storage_bytes_written_total': (
+        'counter', 'Serialized bytes encoded by storage calls, by operation'),
+    'coqui_storage_errors_total': (
+        'counter', 'Storage calls that raised, by operation'),
+    'coqui_aggregation_duration_seconds': (
+        'histogram', 'Time spent in sales aggregation helpers, by function'),
+}
+
+
+class _Histogram:
+    """Cumulative bucket counts, sum and count of one labelled series"""
+
+    __slots__ = ('buckets', 'sum', 'count')
+
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.buckets[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """Thread-safe registry of request, storage and aggregation metrics"""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._histograms = {}  # (metric, labels) -> _Histogram
+        self._counters = {}  # (metric, labels) -> value
+        self._local = threading.local()  # storage operations running on this thread
+
+    def observe(self, metric, labels, seconds):
+        """Add a latency to a histogram series"""
+        key = (metric, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram()
+            histogram.observe(seconds)
+
+    def increment(self, metric, labels, amount=1):
+        """Add to a counter series"""
+        key = (metric, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    # ----- instrumentation -----
+
+    def observe_request(self, method, route, status, seconds):
+        """Record one handled API request"""
+        labels = (('method', method), ('route', route), ('status', str(status)))
+        self.observe('coqui_http_request_duration_seconds', labels, seconds)
+
+    def storage(self, func):
+        """
+        Decorator for a load_*/save_* style function: times each call and
+        counts its records (the list it was given or returned, else 1) and
+        the bytes it serialized.
+        """
+        if not self.enabled:
+            return func
+        labels = (('operation', func.__name__),)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            stack = self._operations()
+            stack.append(labels)
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                self.increment('coqui_storage_errors_total', labels)
+                raise
+            finally:
+                self.observe('coqui_storage_duration_seconds', labels, time.perf_counter() - start)
+                stack.pop()
+            records = args[0] if args else result
+            self.increment('coqui_storage_records_total', labels,
+                           len(records) if isinstance(records, (list, tuple)) else 1)
+            return result
+        return wrapper
+
+    def timed(self, func):
+        """Decorator recording how long an aggregation helper takes"""
+        if not self.enabled:
+            return func
+        labels = (('function', func.__name__),)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.observe('coqui_aggregation_duration_seconds', labels, time.perf_counter() - start)
+        return wrapper
+
+    def watch_serializer(self, module):
+        """
+        Count the bytes encoded/decoded through the serializer module
+        while a storage call is running, against that call
+        """
+        if not self.enabled:
+            return
+
+        def counting(func, metric):
+            @functools.wraps(func)
+            def wrapper(data):
+                result = func(data)
+                stack = self._operations()
+                if stack:
+                    size = len(result) if metric == 'coqui_storage_bytes_written_total' else len(data)
+                    self.increment(metric, stack[-1], size)
+                return result
+            return wrapper
+
+        module.dumps = counting(module.dumps, 'coqui_storage_bytes_written_total')
+        module.dumps_text = counting(module.dumps_text, 'coqui_storage_bytes_written_total')
+        module.loads = counting(module.loads, 'coqui_storage_bytes_read_total')
+
+    def _operations(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    # ----- exposition -----
+
+    def render(self):
+        """All series in the Prometheus text exposition format"""
+        with self._lock:
+            histograms = {key: (list(h.buckets), h.sum, h.count) for key, h in self._histograms.items()}
+            counters = dict(self._counters)
+
+        lines = []
+        for metric, (kind, help_text) in METRICS.items():
+            lines.append(f'# HELP {metric} {help_text}')
+            lines.append(f'# TYPE {metric} {kind}')
+            if kind == 'histogram':
+                for (name, labels), (buckets, total, count) in sorted(histograms.items()):
+                    if name != metric:
+                        continue
+                    for bound, bucket_count in zip(BUCKETS, buckets):
+                        lines.append(f'{metric}_bucket{_labels(labels, le=bound)} {bucket_count}')
+                    lines.append(f'{metric}_bucket{_labels(labels, le="+Inf")} {count}')
+                    lines.append(f'{metric}_sum{_labels(labels)} {total}')
+                    lines.append(f'{metric}_count{_labels(labels)} {count}')
+            else:
+                for (name, labels), value in sorted(counters.items()):
+                    if name == metric:
+                        lines.append(f'{metric}{_labels(labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels, le=None):
+    pairs = list(labels)
+    if le is not None:
+        pairs.append(('le', le))
+    if not pairs:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
@@ -0,0 +1,144 @@
+# ============================================
+# COQUI POS - ORDER INDEX
+# ============================================
+# Process-resident copy of the order history with an
+# orderId -> position index, so looking up one order
+# doesn't parse the whole file and scan it, plus sorted
+# (sales date, position) and (ISO timestamp, position)
+# indexes so date and time-range queries are bisects.
+#
+# The index remembers a signature (mtime/size) of the
+# backing storage. Writes made through this process
+# update the index in place; any other change on disk
+# (another worker, a manual edit) changes the signature
+# and the next access reloads from storage.
+#
+# Orders can be kept as compact records instead of the
+# dicts storage returns (pass record=OrderRecord.of, see
+# records.py); callers then treat them as read-only.
+
+import bisect
+import threading
+
+
+class OrderIndex:
+    """In-memory orders list indexed by orderId and date"""
+
+    def __init__(self, loader, signature, date_key, time_key, record=None):
+        self._loader = loader
+        self._signature = signature
+        self._date_key = date_key
+        self._time_key = time_key
+        self._record = record  # Turns a stored order into what is kept in memory
+        self._lock = threading.RLock()
+        self._orders = []
+        self._positions = {}
+        self._by_date = []
+        self._by_time = []
+        self._loaded_signature = None
+        self._generation = 0  # bumped by every change other than an append
+
+    def refresh(self):
+        """Reload from storage if it changed since we last saw it"""
+        with self._lock:
+            current = self._signature()
+            if self._loaded_signature is None or current != self._loaded_signature:
+                self._reset(self._loader())
+                self._loaded_signature = current
+
+    def orders(self):
+        """All orders, oldest first (treat as read-only)"""
+        self.refresh()
+        return self._orders
+
+    def get(self, order_id):
+        """Look up one order by ID, or None"""
+        self.refresh()
+        position = self._positions.get(order_id)
+        return self._orders[position] if position is not None else None
+
+    def position(self, order_id):
+        """Position of an order in the history, or None"""
+        self.refresh()
+        return self._positions.get(order_id)
+
+    def positions_between(self, start=None, end=None):
+        """Sorted positions of orders dated start..end (inclusive YYYY-MM-DD)"""
+        self.refresh()
+        by_date = self._by_date
+        low = bisect.bisect_left(by_date, (start,)) if start else 0
+        high = bisect.bisect_left(by_date, (end + '\uffff',)) if end else len(by_date)
+        return sorted(position for _, position in by_date[low:high])
+
+    def positions_at(self, start=None, end=None):
+        """Sorted positions of orders placed start..end (inclusive ISO timestamps)"""
+        self.refresh()
+        by_time = self._by_time
+        low = bisect.bisect_left(by_time, (start,)) if start else 0
+        high = bisect.bisect_left(by_time, (end + '\uffff',)) if end else len(by_time)
+        return sorted(position for _, position in by_time[low:high])
+
+    def __len__(self):
+        self.refresh()
+        return len(self._orders)
+
+    @property
+    def generation(self):
+        """
+        Changes only when existing orders change or are reloaded, so a
+        cache built from orders() stays valid (apart from orders appended
+        since) while the generation is the same
+        """
+        return self._generation
+
+    # ----- called after this process writes to storage -----
+
+    def add(self, *orders):
+        """Record newly stored orders"""
+        with self._lock:
+            for order in orders:
+                self._put(order)
+            self._loaded_signature = self._signature()
+
+    def replace(self, order):
+        """Record a change to an existing order"""
+        with self._lock:
+            self._put(order)
+            self._loaded_signature = self._signature()
+
+    def reset(self, orders):
+        """Record a full rewrite of the order history"""
+        with self._lock:
+            self._reset(orders)
+            self._loaded_signature = self._signature()
+
+    def _put(self, order):
+        if self._record:
+            order = self._record(order)
+        order_id = order.get('orderId')
+        position = self._positions.get(order_id)
+        if position is None:
+            position = len(self._orders)
+            self._positions[order_id] = position
+            self._orders.append(order)
+            old = None
+        else:
+            old = self._orders[position]
+            self._orders[position] = order
+            self._generation += 1
+
+        for index, key in ((self._by_date, self._date_key), (self._by_time, self._time_key)):
+            value = key(order) or ''
+            if old is not None:
+                old_value = key(old) or ''
+                if old_value == value:
+                    continue
+                index.remove((old_value, position))
+            bisect.insort(index, (value, position))
+
+    def _reset(self, orders):
+        self._generation += 1
+        self._orders = list(map(self._record, orders)) if self._record else list(orders)
+        self._positions = {o.get('orderId'): i for i, o in enumerate(self._orders)}
+        self._by_date = sorted((self._date_key(o) or '', i) for i, o in enumerate(self._orders))
+        self._by_time = sorted((self._time_key(o) or '', i) for i, o in enumerate(self._orders))
@@ -0,0 +1,117 @@
+# ============================================
+# COQUI POS - ORDER JOURNAL
+# ============================================
+# Append-only write-ahead log for orders.
+# Each new order is written as one JSON line to the
+# current segment file and fsync'd, so checkout never
+# rewrites the whole order history. Segments are folded
+# back into orders.json by compaction (see app.py).
+
+import os
+
+import serializer
+
+SEGMENT_PREFIX = 'segment-'
+SEGMENT_SUFFIX = '.log'
+
+
+class OrderJournal:
+    """Segmented append-only log of order records"""
+
+    def __init__(self, directory, segment_max_records=1000):
+        self.directory = directory
+        self.segment_max_records = segment_max_records
+
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+
+        # Count what is already on disk so compaction knows when to run
+        self.record_count = 0
+        self.current_segment = 1
+        self.current_segment_records = 0
+
+        segments = self.segments()
+        if segments:
+            self.current_segment = segments[-1]
+            for number in segments:
+                count = self._count_records(number)
+                self.record_count += count
+                if number == self.current_segment:
+                    self.current_segment_records = count
+            self._repair_tail(self.current_segment)
+
+    def segments(self):
+        """Return the segment numbers on disk, oldest first"""
+        numbers = []
+        for name in os.listdir(self.directory):
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX):
+                try:
+                    numbers.append(int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]))
+                except ValueError:
+                    continue
+        return sorted(numbers)
+
+    def segment_path(self, number):
+        """Path of a segment file"""
+        return os.path.join(self.directory, f"{SEGMENT_PREFIX}{number:06d}{SEGMENT_SUFFIX}")
+
+    def append(self, orders):
+        """Append one or more orders as a single durable write"""
+        if isinstance(orders, dict):
+            orders = [orders]
+        if not orders:
+            return
+
+        if self.current_segment_records >= self.segment_max_records:
+            self.current_segment += 1
+            self.current_segment_records = 0
+
+        data = b''.join(serializer.dumps(order) + b'\n' for order in orders)
+
+        fd = os.open(self.segment_path(self.current_segment),
+                     os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, data)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+        self.record_count += len(orders)
+        self.current_segment_records += len(orders)
+
+    def replay(self):
+        """Yield every journaled order, oldest first"""
+        for number in self.segments():
+            with open(self.segment_path(number), 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield serializer.loads(line)
+                    except ValueError:
+                        # Torn write from a crash - the record was never acknowledged
+                        continue
+
+    def clear(self):
+        """Delete all segments (called after a successful compaction)"""
+        for number in self.segments():
+            os.remove(self.segment_path(number))
+        self.record_count = 0
+        self.current_segment = 1
+        self.current_segment_records = 0
+
+    def _count_records(self, number):
+        """Count the records in a segment"""
+        with open(self.segment_path(number), 'rb') as f:
+            return sum(1 for line in f if line.strip())
+
+    def _repair_tail(self, number):
+        """Terminate a torn last line so the next append starts cleanly"""
+        path = self.segment_path(number)
+        if os.path.getsize(path) == 0:
+            return
+        with open(path, 'rb+') as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
@@ -0,0 +1,168 @@
+# ============================================
+# COQUI POS - COMPACT RECORDS
+# ============================================
+# The order index and the open tickets live in memory for
+# as long as the process runs. Held the way json.loads
+# hands them over, every order and every line is its own
+# dict (a hash table sized for growth), and every repeated
+# value - "cash", "Employee", "Mofongo", "2025-03-14" - is
+# a separate string object per order.
+#
+# These record types keep the same data in __slots__ (no
+# per-instance dict), lines in a tuple, and the values that
+# repeat from order to order interned, so each distinct
+# payment method, role, item id and name exists once.
+#
+# A record reads like the dict it came from (order['total'],
+# order.get('refunded'), 'items' in order, iteration) but is
+# read-only; to change one, copy it with to_dict(), edit
+# the dict and store that. Conversion is lossless: absent
+# fields stay absent, fields a record type doesn't know are
+# kept aside, and to_dict() equals the original dict.
+
+from collections.abc import Mapping
+import sys
+
+_MISSING = object()  # An unset slot: the field wasn't in the dict
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class Record(Mapping):
+    """Read-only dict-like record stored in __slots__"""
+
+    __slots__ = ('_extra',)
+
+    FIELDS = ()  # Known fields, in the order to_dict() writes them
+    INTERNED = frozenset()  # String fields whose values repeat between records
+    LINES = None  # Record type of the 'items' lines, if any
+    _SLOTS = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._SLOTS = {field: '_' + field for field in cls.FIELDS}
+
+    @classmethod
+    def of(cls, data):
+        """A record of this type for a dict (records are returned as they are)"""
+        return data if isinstance(data, Record) else cls(data)
+
+    def __init__(self, data):
+        slots, interned, lines = self._SLOTS, self.INTERNED, self.LINES
+        extra = None
+        for key, value in data.items():
+            slot = slots.get(key)
+            if slot is None:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+                continue
+            if key in interned:
+                value = _intern(value)
+            elif key == 'items' and lines is not None and type(value) is list:
+                value = tuple(map(lines.of, value))
+            setattr(self, slot, value)
+        self._extra = extra
+
+    def to_dict(self):
+        """The record as a plain dict, in the stored JSON shape"""
+        data = {}
+        for field, slot in self._SLOTS.items():
+            value = getattr(self, slot, _MISSING)
+            if value is _MISSING:
+                continue
+            if type(value) is tuple:
+                value = [v.to_dict() if isinstance(v, Record) else v for v in value]
+            data[field] = value
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    def copy(self):
+        """A plain, editable dict copy (like dict.copy())"""
+        return self.to_dict()
+
+    # ----- dict-like reads -----
+
+    def __getitem__(self, key):
+        slot = self._SLOTS.get(key)
+        if slot is not None:
+            value = getattr(self, slot, _MISSING)
+            if value is not _MISSING:
+                return value
+        elif self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        slot = self._SLOTS.get(key)
+        if slot is not None:
+            value = getattr(self, slot, _MISSING)
+            return default if value is _MISSING else value
+        if self._extra:
+            return self._extra.get(key, default)
+        return default
+
+    def __contains__(self, key):
+        slot = self._SLOTS.get(key)
+        if slot is not None:
+            return getattr(self, slot, _MISSING) is not _MISSING
+        return bool(self._extra) and key in self._extra
+
+    def __iter__(self):
+        for field, slot in self._SLOTS.items():
+            if getattr(self, slot, _MISSING) is not _MISSING:
+                yield field
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            other = other.to_dict()
+        if isinstance(other, Mapping):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.to_dict()!r})'
+
+
+class LineRecord(Record):
+    """One order or ticket line"""
+
+    FIELDS = ('id', 'version', 'name', 'quantity', 'price', 'modifiers', 'category', 'sentAt')
+    INTERNED = frozenset(('id', 'name', 'category'))
+    __slots__ = tuple('_' + field for field in FIELDS)
+
+
+class OrderRecord(Record):
+    """One order from the order history"""
+
+    FIELDS = ('orderId', 'items', 'subtotal', 'tax', 'tip', 'total', 'paymentMethod',
+              'cashReceived', 'change', 'timestamp', 'salesDate', 'placedAt', 'userRole',
+              'refunded', 'refundedAt', 'refundedBy')
+    INTERNED = frozenset(('paymentMethod', 'salesDate', 'userRole', 'refundedBy'))
+    LINES = LineRecord
+    __slots__ = tuple('_' + field for field in FIELDS)
+
+
+class TicketRecord(Record):
+    """One kitchen ticket"""
+
+    FIELDS = ('ticketId', 'items', 'createdAt', 'status', 'closedAt', 'voidedAt',
+              'sentBy', 'version')
+    INTERNED = frozenset(('status', 'sentBy'))
+    LINES = LineRecord
+    __slots__ = tuple('_' + field for field in FIELDS)
+
+
+def as_dict(record):
+    """A record as a plain dict (dicts are returned as they are)"""
+    return record.to_dict() if isinstance(record, Record) else record
@@ -0,0 +1,199 @@
+# ============================================
+# COQUI POS - SLOW REQUEST PROFILER
+# ============================================
+# Metrics say a route is slow on average; this shows why
+# one particular request was. While profiling is on, a
+# background thread samples the call stack of every
+# request in flight every few milliseconds. When a
+# request finishes under the threshold its samples are
+# thrown away; when it took longer, the most common
+# stacks and the functions they spend time in are saved
+# together with the route, query and dataset sizes.
+#
+# Profiles go to a bounded on-disk ring (one small JSON
+# file each, oldest deleted first), shared by all worker
+# processes. Sampling works the same in every thread and
+# needs no tracing hooks, so concurrent requests don't
+# interfere with each other.
+
+from datetime import datetime
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+
+import serializer
+
+PROFILE_ID = re.compile(r'^[0-9-]+$')
+
+
+class SlowRequestProfiler:
+    """Samples in-flight requests and keeps the slow ones' profiles"""
+
+    def __init__(self, directory, threshold, interval=0.005, keep=100,
+                 top_stacks=15, source_dir=None, max_depth=40):
+        self.directory = directory
+        self.threshold = threshold  # seconds
+        self.interval = interval  # seconds between samples
+        self.keep = keep
+        self.top_stacks = top_stacks
+        self.max_depth = max_depth
+        # Frames above the first one in here (the WSGI server, Flask) are left out
+        self.source_dir = source_dir
+        self._active = {}  # thread ident -> {stack: samples}
+        self._condition = threading.Condition()
+        self._sampler = None
+        os.makedirs(directory, exist_ok=True)
+
+    # ----- sampling -----
+
+    def start(self):
+        """Begin sampling the current thread; returns a token for stop()"""
+        ident = threading.get_ident()
+        samples = {}
+        with self._condition:
+            self._active[ident] = samples
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+                self._sampler.start()
+            self._condition.notify()
+        return ident, samples, time.perf_counter()
+
+    def stop(self, token):
+        """Stop sampling; returns (samples, elapsed seconds)"""
+        ident, samples, started = token
+        with self._condition:
+            if self._active.get(ident) is samples:
+                del self._active[ident]
+            return dict(samples), time.perf_counter() - started
+
+    def _run(self):
+        own = threading.get_ident()
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._active)
+                idents = list(self._active)
+
+            frames = sys._current_frames()
+            stacks = {ident: self._stack(frames[ident]) for ident in idents
+                      if ident in frames and ident != own}
+            del frames
+
+            with self._condition:
+                for ident, stack in stacks.items():
+                    samples = self._active.get(ident)
+                    if samples is not None:
+                        samples[stack] = samples.get(stack, 0) + 1
+            time.sleep(self.interval)
+
+    def _stack(self, frame):
+        # Root-first tuple of "function (file:line)", trimmed to the app's own frames
+        stack = []
+        while frame is not None:
+            stack.append(frame)
+            frame = frame.f_back
+        stack.reverse()
+
+        if self.source_dir:
+            for i, f in enumerate(stack):
+                if os.path.dirname(f.f_code.co_filename) == self.source_dir:
+                    stack = stack[i:]
+                    break
+        return tuple(
+            f'{f.f_code.co_name} ({os.path.basename(f.f_code.co_filename)}:{f.f_lineno})'
+            for f in stack[-self.max_depth:]
+        )
+
+    # ----- the ring -----
+
+    def record(self, details, samples, elapsed):
+        """Save a slow request's profile; details describes the request"""
+        total = sum(samples.values())
+        ranked = sorted(samples.items(), key=lambda x: x[1], reverse=True)[:self.top_stacks]
+
+        # Samples each function appears in (anywhere on the stack) and at the top of;
+        # the ones most often at the top are where the time actually went
+        functions = {}
+        for stack, count in samples.items():
+            for name in {_function(frame) for frame in stack}:
+                functions.setdefault(name, [0, 0])[0] += count
+            if stack:
+                functions.setdefault(_function(stack[-1]), [0, 0])[1] += count
+        hotspots = sorted(functions.items(), key=lambda x: (x[1][1], x[1][0]), reverse=True)
+
+        profile_id = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{os.getpid()}"
+        profile = dict(details, **{
+            'id': profile_id,
+            'recordedAt': datetime.now().isoformat(),
+            'durationMs': round(elapsed * 1000, 2),
+            'thresholdMs': round(self.threshold * 1000, 2),
+            'intervalMs': round(self.interval * 1000, 2),
+            'samples': total,
+            'stacks': [
+                {'samples': count, 'percent': round(100 * count / total, 1), 'frames': list(stack)}
+                for stack, count in ranked
+            ],
+            'functions': [
+                {'function': name, 'samples': inclusive, 'selfSamples': own,
+                 'percent': round(100 * inclusive / total, 1)}
+                for name, (inclusive, own) in hotspots[:self.top_stacks * 2]
+            ]
+        })
+        self._write(profile_id, profile)
+        return profile
+
+    def profiles(self, limit=None):
+        """Summaries of the saved profiles, newest first"""
+        summaries = []
+        for profile_id in reversed(self._ids()):
+            profile = self.get(profile_id)
+            if profile is None:
+                continue  # Dropped from the ring meanwhile
+            summaries.append({
+                field: profile.get(field)
+                for field in ('id', 'recordedAt', 'method', 'route', 'path', 'query',
+                              'status', 'durationMs', 'samples', 'datasets')
+            })
+            if limit and len(summaries) >= limit:
+                break
+        return summaries
+
+    def get(self, profile_id):
+        """One saved profile, or None"""
+        if not PROFILE_ID.match(profile_id):
+            return None
+        try:
+            with open(self._path(profile_id), 'rb') as f:
+                return serializer.loads(f.read())
+        except FileNotFoundError:
+            return None
+
+    def _ids(self):
+        return sorted(name[:-5] for name in os.listdir(self.directory) if name.endswith('.json'))
+
+    def _path(self, profile_id):
+        return os.path.join(self.directory, profile_id + '.json')
+
+    def _write(self, profile_id, profile):
+        fd, temp_file = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(serializer.dumps(profile))
+            os.replace(temp_file, self._path(profile_id))
+        except BaseException:
+            os.remove(temp_file)
+            raise
+
+        # Oldest profiles fall out of the ring
+        for old_id in self._ids()[:-self.keep]:
+            try:
+                os.remove(self._path(old_id))
+            except FileNotFoundError:
+                pass
+
+
+def _function(frame):
+    # "name (file.py:123)" -> "name (file.py)"
+    return frame.rsplit(':', 1)[0] + ')'
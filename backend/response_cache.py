@@ -0,0 +1,56 @@
+# ============================================
+# COQUI POS - RESPONSE CACHE
+# ============================================
+# Dashboards and kitchen screens poll the same GET
+# routes over and over, while the data behind them only
+# changes when an order, refund, ticket or void is
+# written. Serialized responses are kept here (LRU,
+# bounded), each tagged with the generations of the
+# datasets it was built from. Every write bumps its
+# datasets' generation, so a stale entry is never
+# served - its tag simply stops matching.
+
+from collections import OrderedDict
+import threading
+
+
+class ResponseCache:
+    """Bounded LRU cache of responses tagged with dataset generations"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (tag, value)
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def generation(self, dataset):
+        """How many writes this process has made to a dataset"""
+        return self._generations.get(dataset, 0)
+
+    def bump(self, *datasets):
+        """Invalidate every response built from these datasets"""
+        with self._lock:
+            for dataset in datasets:
+                self._generations[dataset] = self._generations.get(dataset, 0) + 1
+
+    def get(self, key, tag):
+        """Cached value for key if it was stored with this tag, else None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != tag:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, tag, value):
+        """Store a value, evicting the least recently used entries over the bound"""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (tag, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,243 @@
+# ============================================
+# COQUI POS - SALES ANALYTICS (COLUMNAR)
+# ============================================
+# Dashboard queries over the order history. Orders are
+# materialized once into parallel NumPy arrays (one row
+# per order, plus one row per order line for items), so
+# a range query is a boolean mask and every aggregate -
+# by day, ISO week, month, year, hour of day or weekday -
+# is a vectorized group-and-sum instead of a Python loop
+# over order dicts.
+#
+# The columns follow the order index: new orders are
+# appended to the arrays, and any other change (refund,
+# reload from disk) rebuilds them on the next query.
+# NumPy is optional; without it the analytics API
+# reports itself unavailable and nothing else changes.
+
+import threading
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Supported `by` groupings
+GROUPINGS = ('day', 'week', 'month', 'year', 'hour', 'weekday')
+
+WEEKDAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+
+class OrderColumns:
+    """Orders as parallel NumPy arrays, one row per order"""
+
+    def __init__(self, orders, sales_date, timestamp):
+        self._sales_date = sales_date
+        self._timestamp = timestamp
+        self._payment_codes = {}
+        self._item_codes = {}
+        self.payment_methods = []  # code -> payment method
+        self.item_names = []  # code -> item name
+
+        self.day = np.empty(0, dtype='datetime64[D]')  # sales day (NaT if unknown)
+        self.hour = np.empty(0, dtype=np.int8)  # register hour (-1 if unknown)
+        self.total = np.empty(0, dtype=np.float64)
+        self.tip = np.empty(0, dtype=np.float64)
+        self.tax = np.empty(0, dtype=np.float64)
+        self.payment = np.empty(0, dtype=np.int16)
+        self.refunded = np.empty(0, dtype=bool)
+
+        # Order lines, flattened: owning order row, item code, quantity
+        self.item_order = np.empty(0, dtype=np.int32)
+        self.item_code = np.empty(0, dtype=np.int32)
+        self.item_quantity = np.empty(0, dtype=np.int32)
+
+        self.extend(orders)
+
+    def __len__(self):
+        return len(self.total)
+
+    def extend(self, orders):
+        """Append rows for orders added after the columns were built"""
+        if not orders:
+            return
+        first_row = len(self)
+        days, hours, totals, tips, taxes, payments, refunded = [], [], [], [], [], [], []
+        item_orders, item_codes, quantities = [], [], []
+
+        for row, order in enumerate(orders, first_row):
+            days.append(self._sales_date(order) or 'NaT')
+            moment = self._timestamp(order)
+            hours.append(moment.hour if moment else -1)
+            totals.append(order.get('total', 0) or 0)
+            tips.append(order.get('tip', 0) or 0)
+            taxes.append(order.get('tax', 0) or 0)
+            payments.append(self._code(self._payment_codes, self.payment_methods,
+                                       order.get('paymentMethod') or 'unknown'))
+            refunded.append(bool(order.get('refunded')))
+
+            for item in order.get('items', []):
+                item_orders.append(row)
+                item_codes.append(self._code(self._item_codes, self.item_names, item.get('name')))
+                quantities.append(item.get('quantity', 1))
+
+        self.day = np.concatenate([self.day, np.array(days, dtype='datetime64[D]')])
+        self.hour = np.concatenate([self.hour, np.array(hours, dtype=np.int8)])
+        self.total = np.concatenate([self.total, np.array(totals, dtype=np.float64)])
+        self.tip = np.concatenate([self.tip, np.array(tips, dtype=np.float64)])
+        self.tax = np.concatenate([self.tax, np.array(taxes, dtype=np.float64)])
+        self.payment = np.concatenate([self.payment, np.array(payments, dtype=np.int16)])
+        self.refunded = np.concatenate([self.refunded, np.array(refunded, dtype=bool)])
+        self.item_order = np.concatenate([self.item_order, np.array(item_orders, dtype=np.int32)])
+        self.item_code = np.concatenate([self.item_code, np.array(item_codes, dtype=np.int32)])
+        self.item_quantity = np.concatenate([self.item_quantity, np.array(quantities, dtype=np.int32)])
+
+    @staticmethod
+    def _code(codes, values, value):
+        # Small integer code for a repeated string (payment method, item name)
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(values)
+            values.append(value)
+        return code
+
+    # ----- queries -----
+
+    def select(self, start=None, end=None, include_refunded=False):
+        """Mask of the orders sold start..end (inclusive YYYY-MM-DD)"""
+        mask = ~np.isnat(self.day)
+        if start:
+            mask &= self.day >= np.datetime64(start, 'D')
+        if end:
+            mask &= self.day <= np.datetime64(end, 'D')
+        if not include_refunded:
+            mask &= ~self.refunded
+        return mask
+
+    def totals(self, mask):
+        """Revenue, order count, tips and tax of the selected orders"""
+        orders = int(mask.sum())
+        revenue = float(self.total[mask].sum())
+        return {
+            'revenue': revenue,
+            'orders': orders,
+            'tips': float(self.tip[mask].sum()),
+            'tax': float(self.tax[mask].sum()),
+            'averageOrder': revenue / orders if orders else 0
+        }
+
+    def group(self, mask, by):
+        """Totals of the selected orders per day/week/month/year/hour/weekday"""
+        if by == 'hour':
+            return self._group_fixed(mask, self.hour, 24, 'hour', lambda hour: hour)
+        if by == 'weekday':
+            weekday = self._weekday(self.day)
+            return self._group_fixed(mask, weekday, 7, 'weekday', lambda day: WEEKDAY_NAMES[day])
+
+        days = self.day[mask]
+        if by == 'day':
+            keys = days
+        elif by == 'week':
+            keys = days - self._weekday(days)  # Monday of the ISO week
+        elif by == 'month':
+            keys = days.astype('datetime64[M]')
+        elif by == 'year':
+            keys = days.astype('datetime64[Y]')
+        else:
+            raise ValueError(f'Unknown grouping: {by}')
+
+        periods, inverse = np.unique(keys, return_inverse=True)
+        revenue = np.bincount(inverse, weights=self.total[mask], minlength=len(periods))
+        orders = np.bincount(inverse, minlength=len(periods))
+        tips = np.bincount(inverse, weights=self.tip[mask], minlength=len(periods))
+        return [
+            {
+                'period': self._label(period, by),
+                'revenue': float(revenue[i]),
+                'orders': int(orders[i]),
+                'tips': float(tips[i])
+            }
+            for i, period in enumerate(periods)
+        ]
+
+    def payment_breakdown(self, mask):
+        """Revenue and order count per payment method"""
+        size = len(self.payment_methods)
+        revenue = np.bincount(self.payment[mask], weights=self.total[mask], minlength=size)
+        orders = np.bincount(self.payment[mask], minlength=size)
+        return {
+            method: {'revenue': float(revenue[code]), 'orders': int(orders[code])}
+            for code, method in enumerate(self.payment_methods)
+            if orders[code]
+        }
+
+    def top_items(self, mask, limit=10):
+        """Most sold items among the selected orders"""
+        lines = mask[self.item_order]
+        sold = np.bincount(self.item_code[lines], weights=self.item_quantity[lines],
+                           minlength=len(self.item_names))
+        ranked = np.argsort(-sold, kind='stable')[:limit]
+        return [
+            {'name': self.item_names[code], 'count': int(sold[code])}
+            for code in ranked
+            if sold[code] > 0
+        ]
+
+    def _group_fixed(self, mask, keys, size, name, label):
+        # Groupings with a small fixed key range (hour 0-23, weekday 0-6)
+        mask = mask & (keys >= 0)
+        keys = keys[mask].astype(np.intp)
+        revenue = np.bincount(keys, weights=self.total[mask], minlength=size)
+        orders = np.bincount(keys, minlength=size)
+        tips = np.bincount(keys, weights=self.tip[mask], minlength=size)
+        return [
+            {name: label(key), 'revenue': float(revenue[key]), 'orders': int(orders[key]),
+             'tips': float(tips[key])}
+            for key in range(size)
+        ]
+
+    @staticmethod
+    def _weekday(days):
+        # Monday = 0; 1970-01-01 was a Thursday. NaT days come out as -1
+        weekday = (days.astype(np.int64) + 3) % 7
+        return np.where(np.isnat(days), -1, weekday)
+
+    @staticmethod
+    def _label(period, by):
+        if by == 'week':
+            # ISO year and week are those of the week's Thursday
+            thursday = period + np.timedelta64(3, 'D')
+            year = thursday.astype('datetime64[Y]')
+            week = int((thursday - year.astype('datetime64[D]')).astype(int)) // 7 + 1
+            return f'{year}-W{week:02d}'
+        return str(period)
+
+
+class SalesAnalytics:
+    """Keeps OrderColumns in step with the order index"""
+
+    def __init__(self, order_index, sales_date, timestamp):
+        self._order_index = order_index
+        self._sales_date = sales_date
+        self._timestamp = timestamp
+        self._lock = threading.Lock()
+        self._columns = None
+        self._generation = None
+
+    @property
+    def available(self):
+        """Whether NumPy is installed"""
+        return np is not None
+
+    def columns(self):
+        """Columns for the current order history"""
+        with self._lock:
+            orders = self._order_index.orders()
+            generation = self._order_index.generation
+            if self._columns is None or generation != self._generation:
+                self._columns = OrderColumns(orders, self._sales_date, self._timestamp)
+                self._generation = generation
+            elif len(orders) > len(self._columns):
+                # Only new orders since the last query
+                self._columns.extend(orders[len(self._columns):])
+            return self._columns
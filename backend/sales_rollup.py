@@ -0,0 +1,138 @@
+# ============================================
+# COQUI POS - SALES ROLLUPS
+# ============================================
+# Revenue/order totals kept at four levels in the sales
+# statistics document, all updated together on every
+# order and refund:
+#
+#   sales_by_date   day        2026-03-19
+#   sales_by_week   ISO week   2026-W12
+#   sales_by_month  month      2026-03
+#   sales_by_year   year       2026
+#
+# A date-range query is split into the fewest whole
+# years, months, weeks and days that cover it, so a
+# year-long report reads a handful of rows instead of
+# 365 days.
+
+from datetime import date, datetime, timedelta
+
+# level -> field of the sales document holding its rows
+LEVELS = {
+    'day': 'sales_by_date',
+    'week': 'sales_by_week',
+    'month': 'sales_by_month',
+    'year': 'sales_by_year',
+}
+
+
+def parse_day(value):
+    """YYYY-MM-DD -> date"""
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def period_key(level, day):
+    """Key of the day/week/month/year row a date falls in"""
+    if level == 'day':
+        return day.isoformat()
+    if level == 'week':
+        iso_year, iso_week, _ = day.isocalendar()
+        return f'{iso_year}-W{iso_week:02d}'
+    if level == 'month':
+        return f'{day.year}-{day.month:02d}'
+    return str(day.year)
+
+
+def period_bounds(level, key):
+    """First and last date of a row's period"""
+    if level == 'day':
+        day = parse_day(key)
+        return day, day
+    if level == 'week':
+        first = datetime.strptime(key + '-1', '%G-W%V-%u').date()
+        return first, first + timedelta(days=6)
+    if level == 'month':
+        first = datetime.strptime(key, '%Y-%m').date()
+        return first, _month_end(first)
+    first = date(int(key), 1, 1)
+    return first, date(first.year, 12, 31)
+
+
+def add_sale(sales, day, revenue, orders=1):
+    """Count a sale (or, with negative amounts, a refund) at every level"""
+    day = parse_day(day)
+    for level, field in LEVELS.items():
+        rows = sales.setdefault(field, {})
+        row = rows.setdefault(period_key(level, day), {'revenue': 0, 'orders': 0})
+        row['revenue'] += revenue
+        row['orders'] += orders
+
+
+def build_rollups(sales_by_date):
+    """Week, month and year rows computed from the daily rows"""
+    rollups = {}
+    for day, row in sales_by_date.items():
+        add_sale(rollups, day, row['revenue'], row['orders'])
+    return {field: rollups.get(field, {}) for level, field in LEVELS.items() if level != 'day'}
+
+
+def range_totals(sales, start, end):
+    """Revenue and orders for start..end (inclusive dates)"""
+    revenue = 0
+    orders = 0
+    for level, key in _cover(start, end):
+        row = sales.get(LEVELS[level], {}).get(key)
+        if row:
+            revenue += row['revenue']
+            orders += row['orders']
+    return {'revenue': revenue, 'orders': orders}
+
+
+def breakdown(sales, start, end, level):
+    """Totals per day/week/month/year of start..end that had sales"""
+    rows = []
+    for key in sorted(sales.get(LEVELS[level], {})):
+        first, last = period_bounds(level, key)
+        if last < start or first > end:
+            continue
+        if start <= first and last <= end:
+            totals = sales[LEVELS[level]][key]
+        else:
+            # Period only partly inside the range: sum its overlap
+            first, last = max(first, start), min(last, end)
+            totals = range_totals(sales, first, last)
+        if totals['orders']:
+            rows.append({
+                'period': key,
+                'from': first.isoformat(),
+                'to': last.isoformat(),
+                'revenue': totals['revenue'],
+                'orders': totals['orders']
+            })
+    return rows
+
+
+def _month_end(day):
+    next_month = date(day.year + day.month // 12, day.month % 12 + 1, 1)
+    return next_month - timedelta(days=1)
+
+
+def _cover(start, end):
+    # Walk start..end taking the largest whole period that fits at each step;
+    # a week is only used when it doesn't stop a whole month being used next
+    day = start
+    while day <= end:
+        month_end = _month_end(day)
+        year_end = date(day.year, 12, 31)
+        week_end = day + timedelta(days=6)
+        if day.month == 1 and day.day == 1 and year_end <= end:
+            level, last = 'year', year_end
+        elif day.day == 1 and month_end <= end:
+            level, last = 'month', month_end
+        elif day.weekday() == 0 and week_end <= end and (
+                week_end <= month_end or _month_end(month_end + timedelta(days=1)) > end):
+            level, last = 'week', week_end
+        else:
+            level, last = 'day', day
+        yield level, period_key(level, day)
+        day = last + timedelta(days=1)
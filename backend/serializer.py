@@ -0,0 +1,53 @@
+# ============================================
+# COQUI POS - JSON SERIALIZER
+# ============================================
+# The one place JSON is encoded and decoded, for the
+# storage files and the API responses alike. Output is
+# compact UTF-8 (no indentation), which makes the data
+# files a fraction of their pretty-printed size and
+# quicker to parse.
+#
+# orjson is used when it is installed (several times
+# faster than the standard library); otherwise the
+# stdlib json module produces the same compact output.
+#
+# Compact in-memory records (records.py) are encoded as
+# the dicts they stand for.
+
+import json
+
+from records import Record
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND = 'orjson' if orjson else 'json'
+
+
+def _default(obj):
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def dumps(obj):
+    """Encode to compact JSON (UTF-8 bytes)"""
+    if orjson:
+        return orjson.dumps(obj, default=_default)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False, default=_default).encode('utf-8')
+
+
+def dumps_text(obj):
+    """Encode to compact JSON (str)"""
+    if orjson:
+        return orjson.dumps(obj, default=_default).decode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False, default=_default)
+
+
+def loads(data):
+    """Decode JSON from bytes or str"""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
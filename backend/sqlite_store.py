@@ -0,0 +1,230 @@
+# ============================================
+# COQUI POS - SQLITE STORAGE
+# ============================================
+# SQLite-backed store for orders, tickets, voids and
+# the sales document. Each record is kept as a JSON row
+# keyed by its ID, so single-record reads and updates
+# never parse the whole history.
+#
+# The database runs in WAL mode so readers don't block
+# the writer, and every thread in every worker process
+# gets its own pooled connection.
+#
+# Every write bumps a change counter for its table or
+# document in the same transaction (the versions table),
+# so in-memory copies can tell whether *their* data
+# changed without reloading on every write to the file.
+
+from contextlib import contextmanager, nullcontext
+import os
+import sqlite3
+import threading
+
+import serializer
+
+# table -> record field used as its key
+TABLES = {
+    'orders': 'orderId',
+    'tickets': 'ticketId',
+    'voids': 'voidId',
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    record_id TEXT UNIQUE,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tickets (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    record_id TEXT UNIQUE,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS voids (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    record_id TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS documents (
+    name TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS versions (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ticket_changes (
+    version INTEGER PRIMARY KEY,
+    data TEXT NOT NULL
+);
+"""
+
+
+def _encode(record):
+    return serializer.dumps_text(record)
+
+
+class SQLiteStore:
+    """Record store on top of a single SQLite database file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+        with self.connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def connection(self):
+        """Return this thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        # A forked worker must not reuse its parent's connection
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """
+        Make the writes inside one transaction (all stored, or none):
+
+            with db.transaction():
+                db.append('orders', orders)
+                db.save_document('sales', sales)
+        """
+        if getattr(self._local, 'in_transaction', False):
+            yield  # Already inside one
+            return
+        conn = self.connection()
+        self._local.in_transaction = True
+        try:
+            with conn:
+                yield
+        finally:
+            self._local.in_transaction = False
+
+    def _writing(self):
+        # Commits on exit, unless an outer transaction() will
+        if getattr(self._local, 'in_transaction', False):
+            return nullcontext(self.connection())
+        return self.connection()
+
+    # ----- record tables -----
+
+    def load(self, table):
+        """Return every record in a table, oldest first"""
+        rows = self.connection().execute(f'SELECT data FROM {table} ORDER BY seq')
+        return [serializer.loads(data) for (data,) in rows]
+
+    def iterate(self, table):
+        """Yield every record in a table, oldest first, without loading them all"""
+        cursor = self.connection().cursor()
+        cursor.execute(f'SELECT data FROM {table} ORDER BY seq')
+        for (data,) in cursor:
+            yield serializer.loads(data)
+
+    def load_where(self, table, field, value):
+        """Return the records whose JSON field equals value, oldest first"""
+        rows = self.connection().execute(
+            f'SELECT data FROM {table} WHERE json_extract(data, ?) = ? ORDER BY seq',
+            (f'$.{field}', value)
+        )
+        return [serializer.loads(data) for (data,) in rows]
+
+    def save(self, table, records):
+        """Replace the whole table with the given records"""
+        with self._writing() as conn:
+            conn.execute(f'DELETE FROM {table}')
+            self._insert(conn, table, records)
+            self._bump(conn, table)
+
+    def append(self, table, records):
+        """Insert new records"""
+        with self._writing() as conn:
+            self._insert(conn, table, records)
+            self._bump(conn, table)
+
+    def get(self, table, record_id):
+        """Return one record by ID, or None"""
+        row = self.connection().execute(
+            f'SELECT data FROM {table} WHERE record_id = ?', (record_id,)
+        ).fetchone()
+        return serializer.loads(row[0]) if row else None
+
+    def update(self, table, record):
+        """Overwrite one existing record (matched by its ID)"""
+        key = TABLES[table]
+        with self._writing() as conn:
+            conn.execute(
+                f'UPDATE {table} SET data = ? WHERE record_id = ?',
+                (_encode(record), record.get(key))
+            )
+            self._bump(conn, table)
+
+    def count(self, table):
+        """Number of records in a table"""
+        return self.connection().execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+
+    def signature(self, name):
+        """
+        Changes whenever a table or document is written (by any process);
+        writes to the others leave it alone
+        """
+        row = self.connection().execute(
+            'SELECT version FROM versions WHERE name = ?', (name,)
+        ).fetchone()
+        # A recreated database starts counting again: tell them apart
+        return (os.stat(self.path).st_ino, row[0] if row else 0)
+
+    def _bump(self, conn, name):
+        conn.execute(
+            'INSERT INTO versions (name, version) VALUES (?, 1) '
+            'ON CONFLICT(name) DO UPDATE SET version = version + 1',
+            (name,)
+        )
+
+    def _insert(self, conn, table, records):
+        key = TABLES[table]
+        conn.executemany(
+            f'INSERT OR REPLACE INTO {table} (record_id, data) VALUES (?, ?)',
+            [(record.get(key), _encode(record)) for record in records]
+        )
+
+    # ----- documents (sales statistics) -----
+
+    def load_document(self, name, default):
+        """Return a stored JSON document, or the default"""
+        row = self.connection().execute(
+            'SELECT data FROM documents WHERE name = ?', (name,)
+        ).fetchone()
+        return serializer.loads(row[0]) if row else default
+
+    def save_document(self, name, document):
+        """Store a JSON document"""
+        with self._writing() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO documents (name, data) VALUES (?, ?)',
+                (name, _encode(document))
+            )
+            self._bump(conn, name)
+
+    # ----- ticket change feed (shared by worker processes) -----
+
+    def append_ticket_changes(self, changes, keep):
+        """Add (version, ticket) feed entries, keeping only the latest `keep`"""
+        with self._writing() as conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO ticket_changes (version, data) VALUES (?, ?)',
+                [(version, _encode(ticket)) for version, ticket in changes]
+            )
+            conn.execute('DELETE FROM ticket_changes WHERE version <= ?', (changes[-1][0] - keep,))
+
+    def ticket_changes_after(self, version):
+        """(version, ticket) feed entries after a version, oldest first"""
+        rows = self.connection().execute(
+            'SELECT version, data FROM ticket_changes WHERE version > ? ORDER BY version', (version,)
+        )
+        return [(v, serializer.loads(data)) for v, data in rows]
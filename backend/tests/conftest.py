@@ -0,0 +1,98 @@
+# ============================================
+# COQUI POS - TEST FIXTURES
+# ============================================
+# Every test gets its own backend: app.py is imported
+# fresh against a temporary COQUI_DATA_DIR (seeded with
+# the bundled menu), so tests never touch database/ or
+# each other's data.
+#
+#   cd backend && python -m pytest tests
+
+import importlib
+import os
+import shutil
+import sys
+import threading
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """Temporary data directory holding the bundled menu"""
+    path = tmp_path / 'data'
+    path.mkdir()
+    shutil.copy(os.path.join(BACKEND_DIR, 'database', 'menu.json'), path / 'menu.json')
+    return path
+
+
+@pytest.fixture
+def make_app(data_dir, monkeypatch):
+    """
+    Import a fresh copy of app.py on the test's data directory, e.g.
+    make_app('sqlite', COQUI_GROUP_COMMIT_WINDOW_MS=20). Each call gives a
+    separate module, like another worker process on the same data.
+    """
+    def make(storage='json', **env):
+        monkeypatch.setenv('COQUI_DATA_DIR', str(data_dir))
+        monkeypatch.setenv('COQUI_STORAGE', storage)
+        for name, value in env.items():
+            monkeypatch.setenv(name, str(value))
+        sys.modules.pop('app', None)
+        return importlib.import_module('app')
+
+    yield make
+    sys.modules.pop('app', None)
+
+
+@pytest.fixture
+def menu_items(data_dir):
+    """The bundled menu's items"""
+    import serializer
+    with open(data_dir / 'menu.json', 'rb') as f:
+        return serializer.loads(f.read())['items']
+
+
+@pytest.fixture
+def new_order(menu_items):
+    """Factory for orders the way PaymentModal.jsx sends them"""
+    def make(order_id, **fields):
+        item = menu_items[0]
+        return dict({
+            'orderId': order_id,
+            'items': [dict(item, quantity=1)],
+            'subtotal': item['price'],
+            'tax': round(item['price'] * 0.115, 2),
+            'tip': 0,
+            'total': round(item['price'] * 1.115, 2),
+            'paymentMethod': 'cash',
+            'timestamp': '3/10/2026, 11:15:00 AM',
+            'userRole': 'Employee',
+        }, **fields)
+    return make
+
+
+@pytest.fixture
+def run_together():
+    """Call action(n) from count threads at once; returns {n: result or exception}"""
+    def run_all(count, action):
+        results = {}
+        barrier = threading.Barrier(count)
+
+        def run(n):
+            barrier.wait()
+            try:
+                results[n] = action(n)
+            except Exception as e:
+                results[n] = e
+
+        threads = [threading.Thread(target=run, args=(n,)) for n in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+    return run_all
@@ -0,0 +1,49 @@
+# Benchmark suite: seeded histories are reproducible and every timed operation runs
+
+import filecmp
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+import api_benchmark
+from harness import percentiles
+from synthetic import seed_data_dir
+
+DATA_FILES = ['orders.json', 'sales.json', 'tickets.json', 'voids.json']
+
+
+def test_same_seed_same_history(tmp_path):
+    for name, seed in [('a', 42), ('b', 42), ('c', 7)]:
+        seed_data_dir(str(tmp_path / name), 300, seed=seed)
+
+    assert filecmp.cmpfiles(tmp_path / 'a', tmp_path / 'b', DATA_FILES, shallow=False)[0] == DATA_FILES
+    assert not filecmp.cmp(tmp_path / 'a' / 'orders.json', tmp_path / 'c' / 'orders.json', shallow=False)
+
+
+@pytest.mark.parametrize('storage', ['json', 'sqlite'])
+def test_benchmark_runs_on_a_seeded_history(make_app, data_dir, storage):
+    seed_data_dir(str(data_dir), 300)
+    if storage == 'sqlite':
+        make_app('sqlite').app.test_cli_runner().invoke(args=['import-json'])
+    app = make_app(storage)
+    assert app.load_sales()['total_orders'] == 300
+
+    results = api_benchmark.run(app.app.test_client(), iterations=3)
+
+    assert results['POST /api/orders'] and len(results['POST /api/orders']) == 3
+    assert 'PATCH /api/tickets/:id/void' in results and 'GET /api/sales/range' in results
+    # Every order the benchmark placed was refunded again
+    assert app.load_sales()['total_orders'] == 300
+
+
+def test_percentiles():
+    latencies = [n / 1000 for n in range(1, 101)]  # 1..100 ms
+
+    p50, p95, p99 = percentiles(latencies)
+
+    assert (round(p50, 2), round(p95, 2), round(p99, 2)) == (50.5, 95.05, 99.01)
+    assert percentiles([0.002]) == (2, 2, 2)
+    assert percentiles([]) == (0, 0, 0)
@@ -0,0 +1,133 @@
+# POST /api/orders/bulk: bad orders are reported, not stored; resends are idempotent
+
+import pytest
+
+
+def bulk(client, orders):
+    response = client.post('/api/orders/bulk', json={'orders': orders})
+    return response.status_code, response.get_json()
+
+
+def line(menu_items, **fields):
+    return dict(menu_items[0], **dict({'quantity': 1}, **fields))
+
+
+@pytest.mark.parametrize('storage', ['json', 'journal', 'sqlite'])
+def test_mixed_batch(make_app, new_order, menu_items, storage):
+    app = make_app(storage)
+    client = app.app.test_client()
+    orders = [
+        new_order('ORD-1'),
+        new_order('ORD-2', items=[1]),
+        new_order('ORD-3', items=[line(menu_items, quantity='2')]),
+        new_order('ORD-4', items=[line(menu_items, id='NOT-ON-MENU')]),
+        new_order('ORD-5', items=[line(menu_items, price='4.99')]),
+        new_order('ORD-6', items=[line(menu_items, quantity=0)]),
+        new_order('ORD-7', total=True),
+        new_order('ORD-8'),
+    ]
+
+    status, body = bulk(client, orders)
+
+    assert status == 200
+    assert [r['status'] for r in body['results']] == (
+        ['created'] + ['error'] * 6 + ['created'])
+    assert body['results'][1]['message'] == 'item 1: must be an object'
+    assert body['results'][2]['message'].startswith('item 1: quantity')
+    assert sorted(o['orderId'] for o in app.load_orders()) == ['ORD-1', 'ORD-8']
+    assert app.load_sales()['total_orders'] == 2
+
+
+def test_fixed_order_can_be_resent(make_app, new_order, menu_items):
+    app = make_app('json')
+    client = app.app.test_client()
+    bad = new_order('ORD-1', items=[line(menu_items, quantity='2')])
+    assert bulk(client, [bad])[1]['results'][0]['status'] == 'error'
+
+    # Nothing was stored, so the corrected order isn't taken for a duplicate
+    fixed = new_order('ORD-1', items=[line(menu_items, quantity=2)])
+    assert bulk(client, [fixed])[1]['results'][0]['status'] == 'created'
+    assert app.load_sales()['total_orders'] == 1
+
+
+@pytest.mark.parametrize('storage', ['json', 'sqlite'])
+def test_resent_batch_is_counted_once(make_app, new_order, storage):
+    app = make_app(storage)
+    client = app.app.test_client()
+    orders = [new_order(f'ORD-{n}') for n in range(3)] + [new_order('ORD-0')]
+
+    first = bulk(client, orders)[1]
+    again = bulk(client, orders)[1]
+
+    assert (first['created'], first['duplicates']) == (3, 1)
+    assert (again['created'], again['duplicates']) == (0, 4)
+    assert len(app.load_orders()) == 3
+    assert app.load_sales()['total_orders'] == 3
+
+
+def test_concurrent_resends_are_counted_once(make_app, new_order, run_together):
+    app = make_app('json')
+    orders = [new_order(f'ORD-{n}') for n in range(5)]
+
+    results = run_together(4, lambda n: bulk(app.app.test_client(), orders)[1]['created'])
+
+    assert sum(results.values()) == 5
+    assert len(app.load_orders()) == 5
+    assert app.load_sales()['total_orders'] == 5
+
+
+def test_single_order_line_is_checked(make_app, new_order, menu_items):
+    app = make_app('json')
+    response = app.app.test_client().post(
+        '/api/orders', json=new_order('ORD-1', items=[line(menu_items, quantity='2')]))
+
+    assert response.status_code == 400
+    assert app.load_orders() == []
+    assert app.load_sales()['total_orders'] == 0
+
+
+@pytest.mark.parametrize('storage', ['json', 'sqlite'])
+def test_failed_write_is_reported_per_order(make_app, new_order, storage, monkeypatch):
+    app = make_app(storage)
+    client = app.app.test_client()
+
+    def failing_write(*args):
+        raise OSError('disk full')
+
+    target = app.db if storage == 'sqlite' else app
+    monkeypatch.setattr(target, 'append' if storage == 'sqlite' else 'write_json_file', failing_write)
+    status, body = bulk(client, [new_order('ORD-1'), new_order('ORD-2')])
+    monkeypatch.undo()
+
+    assert status == 200
+    assert [(r['status'], r['message']) for r in body['results']] == [('error', 'disk full')] * 2
+    assert app.load_orders() == []
+    assert app.load_sales()['total_orders'] == 0
+    # Nothing was stored, so the resend goes through
+    assert bulk(client, [new_order('ORD-1'), new_order('ORD-2')])[1]['created'] == 2
+
+
+def test_unstorable_order_fails_alone(make_app, new_order, monkeypatch):
+    app = make_app('json')
+    count_order = app.add_order_to_sales
+
+    def add_order_to_sales(sales, order):
+        if order['orderId'] == 'ORD-2':
+            raise ValueError('cannot count this order')
+        count_order(sales, order)
+
+    monkeypatch.setattr(app, 'add_order_to_sales', add_order_to_sales)
+    body = bulk(app.app.test_client(), [new_order(f'ORD-{n}') for n in range(4)])[1]
+
+    assert [r['status'] for r in body['results']] == ['created', 'created', 'error', 'created']
+    assert body['results'][2]['message'] == 'cannot count this order'
+    assert app.load_sales()['total_orders'] == 3
+
+
+def test_single_order_must_use_menu_items(make_app, new_order, menu_items):
+    app = make_app('json')
+    response = app.app.test_client().post(
+        '/api/orders', json=new_order('ORD-1', items=[line(menu_items, id='NOT-ON-MENU')]))
+
+    assert response.status_code == 400
+    assert response.get_json()['message'] == 'item 1: id must be a menu item'
@@ -0,0 +1,82 @@
+# Writes hold a per-dataset lock (threads and processes) and replace files atomically
+
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from dataset_lock import DatasetLock
+
+fcntl = pytest.importorskip('fcntl')
+
+
+@pytest.mark.parametrize('storage', ['json', 'journal', 'sqlite'])
+def test_workers_do_not_lose_each_others_orders(make_app, new_order, run_together, storage):
+    # Two copies of the app on one data directory, like two worker processes
+    workers = [make_app(storage), make_app(storage)]
+
+    results = run_together(8, lambda n: workers[n % 2].app.test_client().post(
+        '/api/orders', json=new_order(f'ORD-{n}')).status_code)
+
+    assert set(results.values()) == {201}
+    expected = sorted(f'ORD-{n}' for n in range(8))
+    # Each worker's in-memory index noticed the other's writes (storage signatures)
+    for worker in workers + [make_app(storage)]:
+        assert sorted(o['orderId'] for o in worker.order_index.orders()) == expected
+        assert worker.load_sales()['total_orders'] == 8
+
+
+def test_lock_file_excludes_another_holder(tmp_path):
+    path = str(tmp_path / '.orders.lock')
+    held, other = DatasetLock(path), DatasetLock(path)
+    acquired = threading.Event()
+
+    def take_other():
+        with other:
+            acquired.set()
+
+    with held:
+        with held:  # Re-entrant for its own holder
+            thread = threading.Thread(target=take_other)
+            thread.start()
+            assert not acquired.wait(0.2)
+    assert acquired.wait(5)
+    thread.join()
+
+
+def test_lock_of_a_crashed_process_is_released(tmp_path):
+    path = str(tmp_path / '.orders.lock')
+    holder = subprocess.Popen([sys.executable, '-c', (
+        'import fcntl, sys, time\n'
+        f'f = open({path!r}, "a"); fcntl.flock(f, fcntl.LOCK_EX)\n'
+        'print("locked", flush=True); time.sleep(60)\n'
+    )], stdout=subprocess.PIPE, text=True)
+    try:
+        assert holder.stdout.readline().strip() == 'locked'
+        holder.kill()
+        holder.wait()
+
+        started = time.monotonic()
+        with DatasetLock(path):
+            assert time.monotonic() - started < 5
+    finally:
+        holder.kill()
+        holder.stdout.close()
+
+
+def test_failed_write_leaves_the_old_file(make_app, monkeypatch, data_dir):
+    app = make_app('json')
+    path = str(data_dir / 'voids.json')
+    app.write_json_file(path, [{'voidId': 'VOID-1'}])
+
+    def fail(*args):
+        raise OSError('disk full')
+    monkeypatch.setattr(app.os, 'replace', fail)
+
+    with pytest.raises(OSError):
+        app.write_json_file(path, [{'voidId': 'VOID-2'}])
+    assert app.read_json_file(path, []) == [{'voidId': 'VOID-1'}]
+    assert not [name for name in os.listdir(data_dir) if name.startswith('.tmp-')]
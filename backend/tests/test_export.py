@@ -0,0 +1,69 @@
+# GET /api/export/<dataset>: records streamed as NDJSON or CSV, filtered by date
+
+import csv
+import io
+import json
+
+import pytest
+
+
+def ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+@pytest.fixture
+def client(make_app, new_order):
+    """Orders rung up on March 10th, 11th and 12th, 2026 (bulk import)"""
+    def make(storage):
+        client = make_app(storage).app.test_client()
+        client.post('/api/orders/bulk', json={'orders': [
+            new_order(f'ORD-{day}', timestamp=f'3/{day}/2026, 9:00:00 AM') for day in (10, 11, 12)
+        ]})
+        return client
+    return make
+
+
+@pytest.mark.parametrize('storage', ['json', 'journal', 'sqlite'])
+def test_orders_in_a_date_range(client, storage):
+    response = client(storage).get('/api/export/orders?from=2026-03-11&to=2026-03-12')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert 'attachment' in response.headers['Content-Disposition']
+    assert [o['orderId'] for o in ndjson(response)] == ['ORD-11', 'ORD-12']
+
+
+def test_orders_as_csv(client, menu_items):
+    response = client('json').get('/api/export/orders?format=csv&to=2026-03-10')
+
+    assert response.mimetype == 'text/csv'
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [(r['orderId'], r['salesDate']) for r in rows] == [('ORD-10', '2026-03-10')]
+    assert rows[0]['items'] == f"1x {menu_items[0]['name']}"
+    assert rows[0]['refunded'] == 'False'
+
+
+def test_empty_csv_is_just_the_header(client):
+    response = client('json').get('/api/export/voids?format=csv')
+
+    assert response.get_data(as_text=True).splitlines() == [
+        'voidId,type,ticketId,voidedAt,voidedBy,originalSentBy,reason,items']
+
+
+def test_tickets(make_app, menu_items):
+    client = make_app('json').app.test_client()
+    sent = client.post('/api/tickets', json={'items': [dict(menu_items[0], quantity=1)]}).get_json()
+    client.patch(f"/api/tickets/{sent['ticketId']}/close", json={})
+
+    tickets = ndjson(client.get('/api/export/tickets'))
+
+    assert [(t['ticketId'], t['status']) for t in tickets] == [(sent['ticketId'], 'closed')]
+
+
+@pytest.mark.parametrize('url, status', [
+    ('/api/export/menu', 404),
+    ('/api/export/orders?format=xml', 400),
+    ('/api/export/orders?from=10/03/2026', 400),
+])
+def test_bad_requests(client, url, status):
+    assert client('json').get(url).status_code == status
@@ -0,0 +1,112 @@
+# Concurrent checkouts share one write; a bad order fails only its own caller
+
+import pytest
+
+from group_commit import GroupCommit
+
+
+def test_batches_concurrent_records(run_together):
+    batches = []
+    writer = GroupCommit(batches.append, window=0.2)
+    run_together(5, writer.submit)
+    assert sorted(record for batch in batches for record in batch) == [0, 1, 2, 3, 4]
+    assert len(batches) < 5
+
+
+def test_bad_record_fails_only_its_caller(run_together):
+    stored = []
+
+    def commit(records):  # All or nothing, like commit_orders
+        if 'bad' in records:
+            raise ValueError('bad record')
+        stored.extend(records)
+
+    writer = GroupCommit(commit, window=0.2)
+    results = run_together(5, lambda n: writer.submit('bad' if n == 2 else n))
+
+    assert isinstance(results.pop(2), ValueError)
+    assert list(results.values()) == [None] * 4
+    assert sorted(stored) == [0, 1, 3, 4]
+
+
+@pytest.mark.parametrize('storage', ['json', 'journal', 'sqlite'])
+def test_mixed_checkout_batch(make_app, new_order, run_together, storage):
+    app = make_app(storage, COQUI_GROUP_COMMIT_WINDOW_MS=200)
+    batch_sizes = []
+    commit = app.order_writer._commit
+    app.order_writer._commit = lambda orders: batch_sizes.append(len(orders)) or commit(orders)
+
+    # Passes validation but can't be counted (e.g. a storage-level failure)
+    count_order = app.add_order_to_sales
+
+    def add_order_to_sales(sales, order):
+        if order['orderId'] == 'ORD-2':
+            raise ValueError('cannot count this order')
+        count_order(sales, order)
+
+    app.add_order_to_sales = add_order_to_sales
+
+    results = run_together(5, lambda n: app.app.test_client().post(
+        '/api/orders', json=new_order(f'ORD-{n}')).status_code)
+
+    assert results == {0: 201, 1: 201, 2: 500, 3: 201, 4: 201}
+    assert max(batch_sizes) > 1  # They really were committed together first
+    stored = sorted(o['orderId'] for o in app.load_orders())
+    assert stored == ['ORD-0', 'ORD-1', 'ORD-3', 'ORD-4']
+    assert app.load_sales()['total_orders'] == 4
+
+
+def test_invalid_order_is_rejected_before_the_batch(make_app, new_order, run_together):
+    app = make_app('json', COQUI_GROUP_COMMIT_WINDOW_MS=200)
+    results = run_together(5, lambda n: app.app.test_client().post(
+        '/api/orders', json=new_order(f'ORD-{n}', total='x' if n == 2 else 11.48)).status_code)
+
+    assert results == {0: 201, 1: 201, 2: 400, 3: 201, 4: 201}
+    assert len(app.load_orders()) == 4
+    assert app.load_sales()['total_orders'] == 4
+
+
+@pytest.mark.parametrize('storage', ['json', 'sqlite'])
+def test_failed_write_leaves_sales_alone(make_app, new_order, storage, monkeypatch):
+    app = make_app(storage)
+    client = app.app.test_client()
+    client.post('/api/orders', json=new_order('ORD-1'))
+    before = app.load_sales()
+
+    def failing_write(*args):
+        raise OSError('disk full')
+
+    target = app.db if storage == 'sqlite' else app
+    monkeypatch.setattr(target, 'append' if storage == 'sqlite' else 'write_json_file', failing_write)
+    assert client.post('/api/orders', json=new_order('ORD-2')).status_code == 500
+    monkeypatch.undo()
+
+    assert app.load_sales() == before
+    assert [o['orderId'] for o in app.load_orders()] == ['ORD-1']
+    assert app.order_index.get('ORD-2') is None
+
+
+def test_submit_all_stays_in_one_batch(run_together):
+    batches = []
+
+    def commit(records):
+        batches.append(list(records))
+        return [record % 2 == 0 for record in records]
+
+    writer = GroupCommit(commit, window=0.2, max_batch=3)
+    results = run_together(2, lambda n: writer.submit_all(range(n * 10, n * 10 + 5)))
+
+    assert results == {0: [True, False, True, False, True], 1: [True, False, True, False, True]}
+    assert sorted(len(batch) for batch in batches) == [5, 5]  # Never split, over max_batch or not
+
+
+def test_submit_all_reports_each_failure():
+    def commit(records):
+        if 'bad' in records:
+            raise ValueError('bad record')
+        return ['stored'] * len(records)
+
+    outcomes = GroupCommit(commit, window=0).submit_all(['a', 'bad', 'b'])
+
+    assert outcomes[0] == outcomes[2] == 'stored'
+    assert isinstance(outcomes[1], ValueError)
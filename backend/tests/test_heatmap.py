@@ -0,0 +1,43 @@
+# Weekday x hour heatmap kept up to date at checkout (for staffing)
+
+import json
+
+import pytest
+
+MANAGER = {'managerPassword': 'admin123'}
+TUESDAY, SATURDAY = 1, 5
+
+
+def heatmap(client):
+    return client.get('/api/analytics/heatmap').get_json()['heatmap']
+
+
+@pytest.mark.parametrize('storage', ['json', 'sqlite'])
+def test_orders_land_in_their_weekday_and_hour(make_app, new_order, storage):
+    client = make_app(storage).app.test_client()
+    # March 10th 2026 is a Tuesday, the 14th a Saturday
+    client.post('/api/orders', json=new_order('ORD-1', timestamp='3/10/2026, 11:15:00 AM', total=10))
+    client.post('/api/orders', json=new_order('ORD-2', timestamp='3/10/2026, 11:59:00 AM', total=5))
+    client.post('/api/orders', json=new_order('ORD-3', timestamp='3/14/2026, 7:30:00 PM', total=8))
+    client.post('/api/orders/ORD-2/refund', json=MANAGER)
+
+    grid = heatmap(client)
+    assert grid['weekdays'][TUESDAY] == 'Tuesday' and grid['hours'] == list(range(24))
+    assert grid['orders'][TUESDAY][11] == 1 and grid['revenue'][TUESDAY][11] == 10
+    assert grid['orders'][SATURDAY][19] == 1 and grid['revenue'][SATURDAY][19] == 8
+    assert sum(map(sum, grid['orders'])) == 2
+
+
+def test_built_for_sales_from_an_older_version(make_app, new_order, data_dir):
+    app = make_app('json')
+    client = app.app.test_client()
+    client.post('/api/orders', json=new_order('ORD-1', timestamp='3/10/2026, 11:15:00 AM'))
+    expected = heatmap(client)
+
+    # sales.json written before the heatmap existed
+    sales = app.load_sales()
+    del sales['sales_by_hour']
+    (data_dir / 'sales.json').write_text(json.dumps(sales))
+
+    assert heatmap(make_app('json').app.test_client()) == expected
+    assert expected['orders'][TUESDAY][11] == 1
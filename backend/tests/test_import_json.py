@@ -0,0 +1,33 @@
+# flask --app app import-json copies the JSON data into SQLite
+
+from sqlite_store import SQLiteStore
+
+
+def test_import_includes_journaled_orders(make_app, new_order):
+    app = make_app('journal')
+    client = app.app.test_client()
+    for n in range(3):
+        assert client.post('/api/orders', json=new_order(f'ORD-{n}')).status_code == 201
+    assert app.order_journal.record_count == 3  # Not compacted into orders.json yet
+
+    result = app.app.test_cli_runner().invoke(args=['import-json'])
+    assert result.exit_code == 0, result.output
+
+    store = SQLiteStore(app.DATABASE_FILE)
+    assert [o['orderId'] for o in store.load('orders')] == ['ORD-0', 'ORD-1', 'ORD-2']
+    assert store.load_document('sales', {})['total_orders'] == 3
+
+
+def test_import_includes_archived_tickets(make_app, menu_items):
+    app = make_app('json')
+    client = app.app.test_client()
+    first = client.post('/api/tickets', json={'items': [dict(menu_items[0], quantity=1)]}).get_json()
+    client.post('/api/tickets', json={'items': [dict(menu_items[1], quantity=1)]})
+    client.patch(f"/api/tickets/{first['ticketId']}/close", json={})
+
+    result = app.app.test_cli_runner().invoke(args=['import-json'])
+    assert result.exit_code == 0, result.output
+
+    statuses = {t['ticketId']: t['status'] for t in SQLiteStore(app.DATABASE_FILE).load('tickets')}
+    assert len(statuses) == 2
+    assert statuses[first['ticketId']] == 'closed'
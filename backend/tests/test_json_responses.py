@@ -0,0 +1,28 @@
+# API responses go through serializer.py, with jsonify's argument rules
+
+import json
+
+import pytest
+
+
+def test_jsonify_arguments(make_app):
+    app = make_app('json')
+    with app.app.app_context():
+        def body(*args, **kwargs):
+            response = app.jsonify(*args, **kwargs)
+            assert response.mimetype == 'application/json'
+            return json.loads(response.get_data())
+
+        assert body({'a': 1}) == {'a': 1}
+        assert body([1, 2]) == [1, 2]
+        assert body(1, 2) == [1, 2]
+        assert body(a=1, b='x') == {'a': 1, 'b': 'x'}
+        assert body() is None
+        with pytest.raises(TypeError):
+            app.jsonify(1, a=2)
+
+
+def test_responses_are_compact(make_app):
+    response = make_app('json').app.test_client().get('/api/menu')
+    assert response.status_code == 200
+    assert b'": ' not in response.get_data() and b', "' not in response.get_data()
@@ -0,0 +1,67 @@
+# Menu catalog: versioned edits, since-version deltas and ETags shared by all registers
+
+import pytest
+
+MANAGER = {'managerPassword': 'admin123'}
+
+
+def menu(client, query=''):
+    return client.get(f'/api/menu{query}').get_json()
+
+
+@pytest.mark.parametrize('storage', ['json', 'sqlite'])
+def test_registers_fetch_only_the_changes(make_app, menu_items, storage):
+    client = make_app(storage).app.test_client()
+    start = menu(client)
+    assert start['full'] is True and len(start['items']) == len(menu_items)
+    first, second = menu_items[0]['id'], menu_items[1]['id']
+
+    client.patch(f'/api/menu/items/{first}', json=dict(MANAGER, price=9.5))
+    client.delete(f'/api/menu/items/{second}', json=MANAGER)
+
+    # Another worker process serves the edits too
+    delta = menu(make_app(storage).app.test_client(), f"?since={start['version']}")
+    assert delta['version'] == start['version'] + 2 and delta['full'] is False
+    assert [(i['id'], i['price']) for i in delta['items']] == [(first, 9.5)]
+    assert delta['removed'] == [second]
+    assert menu(client, f"?since={delta['version']}")['items'] == []
+    assert menu(client, f"?since={delta['version'] + 5}")['full'] is True
+
+
+def test_unchanged_menu_answers_304(make_app, menu_items):
+    client = make_app('json').app.test_client()
+    first = client.get('/api/menu')
+    etag = first.headers['ETag']
+
+    assert client.get('/api/menu', headers={'If-None-Match': etag}).status_code == 304
+
+    client.patch(f"/api/menu/items/{menu_items[0]['id']}", json=dict(MANAGER, price=1))
+    changed = client.get('/api/menu', headers={'If-None-Match': etag})
+    assert changed.status_code == 200 and changed.headers['ETag'] != etag
+
+
+def test_replacing_with_the_same_items_keeps_their_versions(make_app, menu_items):
+    client = make_app('json').app.test_client()
+    start = menu(client)
+    items = [dict(i, name='Flan') if n == 2 else i for n, i in enumerate(start['items'])]
+
+    response = client.put('/api/menu', json=dict(MANAGER, items=items))
+
+    assert response.get_json()['version'] == start['version'] + 1
+    delta = menu(client, f"?since={start['version']}")
+    assert [(i['id'], i['name']) for i in delta['items']] == [(items[2]['id'], 'Flan')]
+    assert [i['id'] for i in menu(client)['items']] == [i['id'] for i in items]
+
+
+def test_edits_are_checked(make_app, menu_items):
+    client = make_app('json').app.test_client()
+    existing = menu_items[0]
+
+    assert client.post('/api/menu/items', json=dict(existing, managerPassword='nope')).status_code == 403
+    assert client.post('/api/menu/items', json=dict(existing, **MANAGER)).status_code == 409
+    assert client.patch(f"/api/menu/items/{existing['id']}", json=dict(MANAGER, price=-1)).status_code == 400
+    assert client.delete('/api/menu/items/nope', json=MANAGER).status_code == 404
+
+    added = client.post('/api/menu/items', json=dict(
+        MANAGER, name='Limber', category='desserts', price=2)).get_json()['item']
+    assert added['id'].startswith('des-') and added['version'] == menu(client)['version']
@@ -0,0 +1,68 @@
+# GET /api/metrics: request, storage and aggregation metrics in Prometheus text format
+
+import re
+
+import pytest
+
+import serializer
+from metrics import BUCKETS, Metrics
+
+
+@pytest.fixture
+def metered_app(make_app, monkeypatch):
+    # The app wraps the serializer's functions to count bytes; undo that afterwards
+    for name in ('dumps', 'dumps_text', 'loads'):
+        monkeypatch.setattr(serializer, name, getattr(serializer, name))
+    return make_app('json', COQUI_METRICS=1)
+
+
+def samples(text):
+    """{'name{labels}': value} for every sample line"""
+    return {
+        line.rsplit(' ', 1)[0]: float(line.rsplit(' ', 1)[1])
+        for line in text.splitlines()
+        if line and not line.startswith('#')
+    }
+
+
+def test_requests_and_storage_are_measured(metered_app, new_order):
+    client = metered_app.app.test_client()
+    client.post('/api/orders', json=new_order('ORD-1'))
+    client.get('/api/orders/ORD-1')
+    client.get('/api/orders/NOPE')
+    client.get('/api/sales/today')
+
+    response = client.get('/api/metrics')
+
+    assert response.status_code == 200 and response.mimetype == 'text/plain'
+    found = samples(response.get_data(as_text=True))
+    route = 'method="GET",route="/api/orders/<order_id>"'
+    assert found[f'coqui_http_request_duration_seconds_count{{{route},status="200"}}'] == 1
+    assert found[f'coqui_http_request_duration_seconds_count{{{route},status="404"}}'] == 1
+    assert found['coqui_storage_records_total{operation="append_orders"}'] == 1
+    assert found['coqui_storage_bytes_written_total{operation="append_orders"}'] > 0
+    assert found['coqui_aggregation_duration_seconds_count{function="get_popular_items_data"}'] == 1
+
+
+def test_disabled_metrics_change_nothing(make_app):
+    app = make_app('json')
+
+    assert app.app.test_client().get('/api/metrics').status_code == 404
+    assert not hasattr(app.load_orders, '__wrapped__')
+    assert Metrics(False).storage(len) is len
+
+
+def test_histogram_buckets_are_cumulative():
+    metrics = Metrics(True)
+    for seconds in (0.0004, 0.003, 0.003, 20):
+        metrics.observe('coqui_aggregation_duration_seconds', (('function', 'f"x'),), seconds)
+
+    found = samples(metrics.render())
+
+    buckets = [found[f'coqui_aggregation_duration_seconds_bucket{{function="f\\"x",le="{bound}"}}']
+               for bound in BUCKETS]
+    assert buckets == sorted(buckets) and buckets[0] == 1 and buckets[-1] == 3
+    assert found['coqui_aggregation_duration_seconds_bucket{function="f\\"x",le="+Inf"}'] == 4
+    assert found['coqui_aggregation_duration_seconds_sum{function="f\\"x"}'] == pytest.approx(20.0064)
+    # Every metric is described even before it has samples
+    assert len(re.findall(r'^# TYPE ', metrics.render(), re.M)) == 7
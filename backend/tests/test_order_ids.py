@@ -0,0 +1,50 @@
+# Order IDs: a resent order is stored and counted once, generated IDs never repeat
+
+import pytest
+
+from id_generator import IdGenerator
+
+
+@pytest.mark.parametrize('storage', ['json', 'journal', 'sqlite'])
+def test_resent_order_is_counted_once(make_app, new_order, storage):
+    app = make_app(storage)
+    client = app.app.test_client()
+
+    first = client.post('/api/orders', json=new_order('ORD-1'))
+    again = client.post('/api/orders', json=new_order('ORD-1'))
+
+    assert first.status_code == 201
+    assert again.status_code == 200 and again.get_json()['duplicate'] is True
+    assert len(app.load_orders()) == 1
+    assert app.load_sales()['total_orders'] == 1
+
+
+@pytest.mark.parametrize('storage', ['json', 'journal', 'sqlite'])
+def test_racing_resends_are_counted_once(make_app, new_order, run_together, storage):
+    app = make_app(storage, COQUI_GROUP_COMMIT_WINDOW_MS=50)
+
+    def send(n):
+        response = app.app.test_client().post('/api/orders', json=new_order(f'ORD-{n % 2}'))
+        return f'ORD-{n % 2}', response.status_code, response.get_json().get('duplicate')
+
+    # All copies pass the early check before the first batch is written
+    results = run_together(6, send)
+
+    for order_id in ['ORD-0', 'ORD-1']:
+        replies = sorted((status, duplicate) for sent_id, status, duplicate in results.values()
+                         if sent_id == order_id)
+        assert replies == [(200, True), (200, True), (201, None)]
+    assert sorted(o['orderId'] for o in app.load_orders()) == ['ORD-0', 'ORD-1']
+    assert app.load_sales()['total_orders'] == 2
+
+
+def test_ids_are_unique_and_ordered(run_together):
+    # Two generators in one process (e.g. the app imported twice)
+    generators = [IdGenerator(), IdGenerator()]
+
+    results = run_together(8, lambda n: [generators[n % 2].new('ORD') for _ in range(2000)])
+
+    ids = [order_id for batch in results.values() for order_id in batch]
+    assert len(set(ids)) == len(ids)
+    for batch in results.values():
+        assert batch == sorted(batch)
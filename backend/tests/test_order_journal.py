@@ -0,0 +1,63 @@
+# Journal storage: checkouts are appended to a log that is folded into orders.json
+
+import json
+
+from order_journal import OrderJournal
+
+MANAGER = {'managerPassword': 'admin123'}
+
+
+def stored_ids(path):
+    with open(path) as f:
+        return [o['orderId'] for o in json.load(f)]
+
+
+def test_another_worker_replays_the_journal(make_app, new_order, data_dir):
+    app = make_app('journal')
+    client = app.app.test_client()
+    client.post('/api/orders', json=new_order('ORD-1'))
+    client.post('/api/orders', json=new_order('ORD-2'))
+    client.post('/api/orders/ORD-1/refund', json=MANAGER)
+
+    # Nothing rewrote orders.json: the orders (and the refunded copy) are journaled
+    assert stored_ids(data_dir / 'orders.json') == []
+    other = make_app('journal')
+    orders = other.load_orders()
+    assert [o['orderId'] for o in orders] == ['ORD-1', 'ORD-2']
+    assert orders[0]['refunded'] is True
+    assert other.load_sales()['total_orders'] == 1
+
+
+def test_compaction_folds_the_journal_into_orders_json(make_app, new_order, data_dir):
+    app = make_app('journal', COQUI_JOURNAL_COMPACT_THRESHOLD=3)
+    client = app.app.test_client()
+    for n in range(4):
+        client.post('/api/orders', json=new_order(f'ORD-{n}'))
+
+    # The third order reached the threshold; the fourth started a new journal
+    assert stored_ids(data_dir / 'orders.json') == ['ORD-0', 'ORD-1', 'ORD-2']
+    assert [o['orderId'] for o in app.order_journal.replay()] == ['ORD-3']
+    assert [o['orderId'] for o in make_app('journal').load_orders()] == [f'ORD-{n}' for n in range(4)]
+
+
+def test_torn_last_record_is_skipped(tmp_path):
+    journal = OrderJournal(str(tmp_path))
+    journal.append([{'orderId': 'ORD-1'}, {'orderId': 'ORD-2'}])
+    # A crash in the middle of a write (never acknowledged to the register)
+    with open(journal.segment_path(journal.current_segment), 'ab') as f:
+        f.write(b'{"orderId": "ORD-')
+
+    reopened = OrderJournal(str(tmp_path))
+    reopened.append({'orderId': 'ORD-3'})
+
+    assert [o['orderId'] for o in reopened.replay()] == ['ORD-1', 'ORD-2', 'ORD-3']
+
+
+def test_segments_roll_over(tmp_path):
+    journal = OrderJournal(str(tmp_path), segment_max_records=2)
+    for n in range(5):
+        journal.append({'orderId': f'ORD-{n}'})
+
+    assert journal.segments() == [1, 2, 3]
+    assert journal.record_count == 5
+    assert [o['orderId'] for o in OrderJournal(str(tmp_path)).replay()] == [f'ORD-{n}' for n in range(5)]
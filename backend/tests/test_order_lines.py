@@ -0,0 +1,72 @@
+# Order and ticket lines are stored as menu catalog references and expanded on request
+
+import json
+
+import pytest
+
+from menu_catalog import LINE_FIELDS
+
+MANAGER = {'managerPassword': 'admin123'}
+
+
+def order(client, order_id, query=''):
+    return client.get(f'/api/orders/{order_id}{query}').get_json()['order']
+
+
+def test_lines_are_stored_compactly(make_app, new_order, menu_items, data_dir):
+    client = make_app('json').app.test_client()
+    item = menu_items[0]
+    client.post('/api/orders', json=new_order('ORD-1', items=[
+        dict(item, quantity=2, price=5, modifiers=['no ice'])]))
+
+    with open(data_dir / 'orders.json') as f:
+        stored = json.load(f)[0]['items']
+    assert stored == [{'id': item['id'], 'version': item.get('version', 0), 'name': item['name'],
+                       'quantity': 2, 'price': 5, 'modifiers': ['no ice']}]
+    assert set(order(client, 'ORD-1')['items'][0]) <= set(LINE_FIELDS)
+
+    # items=full fills the menu details back in; the price charged stays
+    full = order(client, 'ORD-1', '?items=full')['items'][0]
+    assert full == dict(item, quantity=2, price=5, modifiers=['no ice'], version=full['version'])
+
+
+@pytest.mark.parametrize('storage', ['json', 'sqlite'])
+def test_old_lines_keep_the_item_as_sold(make_app, new_order, menu_items, storage):
+    client = make_app(storage).app.test_client()
+    first, second = menu_items[0], menu_items[1]
+    client.post('/api/orders', json=new_order('ORD-1', items=[
+        dict(first, quantity=1), dict(second, quantity=1)]))
+
+    client.patch(f"/api/menu/items/{first['id']}", json=dict(
+        MANAGER, name='Renamed', description='Changed'))
+    client.delete(f"/api/menu/items/{second['id']}", json=MANAGER)
+
+    lines = order(client, 'ORD-1', '?items=full')['items']
+    assert lines[0]['name'] == first['name'] and lines[0].get('description') == first.get('description')
+    assert lines[1]['name'] == second['name'] and lines[1]['category'] == second['category']
+
+
+def test_ticket_lines_too(make_app, menu_items):
+    client = make_app('json').app.test_client()
+    item = menu_items[0]
+    ticket_id = client.post('/api/tickets', json={'items': [dict(item, quantity=3)]}).get_json()['ticketId']
+
+    ticket = client.get(f'/api/tickets/{ticket_id}').get_json()['ticket']
+    assert set(ticket['items'][0]) <= set(LINE_FIELDS) | {'sentAt', 'voided'}
+    full = client.get(f'/api/tickets/{ticket_id}?items=full').get_json()['ticket']
+    assert full['items'][0]['category'] == item['category'] and full['items'][0]['quantity'] == 3
+
+
+def test_older_orders_can_be_compacted(make_app, new_order, menu_items, data_dir):
+    app = make_app('json')
+    item = menu_items[0]
+    # An order stored before lines were compacted: whole menu items
+    (data_dir / 'orders.json').write_text(json.dumps([
+        dict(new_order('ORD-OLD', salesDate='2026-03-10'), items=[dict(item, quantity=1)])]))
+
+    result = app.app.test_cli_runner().invoke(args=['compact-order-lines'])
+
+    assert result.exit_code == 0, result.output
+    with open(data_dir / 'orders.json') as f:
+        line = json.load(f)[0]['items'][0]
+    assert set(line) <= set(LINE_FIELDS) and line['id'] == item['id']
@@ -0,0 +1,76 @@
+# GET /api/orders: keyset pagination by orderId cursor, date filters, fields
+
+import json
+
+import pytest
+
+
+def stored_order(n):
+    """Order n as stored: rung up (and counted) on 2026-03-<n + 1>"""
+    return {
+        'orderId': f'ORD-{n:02d}',
+        'items': [{'id': 'bev-1', 'name': 'Piña Colada', 'price': 8.99, 'quantity': 1}],
+        'total': 10.02,
+        'paymentMethod': 'cash',
+        'timestamp': f'3/{n + 1}/2026, 11:15:00 AM',
+        'salesDate': f'2026-03-{n + 1:02d}',
+    }
+
+
+@pytest.fixture(params=['json', 'sqlite'])
+def client(request, make_app, data_dir):
+    """A backend holding ORD-00..ORD-09, rung up on 2026-03-01..10"""
+    with open(data_dir / 'orders.json', 'w') as f:
+        json.dump([stored_order(n) for n in range(10)], f)
+    if request.param == 'sqlite':
+        result = make_app('sqlite').app.test_cli_runner().invoke(args=['import-json'])
+        assert result.exit_code == 0, result.output
+    return make_app(request.param).app.test_client()
+
+
+def page(client, **params):
+    response = client.get('/api/orders', query_string=params)
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()
+    return [o['orderId'] for o in body['orders']], body
+
+
+def test_latest_page(client):
+    ids, body = page(client, limit=3)
+    assert ids == ['ORD-07', 'ORD-08', 'ORD-09']
+    assert body['hasMore'] is True
+    assert body['cursors'] == {'before': 'ORD-07', 'after': 'ORD-09'}
+
+
+def test_walk_back_with_before_cursors(client):
+    seen = []
+    ids, body = page(client, limit=4)
+    while True:
+        seen = ids + seen
+        if not body['hasMore']:
+            break
+        ids, body = page(client, limit=4, before=body['cursors']['before'])
+    assert seen == [f'ORD-{n:02d}' for n in range(10)]
+
+
+def test_after_cursor(client):
+    assert page(client, limit=3, after='ORD-02')[0] == ['ORD-03', 'ORD-04', 'ORD-05']
+    ids, body = page(client, limit=3, after='ORD-07')
+    assert ids == ['ORD-08', 'ORD-09'] and body['hasMore'] is False
+
+
+def test_date_range_and_cursor(client):
+    assert page(client, **{'from': '2026-03-03', 'to': '2026-03-05'})[0] == ['ORD-02', 'ORD-03', 'ORD-04']
+    assert page(client, date='2026-03-06')[0] == ['ORD-05']
+    ids, body = page(client, limit=2, before='ORD-05', **{'from': '2026-03-02'})
+    assert ids == ['ORD-03', 'ORD-04'] and body['hasMore'] is True
+
+
+def test_fields(client):
+    _, body = page(client, limit=1, fields='orderId,total')
+    assert [set(o) for o in body['orders']] == [{'orderId', 'total'}]
+
+
+@pytest.mark.parametrize('params', [{'before': 'ORD-99'}, {'after': 'nope'}, {'date': '2026-13-01'}])
+def test_bad_parameters(client, params):
+    assert client.get('/api/orders', query_string=params).status_code == 400
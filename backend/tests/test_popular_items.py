@@ -0,0 +1,62 @@
+# Popular items are tallied per day, so reports only count their own dates
+
+import pytest
+
+MANAGER = {'managerPassword': 'admin123'}
+
+
+def popular(client, url):
+    return {i['name']: i['timesOrdered'] for i in client.get(url).get_json()['popularItems']}
+
+
+@pytest.fixture
+def two_days(make_app, new_order, menu_items):
+    """Bulk-imported orders rung up on March 10th and 11th, 2026"""
+    def make(storage):
+        app = make_app(storage)
+        client = app.app.test_client()
+        first, second = menu_items[0], menu_items[1]
+        response = client.post('/api/orders/bulk', json={'orders': [
+            new_order('ORD-1', timestamp='3/10/2026, 9:00:00 AM'),
+            new_order('ORD-2', timestamp='3/11/2026, 9:00:00 AM',
+                      items=[dict(second, quantity=2)]),
+            new_order('ORD-3', timestamp='3/11/2026, 1:00:00 PM',
+                      items=[dict(first, quantity=1), dict(second, quantity=1)]),
+        ]})
+        assert [r['status'] for r in response.get_json()['results']] == ['created'] * 3
+        return app, client, first['name'], second['name']
+    return make
+
+
+@pytest.mark.parametrize('storage', ['json', 'sqlite'])
+def test_reports_count_only_their_dates(two_days, storage):
+    app, client, first, second = two_days(storage)
+
+    assert popular(client, '/api/sales/day?day=10&month=3&year=2026') == {first: 1}
+    assert popular(client, '/api/sales/day?day=11&month=3&year=2026') == {first: 1, second: 3}
+    assert popular(client, '/api/sales/day?day=12&month=3&year=2026') == {}
+    assert popular(client, '/api/sales/week?week=2&month=3&year=2026') == {first: 2, second: 3}
+    assert popular(client, '/api/sales/month?month=3&year=2026') == {first: 2, second: 3}
+    assert popular(client, '/api/sales/month?month=4&year=2026') == {}
+    assert popular(client, '/api/analytics/popular-items') == {first: 2, second: 3}
+
+
+def test_refund_comes_off_its_own_day(two_days):
+    app, client, first, second = two_days('json')
+
+    assert client.post('/api/orders/ORD-3/refund', json=MANAGER).status_code == 200
+
+    assert popular(client, '/api/sales/day?day=10&month=3&year=2026') == {first: 1}
+    assert popular(client, '/api/sales/day?day=11&month=3&year=2026') == {second: 2}
+    assert popular(client, '/api/analytics/popular-items') == {first: 1, second: 2}
+
+
+def test_rebuilt_tallies_match_the_running_ones(two_days):
+    app, client, first, second = two_days('json')
+    sales = app.load_sales()
+
+    app.rebuild_item_counts()
+
+    rebuilt = app.load_sales()
+    assert rebuilt['item_counts'] == sales['item_counts']
+    assert rebuilt['items_by_date'] == sales['items_by_date']
@@ -0,0 +1,74 @@
+# Compact records: the order index and open tickets held in __slots__, read like dicts
+
+import pytest
+
+import serializer
+from records import OrderRecord, TicketRecord, as_dict
+
+MANAGER = {'managerPassword': 'admin123'}
+
+
+def stored_order(**fields):
+    return dict({
+        'orderId': 'ORD-1',
+        'items': [{'id': 'bev-1', 'version': 3, 'name': 'Mojito', 'quantity': 2, 'price': 7.99,
+                   'garnish': 'mint'}],
+        'total': 17.82,
+        'paymentMethod': 'cash',
+        'salesDate': '2026-03-10',
+        'couponCode': 'SPRING',
+    }, **fields)
+
+
+def test_conversion_is_lossless():
+    data = stored_order()
+    record = OrderRecord(data)
+
+    assert record.to_dict() == data and list(record.to_dict()) == list(OrderRecord(data))
+    assert record == data and as_dict(record) == data and as_dict(data) is data
+    assert serializer.loads(serializer.dumps(record)) == data
+    assert OrderRecord.of(record) is record
+
+
+def test_reads_like_a_dict():
+    record = OrderRecord(stored_order())
+
+    assert record['total'] == 17.82 and record.get('refunded') is None
+    assert 'refunded' not in record and 'couponCode' in record
+    assert record['items'][0]['garnish'] == 'mint' and record['items'][0].get('modifiers', []) == []
+    assert dict(record, refunded=True)['refunded'] is True
+    with pytest.raises(KeyError):
+        record['refunded']
+    with pytest.raises(TypeError):
+        record['total'] = 0
+
+
+def test_repeated_values_are_shared():
+    first = OrderRecord(serializer.loads(serializer.dumps(stored_order())))
+    second = OrderRecord(serializer.loads(serializer.dumps(stored_order(orderId='ORD-2'))))
+
+    assert first['paymentMethod'] is second['paymentMethod']
+    assert first['items'][0]['name'] is second['items'][0]['name']
+    assert not hasattr(first, '__dict__')
+
+
+@pytest.mark.parametrize('storage', ['journal', 'sqlite'])
+def test_api_answers_the_same_with_compact_records(make_app, new_order, menu_items, storage):
+    app = make_app(storage, COQUI_COMPACT_RECORDS=1)
+    client = app.app.test_client()
+    client.post('/api/orders', json=new_order('ORD-1'))
+    client.post('/api/orders', json=new_order('ORD-2'))
+    client.post('/api/orders/ORD-1/refund', json=MANAGER)
+    ticket_id = client.post('/api/tickets', json={
+        'items': [dict(menu_items[0], quantity=1), dict(menu_items[1], quantity=2)]}).get_json()['ticketId']
+    client.patch(f'/api/tickets/{ticket_id}/void-item', json=dict(MANAGER, itemIndex=0))
+
+    assert isinstance(app.order_index.orders()[0], OrderRecord)
+    assert isinstance(app.active_tickets.tickets()[0], TicketRecord)
+
+    urls = ['/api/orders', '/api/orders/ORD-1?items=full', '/api/tickets?status=open',
+            f'/api/tickets/{ticket_id}', '/api/sales/stats']
+    compact = [client.get(url).get_json() for url in urls]
+    plain_client = make_app(storage).app.test_client()
+    assert compact == [plain_client.get(url).get_json() for url in urls]
+    assert compact[1]['order']['refunded'] is True
@@ -0,0 +1,29 @@
+# Refunds take an order out of the sales statistics exactly once
+
+import pytest
+
+MANAGER = {'managerPassword': 'admin123'}
+
+
+@pytest.mark.parametrize('storage', ['json', 'sqlite'])
+def test_second_refund_changes_nothing(make_app, new_order, menu_items, storage):
+    app = make_app(storage)
+    client = app.app.test_client()
+    client.post('/api/orders', json=new_order('ORD-1'))
+    # Same item again, plus another one, so the refund leaves counts behind
+    client.post('/api/orders', json=new_order('ORD-2', items=[
+        dict(menu_items[0], quantity=2), dict(menu_items[1], quantity=1)]))
+
+    def snapshot():
+        return [client.get(url).get_json() for url in (
+            '/api/analytics/popular-items', '/api/analytics/heatmap', '/api/sales/stats')]
+
+    assert client.post('/api/orders/ORD-2/refund', json=MANAGER).status_code == 200
+    after_refund = snapshot()
+    assert after_refund[0]['popularItems'] == [{'name': menu_items[0]['name'], 'timesOrdered': 1}]
+
+    again = client.post('/api/orders/ORD-2/refund', json=MANAGER)
+
+    assert again.status_code == 409
+    assert snapshot() == after_refund
+    assert app.load_sales()['total_orders'] == 1
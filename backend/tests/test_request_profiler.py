@@ -0,0 +1,62 @@
+# Slow request profiler: sampled stacks of slow requests in a bounded on-disk ring
+
+import time
+
+from request_profiler import SlowRequestProfiler
+
+MANAGER_HEADER = {'X-Manager-Password': 'admin123'}
+
+
+def slow_step(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_samples_show_where_the_time_went(tmp_path):
+    profiler = SlowRequestProfiler(str(tmp_path), threshold=0.05, interval=0.002)
+
+    token = profiler.start()
+    slow_step(0.2)
+    samples, elapsed = profiler.stop(token)
+    profile = profiler.record({'route': '/api/test'}, samples, elapsed)
+
+    assert elapsed >= 0.2 and profile['samples'] > 10
+    assert profile['route'] == '/api/test'
+    top = profile['functions'][0]
+    assert top['function'] == 'slow_step (test_request_profiler.py)' and top['selfSamples'] > 0
+    assert 'slow_step' in profile['stacks'][0]['frames'][-1]
+    assert profiler.get(profile['id']) == profile
+
+
+def test_ring_keeps_the_newest(tmp_path):
+    profiler = SlowRequestProfiler(str(tmp_path), threshold=0, keep=3)
+
+    ids = [profiler.record({'route': f'/r{n}'}, {('f (a.py:1)',): 1}, 0.1)['id'] for n in range(5)]
+
+    assert [p['id'] for p in profiler.profiles()] == ids[:1:-1]
+    assert [p['route'] for p in profiler.profiles(limit=2)] == ['/r4', '/r3']
+    assert profiler.get(ids[0]) is None
+    assert profiler.get('../../etc/passwd') is None
+
+
+def test_slow_requests_are_listed_for_managers(make_app):
+    app = make_app('json', COQUI_PROFILE_SLOW_MS=0.001)
+    client = app.app.test_client()
+    client.get('/api/sales/stats?managerPassword=secret&x=1')
+
+    assert client.get('/api/profiles').status_code == 403
+    listing = client.get('/api/profiles', headers=MANAGER_HEADER).get_json()
+    first = listing['profiles'][-1]
+    assert first['route'] == '/api/sales/stats' and first['query'] == {'x': '1'}
+    assert first['datasets'] == {'orders': 0, 'openTickets': 0}
+
+    profile = client.get(f"/api/profiles/{first['id']}", headers=MANAGER_HEADER).get_json()['profile']
+    assert profile['status'] == 200 and 'stacks' in profile
+    assert client.get('/api/profiles/nope', headers=MANAGER_HEADER).status_code == 404
+
+
+def test_disabled_by_default(make_app):
+    client = make_app('json').app.test_client()
+
+    assert client.get('/api/profiles', headers=MANAGER_HEADER).status_code == 404
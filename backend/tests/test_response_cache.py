@@ -0,0 +1,69 @@
+# Cached GET responses: ETag/304, and invalidation by any worker's write
+
+import pytest
+
+from response_cache import ResponseCache
+
+
+def test_lru_bound_and_tags():
+    cache = ResponseCache(max_entries=2)
+    cache.put('a', 1, 'A')
+    cache.put('b', 1, 'B')
+    assert cache.get('a', 1) == 'A'  # Now most recently used
+    cache.put('c', 1, 'C')
+    assert cache.get('b', 1) is None and len(cache) == 2
+    assert cache.get('a', 2) is None  # Stored under another tag
+
+
+@pytest.mark.parametrize('storage', ['json', 'sqlite'])
+def test_etag_and_304(make_app, new_order, storage):
+    app = make_app(storage)
+    client = app.app.test_client()
+    client.post('/api/orders', json=new_order('ORD-1'))
+
+    first = client.get('/api/orders')
+    etag = first.headers['ETag']
+    unchanged = client.get('/api/orders', headers={'If-None-Match': etag})
+
+    assert unchanged.status_code == 304 and unchanged.get_data() == b''
+
+    client.post('/api/orders', json=new_order('ORD-2'))
+    changed = client.get('/api/orders', headers={'If-None-Match': etag})
+
+    assert changed.status_code == 200 and changed.headers['ETag'] != etag
+    assert changed.get_json()['count'] == 2
+
+
+def test_repeated_get_is_served_from_cache(make_app, new_order, monkeypatch):
+    app = make_app('json')
+    client = app.app.test_client()
+    client.post('/api/orders', json=new_order('ORD-1'))
+    first = client.get('/api/orders?limit=5')
+
+    def not_called():
+        raise AssertionError('the route ran again')
+
+    monkeypatch.setattr(app.order_index, 'orders', not_called)
+    again = client.get('/api/orders?limit=5')
+
+    assert again.status_code == 200 and again.get_data() == first.get_data()
+
+
+@pytest.mark.parametrize('storage', ['json', 'journal', 'sqlite'])
+def test_write_by_another_worker_invalidates(make_app, new_order, storage):
+    reader = make_app(storage).app.test_client()
+    writer = make_app(storage).app.test_client()
+    assert reader.get('/api/orders').get_json()['count'] == 0
+
+    writer.post('/api/orders', json=new_order('ORD-1'))
+
+    assert reader.get('/api/orders').get_json()['count'] == 1
+
+
+def test_errors_are_not_cached(make_app):
+    app = make_app('json')
+    client = app.app.test_client()
+
+    assert client.get('/api/orders?date=2026-13-01').status_code == 400
+    assert len(app.response_cache) == 0
+    assert 'ETag' not in client.get('/api/orders?date=2026-13-01').headers
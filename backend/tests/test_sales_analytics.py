@@ -0,0 +1,126 @@
+# Columnar analytics: NumPy aggregates agree with a plain Python loop over the orders
+
+import random
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from sales_analytics import WEEKDAY_NAMES, OrderColumns
+
+MANAGER = {'managerPassword': 'admin123'}
+
+
+def random_orders(count, seed=7):
+    rng = random.Random(seed)
+    orders = []
+    for n in range(count):
+        moment = datetime(2024, 12, 20) + timedelta(days=rng.randrange(60), hours=rng.randrange(24))
+        orders.append({
+            'orderId': f'ORD-{n}',
+            'salesDate': moment.strftime('%Y-%m-%d'),
+            'placedAt': moment.isoformat(),
+            'total': round(rng.uniform(3, 80), 2),
+            'tip': rng.choice([0, 1, 2.5]),
+            'tax': round(rng.uniform(0, 5), 2),
+            'paymentMethod': rng.choice(['cash', 'card']),
+            'refunded': rng.random() < 0.1,
+            'items': [{'name': rng.choice('ABCDE'), 'quantity': rng.randint(1, 3)}
+                      for _ in range(rng.randint(1, 3))],
+        })
+    return orders
+
+
+def columns_of(orders):
+    return OrderColumns(orders, lambda o: o.get('salesDate'),
+                        lambda o: datetime.fromisoformat(o['placedAt']) if o.get('placedAt') else None)
+
+
+def period_of(order, by):
+    day = date.fromisoformat(order['salesDate'])
+    if by == 'day':
+        return day.isoformat()
+    if by == 'week':
+        year, week, _ = day.isocalendar()
+        return f'{year}-W{week:02d}'
+    if by == 'month':
+        return day.strftime('%Y-%m')
+    return str(day.year)
+
+
+def test_matches_a_python_loop():
+    orders = random_orders(500)
+    columns = columns_of(orders)
+    start, end = '2025-01-05', '2025-02-10'
+    selected = [o for o in orders if start <= o['salesDate'] <= end and not o['refunded']]
+    mask = columns.select(start, end)
+
+    totals = columns.totals(mask)
+    assert totals['orders'] == len(selected)
+    assert totals['revenue'] == pytest.approx(sum(o['total'] for o in selected))
+    assert totals['tips'] == pytest.approx(sum(o['tip'] for o in selected))
+
+    for by in ('day', 'week', 'month', 'year'):
+        expected = defaultdict(float)
+        for order in selected:
+            expected[period_of(order, by)] += order['total']
+        grouped = {row['period']: row['revenue'] for row in columns.group(mask, by)}
+        assert grouped == pytest.approx(dict(expected)), by
+
+    by_weekday = Counter(WEEKDAY_NAMES[date.fromisoformat(o['salesDate']).weekday()] for o in selected)
+    assert {row['weekday']: row['orders'] for row in columns.group(mask, 'weekday')} == \
+        {name: by_weekday[name] for name in WEEKDAY_NAMES}
+    by_hour = Counter(datetime.fromisoformat(o['placedAt']).hour for o in selected)
+    assert [row['orders'] for row in columns.group(mask, 'hour')] == [by_hour[h] for h in range(24)]
+
+    cash = [o for o in selected if o['paymentMethod'] == 'cash']
+    assert columns.payment_breakdown(mask)['cash']['orders'] == len(cash)
+
+    sold = Counter()
+    for order in selected:
+        for item in order['items']:
+            sold[item['name']] += item['quantity']
+    assert {i['name']: i['count'] for i in columns.top_items(mask)} == dict(sold)
+
+
+def test_extending_matches_building_at_once():
+    orders = random_orders(200)
+    grown = columns_of(orders[:120])
+    grown.extend(orders[120:])
+    whole = columns_of(orders)
+
+    mask = whole.select()
+    assert grown.totals(grown.select()) == whole.totals(mask)
+    assert grown.group(grown.select(), 'week') == whole.group(mask, 'week')
+    assert grown.top_items(grown.select()) == whole.top_items(mask)
+
+
+def test_endpoint_follows_new_orders_and_refunds(make_app, new_order, menu_items):
+    client = make_app('json').app.test_client()
+
+    def analytics():
+        url = '/api/analytics/sales?from=2026-03-01&to=2026-03-31&by=day'
+        return client.get(url).get_json()['analytics']
+
+    client.post('/api/orders/bulk', json={'orders': [
+        new_order('ORD-1', timestamp='3/10/2026, 9:00:00 AM', total=10),
+        new_order('ORD-2', timestamp='3/11/2026, 9:00:00 AM', total=20),
+    ]})
+    assert analytics()['totals']['revenue'] == 30
+
+    client.post('/api/orders/bulk', json={'orders': [
+        new_order('ORD-3', timestamp='3/11/2026, 1:00:00 PM', total=5)]})
+    client.post('/api/orders/ORD-1/refund', json=MANAGER)
+
+    report = analytics()
+    assert report['totals'] == dict(report['totals'], revenue=25, orders=2)
+    assert [(r['period'], r['orders']) for r in report['breakdown']] == [('2026-03-11', 2)]
+    assert report['popularItems'] == [{'name': menu_items[0]['name'], 'count': 2}]
+
+
+@pytest.mark.parametrize('query', ['from=2026-13-01', 'by=fortnight', 'compare=year&from=2026-03-01'])
+def test_bad_queries(make_app, query):
+    client = make_app('json').app.test_client()
+    assert client.get(f'/api/analytics/sales?{query}').status_code == 400
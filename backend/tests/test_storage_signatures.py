@@ -0,0 +1,45 @@
+# In-memory copies reload only when their own data changes
+
+def count_loads(index):
+    """Wrap an index's loader so its reloads can be counted"""
+    loader = index._loader
+    calls = []
+    index._loader = lambda: calls.append(1) or loader()
+    return calls
+
+
+def test_sqlite_order_index_survives_other_writes(make_app, new_order, menu_items):
+    app = make_app('sqlite')
+    client = app.app.test_client()
+    client.post('/api/orders', json=new_order('ORD-1'))
+    loads = count_loads(app.order_index)
+
+    # A checkout writes orders and sales; the index already has the order
+    assert client.post('/api/orders', json=new_order('ORD-2')).status_code == 201
+    client.post('/api/tickets', json={'items': [dict(menu_items[0], quantity=1)]})
+    assert client.get('/api/orders/ORD-2').status_code == 200
+    assert loads == []
+
+
+def test_sqlite_signatures_are_per_dataset(make_app, new_order, menu_items):
+    app = make_app('sqlite')
+    client = app.app.test_client()
+    before = {name: signature() for name, signature in app.DATASET_SIGNATURES.items()}
+
+    client.post('/api/tickets', json={'items': [dict(menu_items[0], quantity=1)]})
+    after = {name: signature() for name, signature in app.DATASET_SIGNATURES.items()}
+    assert [name for name in before if before[name] != after[name]] == ['tickets']
+
+    client.post('/api/orders', json=new_order('ORD-1'))
+    changed = {name for name, signature in app.DATASET_SIGNATURES.items() if signature() != after[name]}
+    assert changed == {'orders', 'sales'}
+
+
+def test_sqlite_reloads_after_another_workers_write(make_app, new_order):
+    worker_a = make_app('sqlite')
+    worker_b = make_app('sqlite')
+    assert worker_a.order_index.get('ORD-B') is None
+
+    worker_b.app.test_client().post('/api/orders', json=new_order('ORD-B'))
+    assert worker_a.order_index.get('ORD-B') is not None
+    assert worker_a.app.test_client().get('/api/orders/ORD-B').status_code == 200
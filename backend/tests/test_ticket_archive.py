@@ -0,0 +1,29 @@
+# Ticket archive: one file per day, shared by every worker process
+
+from ticket_store import TicketArchive
+
+
+def ticket(ticket_id, status='closed'):
+    return {'ticketId': ticket_id, 'status': status}
+
+
+def test_sees_another_workers_append_to_an_earlier_day(tmp_path):
+    reader, writer = TicketArchive(str(tmp_path)), TicketArchive(str(tmp_path))
+    writer.append([ticket('T-1')], '2026-01-01')
+    writer.append([ticket('T-2')], '2026-01-02')
+    assert reader.find('T-1') is not None
+
+    # A late close filed under an older day adds no file and leaves the latest one as it was
+    writer.append([ticket('T-3', 'voided')], '2026-01-01')
+
+    assert reader.find('T-3') == ticket('T-3', 'voided')
+    assert [t['ticketId'] for t in reader.iterate()] == ['T-1', 'T-3', 'T-2']
+
+
+def test_later_copy_of_a_ticket_wins(tmp_path):
+    archive = TicketArchive(str(tmp_path))
+    archive.append([ticket('T-1')], '2026-01-01')
+    archive.append([ticket('T-1', 'voided')], '2026-01-02')
+
+    assert archive.find('T-1') == ticket('T-1', 'voided')
+    assert list(archive.iterate()) == [ticket('T-1', 'voided')]
@@ -0,0 +1,133 @@
+# Kitchen screens follow ticket changes by feed version
+
+import threading
+
+import pytest
+
+from ticket_feed import FileChangeLog, TicketFeed
+
+
+def send_ticket(client, menu_items, n=0):
+    response = client.post('/api/tickets', json={'items': [dict(menu_items[n], quantity=1)]})
+    assert response.status_code in (200, 201), response.get_json()
+    return response.get_json()['ticketId']
+
+
+def changes(client, since, wait=0):
+    return client.get(f'/api/tickets/changes?since={since}&wait={wait}').get_json()
+
+
+def test_changes_since_a_version(make_app, menu_items):
+    client = make_app('json').app.test_client()
+    first = send_ticket(client, menu_items)
+    second = send_ticket(client, menu_items, 1)
+
+    feed = changes(client, 0)
+    assert feed['version'] == 2
+    assert [t['ticketId'] for t in feed['tickets']] == [first, second]
+
+    client.patch(f'/api/tickets/{first}/close', json={})
+    feed = changes(client, 2)
+    assert feed['version'] == 3
+    assert [(t['ticketId'], t['status']) for t in feed['tickets']] == [(first, 'closed')]
+    assert changes(client, 3)['tickets'] == []
+
+
+def test_workers_share_the_numbering(make_app, menu_items):
+    worker_a = make_app('json')
+    worker_b = make_app('json')
+    client_a = worker_a.app.test_client()
+    client_b = worker_b.app.test_client()
+
+    from_a = send_ticket(client_a, menu_items)
+    from_b = send_ticket(client_b, menu_items, 1)
+
+    feed = changes(client_a, 1)
+    assert feed['version'] == 2
+    assert [t['ticketId'] for t in feed['tickets']] == [from_b]
+    assert client_a.get('/api/tickets').get_json()['version'] == 2
+    assert {t['ticketId']: t['version'] for t in changes(client_b, 0)['tickets']} == {from_a: 1, from_b: 2}
+
+
+def test_long_poll_sees_another_workers_change(make_app, menu_items):
+    worker_a = make_app('sqlite')
+    worker_b = make_app('sqlite')
+    result = {}
+
+    def poll():
+        result['feed'] = changes(worker_a.app.test_client(), 0, wait=10)
+
+    waiting = threading.Thread(target=poll)
+    waiting.start()
+    ticket_id = send_ticket(worker_b.app.test_client(), menu_items)
+    waiting.join(timeout=5)
+
+    assert not waiting.is_alive()
+    assert [t['ticketId'] for t in result['feed']['tickets']] == [ticket_id]
+
+
+def test_numbering_survives_a_restart(make_app, menu_items):
+    send_ticket(make_app('json').app.test_client(), menu_items)
+    client = make_app('json').app.test_client()
+    send_ticket(client, menu_items)
+    assert changes(client, 0)['version'] == 2
+
+
+def publish(feed, *tickets):
+    with feed.recording(*tickets):
+        pass
+
+
+def test_other_workers_changes_come_from_the_shared_log(tmp_path):
+    path = str(tmp_path / 'ticket_changes.ndjson')
+    feed_a = TicketFeed(change_log=FileChangeLog(path))
+    feed_b = TicketFeed(change_log=FileChangeLog(path))
+
+    publish(feed_a, {'ticketId': 'T1', 'status': 'open'}, {'ticketId': 'T2', 'status': 'open'})
+    publish(feed_a, {'ticketId': 'T1', 'status': 'closed'})
+
+    # Served from B's buffer (None would mean a scan of storage)
+    assert feed_b.changes_since(0) == [{'ticketId': 'T1', 'status': 'closed', 'version': 3},
+                                       {'ticketId': 'T2', 'status': 'open', 'version': 2}]
+    assert feed_b.changes_since(2) == [{'ticketId': 'T1', 'status': 'closed', 'version': 3}]
+
+    # B stamps after A's versions, and A reads B's change the same way
+    publish(feed_b, {'ticketId': 'T3', 'status': 'open'})
+    assert feed_a.changes_since(3) == [{'ticketId': 'T3', 'status': 'open', 'version': 4}]
+
+
+def test_trimmed_log_is_read_again(tmp_path):
+    path = str(tmp_path / 'ticket_changes.ndjson')
+    feed_a = TicketFeed(change_log=FileChangeLog(path, keep=5, max_bytes=300))
+    feed_b = TicketFeed(change_log=FileChangeLog(path, keep=5, max_bytes=300))
+    publish(feed_a, {'ticketId': 'T0'})
+    assert feed_b.version == 1
+
+    for n in range(1, 20):
+        publish(feed_a, {'ticketId': f'T{n}'})
+
+    assert feed_b.version == 20
+    # Versions 2..14 were trimmed before B saw them: those come from storage
+    assert feed_b.changes_since(1) is None
+    assert [t['ticketId'] for t in feed_b.changes_since(17)] == ['T17', 'T18', 'T19']
+
+
+@pytest.mark.parametrize('storage', ['json', 'sqlite'])
+def test_changes_from_another_worker_without_a_scan(make_app, menu_items, storage, monkeypatch):
+    worker_a = make_app(storage)
+    worker_b = make_app(storage)
+    client_a = worker_a.app.test_client()
+    client_b = worker_b.app.test_client()
+    from_b = send_ticket(client_b, menu_items)
+
+    def full_scan():
+        raise AssertionError('scanned every ticket')
+
+    monkeypatch.setattr(worker_b, 'iter_tickets', full_scan)
+    from_a = send_ticket(client_a, menu_items, 1)
+    client_a.patch(f'/api/tickets/{from_a}/close', json={})
+
+    feed = changes(client_b, 1)
+    assert feed['version'] == 3
+    assert [(t['ticketId'], t['status']) for t in feed['tickets']] == [(from_a, 'closed')]
+    assert [t['ticketId'] for t in changes(client_b, 0)['tickets']] == [from_b, from_a]
@@ -0,0 +1,215 @@
+# ============================================
+# COQUI POS - TICKET CHANGE FEED
+# ============================================
+# Every ticket change gets the next version number
+# (stored on the ticket as 'version'). Kitchen screens
+# ask for "changes since version N" and either get them
+# straight away or wait (long-poll / SSE) until a new
+# change is published, so an idle screen costs nothing.
+#
+# Recent changes are kept in memory; a client that is
+# further behind is served from storage by version.
+#
+# With several worker processes every change is also
+# appended to a shared change log (written under the
+# tickets lock). Each worker reads only the entries added
+# since it last looked into its own buffer (when nothing
+# was added that is one stat or indexed query), so the
+# numbering is shared and another worker's changes are
+# served from memory like its own. Waiting clients share
+# one check per poll_interval, however many there are.
+
+from collections import deque
+from contextlib import contextmanager
+import os
+import threading
+import time
+
+import serializer
+
+
+class TicketFeed:
+    """Monotonic version counter plus a buffer of recent ticket changes"""
+
+    def __init__(self, history=1000, change_log=None, poll_interval=0.5):
+        self._changes = deque(maxlen=history)  # (version, ticket)
+        self._version = 0
+        self._condition = threading.Condition()
+        # Shared with other workers (None: this process is the only writer)
+        self._change_log = change_log
+        self.poll_interval = poll_interval
+        self._synced_at = None
+
+    @property
+    def version(self):
+        """Version of the latest published change"""
+        with self._condition:
+            self._sync()
+            return self._version
+
+    def _sync(self, throttled=False):
+        # Called holding the condition: catch up with other workers' changes
+        if self._change_log is None:
+            return
+        now = time.monotonic()
+        if throttled and self._synced_at is not None and now - self._synced_at < self.poll_interval:
+            return
+        self._synced_at = now
+
+        new = [(version, ticket) for version, ticket in self._change_log.read_new()
+               if version > self._version]
+        if not new:
+            return
+        if new[0][0] != self._version + 1:
+            self._changes.clear()  # Missed some (log trimmed meanwhile): storage has them
+        self._changes.extend(new)
+        self._version = new[-1][0]
+        self._condition.notify_all()
+
+    def seed(self, version):
+        """Continue numbering after the versions already in storage"""
+        with self._condition:
+            self._sync()
+            self._version = max(self._version, version)
+
+    @contextmanager
+    def recording(self, *tickets):
+        """
+        Stamp tickets with the next versions while they are being saved:
+
+            with ticket_feed.recording(ticket):
+                update_ticket(ticket)
+
+        The changes are published (and waiting clients woken) only if
+        the save succeeds. Changes are stamped and published one save at
+        a time, so clients never skip past a version still being saved.
+        With a shared change log, call it holding the tickets lock.
+        Yields the latest version.
+        """
+        with self._condition:
+            self._sync()
+            version = self._version
+            for ticket in tickets:
+                version += 1
+                ticket['version'] = version
+            yield version
+            changes = [(ticket['version'], dict(ticket)) for ticket in tickets]
+            if self._change_log is not None:
+                self._change_log.append(changes)
+            self._version = version
+            self._changes.extend(changes)
+            self._condition.notify_all()
+
+    def changes_since(self, since):
+        """
+        Tickets changed after version `since` (latest copy of each),
+        or None if those changes are older than the in-memory buffer
+        """
+        with self._condition:
+            self._sync()
+            if since >= self._version:
+                return []
+            if not self._changes or self._changes[0][0] > since + 1:
+                return None
+            changed = {}
+            for version, ticket in self._changes:
+                if version > since:
+                    changed[ticket.get('ticketId')] = ticket
+            return list(changed.values())
+
+    def wait(self, since, timeout):
+        """Block until there is a change after `since` or the timeout passes"""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                self._sync(throttled=True)
+                if self._version > since:
+                    return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                if self._change_log is None:
+                    self._condition.wait(remaining)
+                else:
+                    self._condition.wait(min(remaining, self.poll_interval))
+
+
+class FileChangeLog:
+    """
+    Shared change log in an append-only NDJSON file. Once it grows past
+    max_bytes it is rewritten with only the latest `keep` entries.
+    """
+
+    def __init__(self, path, keep=1000, max_bytes=4_000_000):
+        self.path = path
+        self.keep = keep
+        self.max_bytes = max_bytes
+        self._read_from = None  # (inode, offset) read up to by read_new
+
+    def append(self, changes):
+        """Add (version, ticket) entries (called holding the tickets lock)"""
+        data = b''.join(serializer.dumps({'version': v, 'ticket': t}) + b'\n' for v, t in changes)
+        with open(self.path, 'ab') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+            size = f.tell()
+        if size > self.max_bytes:
+            self._trim()
+
+    def read_new(self):
+        """Entries appended (by any process) since the last call, oldest first"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return []
+        inode, offset = self._read_from or (None, 0)
+        if inode != stat.st_ino or stat.st_size < offset:
+            offset = 0  # Trimmed (rewritten) since: read it again
+        if stat.st_size == offset:
+            return []
+
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+        # A line still being written is picked up next time
+        complete = data[:data.rfind(b'\n') + 1]
+        self._read_from = (stat.st_ino, offset + len(complete))
+        changes = []
+        for line in complete.splitlines():
+            try:
+                entry = serializer.loads(line)
+            except ValueError:
+                continue  # Torn write from a crash
+            changes.append((entry['version'], entry['ticket']))
+        return changes
+
+    def _trim(self):
+        with open(self.path, 'rb') as f:
+            lines = f.read().splitlines()[-self.keep:]
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(b''.join(line + b'\n' for line in lines))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+
+class SQLiteChangeLog:
+    """Shared change log in Coqui.db (see SQLiteStore.append_ticket_changes)"""
+
+    def __init__(self, store, keep=1000):
+        self._store = store
+        self.keep = keep
+        self._read_to = 0  # Last version read by read_new
+
+    def append(self, changes):
+        """Add (version, ticket) entries (called holding the tickets lock)"""
+        self._store.append_ticket_changes(changes, self.keep)
+
+    def read_new(self):
+        """Entries added (by any process) since the last call, oldest first"""
+        changes = self._store.ticket_changes_after(self._read_to)
+        if changes:
+            self._read_to = changes[-1][0]
+        return changes
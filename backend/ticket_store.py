@@ -0,0 +1,176 @@
+# ============================================
+# COQUI POS - TICKET STORE (HOT / COLD)
+# ============================================
+# Only open tickets are operationally hot, so they are
+# kept in memory indexed by ticketId (ActiveTickets) and
+# are all that tickets.json holds. Once a ticket is
+# closed or voided it moves to a dated archive file
+# (TicketArchive), which open-ticket work never reads.
+# Open tickets can be kept as compact records (pass
+# record=TicketRecord.of, see records.py).
+
+import os
+import threading
+
+import serializer
+
+ARCHIVE_SUFFIX = '.ndjson'
+
+
+class ActiveTickets:
+    """In-memory working set of open tickets indexed by ticketId"""
+
+    def __init__(self, loader, signature, record=None):
+        self._loader = loader
+        self._signature = signature
+        self._record = record  # Turns a stored ticket into what is kept in memory
+        self._lock = threading.RLock()
+        self._tickets = {}
+        self._loaded_signature = None
+
+    def refresh(self):
+        """Reload from storage if it changed since we last saw it"""
+        with self._lock:
+            current = self._signature()
+            if self._loaded_signature is None or current != self._loaded_signature:
+                self._tickets = self._index(self._loader())
+                self._loaded_signature = current
+
+    def tickets(self):
+        """Open tickets, oldest first"""
+        self.refresh()
+        return list(self._tickets.values())
+
+    def get(self, ticket_id):
+        """Look up one open ticket by ID, or None"""
+        self.refresh()
+        return self._tickets.get(ticket_id)
+
+    def with_change(self, *changed):
+        """Open tickets as they will be after storing these tickets"""
+        self.refresh()
+        tickets = dict(self._tickets)
+        for ticket in changed:
+            if ticket.get('status') == 'open':
+                tickets[ticket.get('ticketId')] = ticket
+            else:
+                tickets.pop(ticket.get('ticketId'), None)
+        return list(tickets.values())
+
+    # ----- called after this process writes to storage -----
+
+    def apply(self, *tickets):
+        """Record stored ticket changes (non-open tickets leave the set)"""
+        with self._lock:
+            for ticket in tickets:
+                if ticket.get('status') == 'open':
+                    self._tickets[ticket.get('ticketId')] = self._keep(ticket)
+                else:
+                    self._tickets.pop(ticket.get('ticketId'), None)
+            self._loaded_signature = self._signature()
+
+    def _keep(self, ticket):
+        return self._record(ticket) if self._record else ticket
+
+    def _index(self, tickets):
+        return {t.get('ticketId'): self._keep(t) for t in tickets}
+
+
+class TicketArchive:
+    """Closed and voided tickets, one append-only file per day"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._locations = None  # ticketId -> day file, built on first lookup
+        self._locations_signature = None
+
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+
+    def days(self):
+        """Archived days (YYYY-MM-DD), oldest first"""
+        return sorted(
+            name[:-len(ARCHIVE_SUFFIX)]
+            for name in os.listdir(self.directory)
+            if name.endswith(ARCHIVE_SUFFIX)
+        )
+
+    def day_path(self, day):
+        """Path of one day's archive file"""
+        return os.path.join(self.directory, day + ARCHIVE_SUFFIX)
+
+    def append(self, tickets, day):
+        """Archive tickets under a day (a later copy of a ticket replaces earlier ones)"""
+        if not tickets:
+            return
+        data = b''.join(serializer.dumps(t) + b'\n' for t in tickets)
+        with self._lock:
+            with open(self.day_path(day), 'ab') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            if self._locations is not None:
+                for ticket in tickets:
+                    self._locations[ticket.get('ticketId')] = day
+                self._locations_signature = self.signature()
+
+    def find(self, ticket_id):
+        """Latest archived copy of a ticket, or None"""
+        with self._lock:
+            self._load_locations()
+            day = self._locations.get(ticket_id)
+
+        if day is None:
+            return None
+        found = None
+        for ticket in self._read_day(day):
+            if ticket.get('ticketId') == ticket_id:
+                found = ticket
+        return found
+
+    def iterate(self):
+        """Yield the latest copy of every archived ticket, by archive day"""
+        with self._lock:
+            self._load_locations()
+            locations = dict(self._locations)
+
+        for day in self.days():
+            # Skip copies superseded by a later day's record
+            for ticket in self._read_day(day):
+                if locations.get(ticket.get('ticketId'), day) == day:
+                    yield ticket
+
+    def _load_locations(self):
+        # Rebuild the ticketId -> day map if another process archived tickets
+        signature = self.signature()
+        if self._locations is None or signature != self._locations_signature:
+            self._locations = {}
+            for day in self.days():
+                for ticket in self._read_day(day):
+                    self._locations[ticket.get('ticketId')] = day
+            self._locations_signature = signature
+
+    def signature(self):
+        """Changes whenever a ticket is archived (new day file or an append to any day)"""
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(ARCHIVE_SUFFIX):
+                stat = entry.stat()
+                files.append((entry.name, stat.st_size, stat.st_mtime_ns))
+        return (os.stat(self.directory).st_mtime_ns, tuple(sorted(files)))
+
+    def _read_day(self, day):
+        # Later lines for the same ticket win within a day
+        latest = {}
+        with open(self.day_path(day), 'r') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    try:
+                        ticket = serializer.loads(line)
+                    except ValueError:
+                        continue  # Torn write from a crash
+                    latest.pop(ticket.get('ticketId'), None)
+                    latest[ticket.get('ticketId')] = ticket
+        return latest.values()
@@ -4,6 +4,7 @@
 // Displays kitchen tickets with:
 // - Open / Completed tabs
 // - Live running timer for open tickets
+// - Live ticket updates (long-polls the backend change feed)
 // - Detail view per ticket
 // - Manager-only: individual item sent timestamps
 
@@ -14,6 +15,7 @@ export default function KitchenTickets({ onClose, userRole }) {
   // STATE MANAGEMENT
   // ============================================
   const [tickets, setTickets] = useState([]);
+  const [feedVersion, setFeedVersion] = useState(null); // Last ticket change we've seen
   const [activeTab, setActiveTab] = useState("open"); // 'open' or 'closed'
   const [selectedTicket, setSelectedTicket] = useState(null);
   const [loading, setLoading] = useState(false);
@@ -32,6 +34,7 @@ export default function KitchenTickets({ onClose, userRole }) {
       if (response.ok) {
         const data = await response.json();
         setTickets(data.tickets || []);
+        setFeedVersion(data.version ?? 0);
       }
     } catch (err) {
       console.error("Error fetching tickets:", err);
@@ -44,6 +47,47 @@ export default function KitchenTickets({ onClose, userRole }) {
     fetchTickets();
   }, []);
 
+  // Live updates: wait for changes since the last version we saw and
+  // merge them in, so the list stays current without re-fetching it
+  useEffect(() => {
+    if (feedVersion === null) return;
+    let cancelled = false;
+    const controller = new AbortController();
+
+    const poll = async () => {
+      let since = feedVersion;
+      while (!cancelled) {
+        try {
+          const response = await fetch(
+            `http://localhost:5000/api/tickets/changes?since=${since}&wait=25`,
+            { signal: controller.signal }
+          );
+          if (!response.ok) throw new Error(`HTTP ${response.status}`);
+          const data = await response.json();
+          if (data.tickets.length > 0) {
+            setTickets((prev) => {
+              const changed = new Map(data.tickets.map((t) => [t.ticketId, t]));
+              const merged = prev.map((t) => changed.get(t.ticketId) || t);
+              const known = new Set(prev.map((t) => t.ticketId));
+              return merged.concat(data.tickets.filter((t) => !known.has(t.ticketId)));
+            });
+          }
+          since = data.version;
+        } catch (err) {
+          if (cancelled) return;
+          console.error("Error polling ticket changes:", err);
+          await new Promise((resolve) => setTimeout(resolve, 3000)); // Back off, then retry
+        }
+      }
+    };
+
+    poll();
+    return () => {
+      cancelled = true;
+      controller.abort();
+    };
+  }, [feedVersion]);
+
   // Live timer: re-render every second for open tickets
   useEffect(() => {
     const interval = setInterval(() => {
@@ -2,10 +2,17 @@
 // MENU MANAGER COMPONENT
 // ============================================
 // Manager interface for adding and removing menu items
-// Includes password protection and localStorage persistence
+// Includes password protection; changes are saved to the
+// backend menu catalog, so every register sees them
 
-import { useState, useEffect } from "react";
+import { useState, useEffect, useMemo } from "react";
 import { menuData as initialMenuData, categories } from "../data/menuData";
+import {
+  MENU_API,
+  MENU_UPDATED_EVENT,
+  fetchMenu,
+  groupByCategory
+} from "../data/menuCatalog";
 
 const MANAGER_PASSWORD = "admin123"; // Password for menu management access
 
@@ -16,7 +23,8 @@ export default function MenuManager({ isOpen, onClose }) {
   const [isAuthenticated, setIsAuthenticated] = useState(false);
   const [passwordInput, setPasswordInput] = useState("");
   const [passwordError, setPasswordError] = useState("");
-  const [menuData, setMenuData] = useState(initialMenuData);
+  const [managerPassword, setManagerPassword] = useState(""); // Sent with every menu change
+  const [menuItems, setMenuItems] = useState(() => Object.values(initialMenuData).flat());
   const [selectedCategory, setSelectedCategory] = useState("beverages");
   const [showAddForm, setShowAddForm] = useState(false);
   
@@ -34,18 +42,22 @@ export default function MenuManager({ isOpen, onClose }) {
   });
 
   // ============================================
-  // LOAD MENU FROM LOCALSTORAGE ON MOUNT
+  // LOAD MENU FROM THE BACKEND CATALOG
   // ============================================
-  useEffect(() => {
-    const savedMenu = localStorage.getItem("customMenuData");
-    if (savedMenu) {
-      try {
-        setMenuData(JSON.parse(savedMenu));
-      } catch (e) {
-        console.error("Error loading saved menu:", e);
-      }
+  const loadMenu = async () => {
+    try {
+      const data = await fetchMenu();
+      setMenuItems(data.items);
+    } catch (e) {
+      console.error("Error loading menu:", e);
     }
-  }, []);
+  };
+
+  useEffect(() => {
+    if (isOpen) loadMenu();
+  }, [isOpen]);
+
+  const menuData = useMemo(() => groupByCategory(menuItems), [menuItems]);
 
   // ============================================
   // PASSWORD VERIFICATION
@@ -54,6 +66,7 @@ export default function MenuManager({ isOpen, onClose }) {
     e.preventDefault();
     if (passwordInput === MANAGER_PASSWORD) {
       setIsAuthenticated(true);
+      setManagerPassword(passwordInput);
       setPasswordError("");
       setPasswordInput("");
     } else {
@@ -65,24 +78,41 @@ export default function MenuManager({ isOpen, onClose }) {
   // ============================================
   // MENU ITEM MANAGEMENT
   // ============================================
+
+  // Send a change to the catalog, then refresh this list and the menu panel
+  const saveMenuChange = async (method, url, body = {}) => {
+    try {
+      const response = await fetch(url, {
+        method,
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ ...body, managerPassword })
+      });
+      const data = await response.json();
+      if (data.status !== "success") {
+        alert(`Menu not updated: ${data.message}`);
+        return false;
+      }
+      await loadMenu();
+      window.dispatchEvent(new Event(MENU_UPDATED_EVENT));
+      return true;
+    } catch (e) {
+      console.error("Error saving menu:", e);
+      alert("Could not reach the server. Menu not updated.");
+      return false;
+    }
+  };
   
   // Remove menu item
-  const handleRemoveItem = (category, itemId) => {
+  const handleRemoveItem = async (itemId) => {
     if (!window.confirm("Are you sure you want to remove this item from the menu?")) {
       return;
     }
     
-    const updatedMenuData = {
-      ...menuData,
-      [category]: menuData[category].filter(item => item.id !== itemId)
-    };
-    
-    setMenuData(updatedMenuData);
-    localStorage.setItem("customMenuData", JSON.stringify(updatedMenuData));
+    await saveMenuChange("DELETE", `${MENU_API}/items/${itemId}`);
   };
 
   // Add new menu item
-  const handleAddItem = (e) => {
+  const handleAddItem = async (e) => {
     e.preventDefault();
     
     // Validation
@@ -91,19 +121,8 @@ export default function MenuManager({ isOpen, onClose }) {
       return;
     }
 
-    // Generate unique ID
-    const categoryPrefix = newItem.category.substring(0, 3);
-    const existingIds = menuData[newItem.category].map(item => item.id);
-    let counter = 1;
-    let newId = `${categoryPrefix}-${counter}`;
-    while (existingIds.includes(newId)) {
-      counter++;
-      newId = `${categoryPrefix}-${counter}`;
-    }
-
-    // Create new item object
+    // Create new item object (the catalog assigns its id)
     const itemToAdd = {
-      id: newId,
       name: newItem.name,
       price: parseFloat(newItem.price),
       category: newItem.category,
@@ -116,13 +135,9 @@ export default function MenuManager({ isOpen, onClose }) {
     };
 
     // Add to menu
-    const updatedMenuData = {
-      ...menuData,
-      [newItem.category]: [...menuData[newItem.category], itemToAdd]
-    };
-
-    setMenuData(updatedMenuData);
-    localStorage.setItem("customMenuData", JSON.stringify(updatedMenuData));
+    if (!(await saveMenuChange("POST", `${MENU_API}/items`, itemToAdd))) {
+      return;
+    }
     
     // Reset form
     setNewItem({
@@ -141,13 +156,14 @@ export default function MenuManager({ isOpen, onClose }) {
   };
 
   // Reset menu to original
-  const handleResetMenu = () => {
+  const handleResetMenu = async () => {
     if (!window.confirm("Reset menu to original? This will remove all custom changes.")) {
       return;
     }
-    setMenuData(initialMenuData);
-    localStorage.removeItem("customMenuData");
-    alert("Menu reset to original");
+    const originalItems = Object.values(initialMenuData).flat();
+    if (await saveMenuChange("PUT", MENU_API, { items: originalItems })) {
+      alert("Menu reset to original");
+    }
   };
 
   // ============================================
@@ -157,6 +173,7 @@ export default function MenuManager({ isOpen, onClose }) {
     setIsAuthenticated(false);
     setPasswordInput("");
     setPasswordError("");
+    setManagerPassword("");
     setShowAddForm(false);
     onClose();
   };
@@ -301,7 +318,7 @@ export default function MenuManager({ isOpen, onClose }) {
                     <span className="item-id">{item.id}</span>
                   </div>
                   <button
-                    onClick={() => handleRemoveItem(selectedCategory, item.id)}
+                    onClick={() => handleRemoveItem(item.id)}
                     className="remove-btn"
                   >
                     🗑️ Remove
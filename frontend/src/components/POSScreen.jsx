@@ -7,7 +7,7 @@
 // - Order cart with item management
 // - Payment modal with all payment features
 
-import { useState } from "react";
+import { useState, useEffect } from "react";
 import Header from "./Header";
 import MenuPanel from "./MenuPanel";
 import OrderCart from "./OrderCart";
@@ -19,6 +19,14 @@ import VoidLog from "./VoidLog";
 import MenuManager from "./MenuManager";
 import TicketSelectionModal from "./TicketSelectionModal";
 import { menuData } from "../data/menuData";
+import {
+  MENU_UPDATED_EVENT,
+  applyMenuChanges,
+  fetchMenu
+} from "../data/menuCatalog";
+
+// How often to check the backend for menu edits (ms)
+const MENU_SYNC_INTERVAL = 15000;
 
 export default function POSScreen({
   userRole,
@@ -39,6 +47,54 @@ export default function POSScreen({
   const [currentTicketId, setCurrentTicketId] = useState(null);
   const [showTicketSelection, setShowTicketSelection] = useState(false);
   const [availableTickets, setAvailableTickets] = useState([]);
+  // Bundled menu until the backend catalog arrives
+  const [menuItems, setMenuItems] = useState(() => Object.values(menuData).flat());
+
+  // ============================================
+  // LOAD MENU FROM THE BACKEND CATALOG
+  // ============================================
+  useEffect(() => {
+    let cancelled = false;
+    let version = null;
+    let syncing = false;
+    let pending = false;
+
+    // First call gets the whole menu; later ones only changes since `version`
+    const syncMenu = async () => {
+      if (syncing) {
+        pending = true; // Run again once the current fetch is done
+        return;
+      }
+      syncing = true;
+      try {
+        const data = await fetchMenu(version);
+        if (!cancelled) {
+          setMenuItems((items) => applyMenuChanges(items, data));
+          version = data.version;
+        }
+      } catch (e) {
+        console.error("Error loading menu:", e);
+      } finally {
+        syncing = false;
+      }
+      if (pending && !cancelled) {
+        pending = false;
+        syncMenu();
+      }
+    };
+
+    syncMenu();
+
+    // Pick up Menu Manager edits right away on this terminal, periodically from others
+    window.addEventListener(MENU_UPDATED_EVENT, syncMenu);
+    const interval = setInterval(syncMenu, MENU_SYNC_INTERVAL);
+
+    return () => {
+      cancelled = true;
+      window.removeEventListener(MENU_UPDATED_EVENT, syncMenu);
+      clearInterval(interval);
+    };
+  }, []);
 
   // ============================================
   // ORDER MANAGEMENT FUNCTIONS
@@ -86,14 +142,13 @@ export default function POSScreen({
     }
   };
 
-  // Helper function to enrich ticket items with prices from menuData
+  // Helper function to enrich ticket items with prices (and categories) from the menu catalog
   const enrichTicketItems = (items) => {
     console.log('🔍 Enriching ticket items:', items);
     
-    // Flatten all menu items into a single lookup map
-    const allMenuItems = Object.values(menuData).flat();
+    // Menu items in a single lookup map
     const menuItemsMap = {};
-    allMenuItems.forEach(item => {
+    menuItems.forEach(item => {
       menuItemsMap[item.id] = item;
     });
 
@@ -107,7 +162,7 @@ export default function POSScreen({
         console.log('✅ Found! Price:', menuItem.price);
         return {
           ...item,
-          price: menuItem.price,
+          price: item.price ?? menuItem.price, // Tickets carry the catalog price they were sent at
           category: menuItem.category
         };
       }
@@ -133,10 +188,10 @@ export default function POSScreen({
     
     // If cart is empty, check for open tickets
     try {
-      const response = await fetch("http://localhost:5000/api/tickets");
+      const response = await fetch("http://localhost:5000/api/tickets?status=open");
       if (response.ok) {
         const data = await response.json();
-        const openTickets = data.tickets.filter(t => t.status === "open");
+        const openTickets = data.tickets;
         
         if (openTickets.length === 0) {
           alert("No items in order and no open tickets!");
@@ -324,7 +379,7 @@ export default function POSScreen({
           {/* LEFT SIDE: MENU PANEL */}
           {/* ============================================ */}
           <div className="menu-section">
-            <MenuPanel onAddToOrder={handleAddToOrder} />
+            <MenuPanel menuItems={menuItems} onAddToOrder={handleAddToOrder} />
           </div>
 
           {/* ============================================ */}
@@ -11,6 +11,7 @@
 // - Refund button (requires manager authorization)
 
 import { useState } from "react";
+import { newId } from "../data/ids";
 
 export default function PaymentModal({ 
   orderItems, 
@@ -94,7 +95,7 @@ export default function PaymentModal({
   // Complete Payment
   const completePayment = async (method) => {
     const receipt = {
-      orderId: `ORD-${Date.now()}`,
+      orderId: newId("ORD"),
       items: orderItems,
       subtotal,
       tax,
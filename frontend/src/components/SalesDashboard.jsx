@@ -15,8 +15,8 @@ export default function SalesDashboard({ onClose }) {
   // ============================================
   const [isAuthorized, setIsAuthorized] = useState(false);
   const [managerPassword, setManagerPassword] = useState("");
-  const [viewMode, setViewMode] = useState("day"); // 'day', 'week', 'month'
-  const [selectedWeek, setSelectedWeek] = useState(1); // 1-4
+  const [viewMode, setViewMode] = useState("day"); // 'day', 'week', 'month', 'hours'
+  const [selectedWeek, setSelectedWeek] = useState(1); // 1-5
   const [selectedDay, setSelectedDay] = useState(new Date().getDate()); // 1-31
   const [selectedMonth, setSelectedMonth] = useState(new Date().getMonth() + 1); // 1-12
   const [salesData, setSalesData] = useState(null);
@@ -52,6 +52,8 @@ export default function SalesDashboard({ onClose }) {
         endpoint = `http://localhost:5000/api/sales/week?week=${week}`;
       } else if (mode === "month") {
         endpoint = `http://localhost:5000/api/sales/month?month=${month || selectedMonth}`;
+      } else if (mode === "hours") {
+        endpoint = "http://localhost:5000/api/analytics/heatmap";
       }
       
       const response = await fetch(endpoint);
@@ -168,6 +170,12 @@ export default function SalesDashboard({ onClose }) {
           >
             📊 Monthly
           </button>
+          <button
+            className={`view-mode-btn ${viewMode === "hours" ? "active" : ""}`}
+            onClick={() => handleViewModeChange("hours")}
+          >
+            ⏰ Busy Hours
+          </button>
         </div>
 
         {/* ============================================ */}
@@ -196,7 +204,7 @@ export default function SalesDashboard({ onClose }) {
         {viewMode === "week" && (
           <div className="week-selector">
             <span>Select Week:</span>
-            {[1, 2, 3, 4].map((week) => (
+            {[1, 2, 3, 4, 5].map((week) => (
               <button
                 key={week}
                 className={`week-btn ${selectedWeek === week ? "active" : ""}`}
@@ -381,6 +389,44 @@ export default function SalesDashboard({ onClose }) {
               </div>
             )}
 
+            {/* Busy Hours View (weekday x hour heatmap) */}
+            {viewMode === "hours" && salesData.heatmap && (
+              <div className="sales-summary">
+                <h3>Busy Hours - Orders by Weekday and Hour</h3>
+                <div className="heatmap-wrapper">
+                  <table className="heatmap-table">
+                    <thead>
+                      <tr>
+                        <th></th>
+                        {salesData.heatmap.hours.map((hour) => (
+                          <th key={hour}>{hour}</th>
+                        ))}
+                      </tr>
+                    </thead>
+                    <tbody>
+                      {salesData.heatmap.weekdays.map((weekday, dayIndex) => {
+                        const busiest = Math.max(1, ...salesData.heatmap.orders.flat());
+                        return (
+                          <tr key={weekday}>
+                            <th>{weekday.slice(0, 3)}</th>
+                            {salesData.heatmap.orders[dayIndex].map((orders, hour) => (
+                              <td
+                                key={hour}
+                                style={{ opacity: 0.15 + 0.85 * (orders / busiest) }}
+                                title={`${weekday} ${hour}:00 - ${orders} orders, $${salesData.heatmap.revenue[dayIndex][hour].toFixed(2)}`}
+                              >
+                                {orders || ""}
+                              </td>
+                            ))}
+                          </tr>
+                        );
+                      })}
+                    </tbody>
+                  </table>
+                </div>
+              </div>
+            )}
+
             {/* Popular Items Section */}
             {salesData.popularItems && salesData.popularItems.length > 0 && (
               <div className="popular-items-section">
@@ -0,0 +1,28 @@
+// ============================================
+// IDS — COQUÍ POS
+// ============================================
+// Registers mint their own order IDs, so an order sent
+// again (e.g. after the backend was down) keeps its ID and
+// is not stored twice. Same layout as the backend's IDs
+// (backend/id_generator.py):
+//
+//   PREFIX-<ms since epoch, 13 digits>-<register, 6 hex><sequence, 6 hex>
+//
+// The register part is random per page load, and the
+// sequence counts up, so two registers (or two orders in
+// the same millisecond) don't collide, and IDs sort in the
+// order they were made.
+
+const REGISTER = Array.from(crypto.getRandomValues(new Uint8Array(3)))
+  .map((byte) => byte.toString(16).padStart(2, "0"))
+  .join("");
+
+let sequence = 0;
+let lastMs = 0;
+
+// A new ID starting with prefix (e.g. "ORD")
+export function newId(prefix) {
+  lastMs = Math.max(Date.now(), lastMs);
+  const count = (sequence++ % 0x1000000).toString(16).padStart(6, "0");
+  return `${prefix}-${String(lastMs).padStart(13, "0")}-${REGISTER}${count}`;
+}
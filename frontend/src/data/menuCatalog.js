@@ -0,0 +1,45 @@
+// ============================================
+// MENU CATALOG — COQUÍ POS
+// ============================================
+// The menu is served by the backend (GET /api/menu) so
+// every register shows the same items and prices.
+// Terminals (POSScreen) fetch it once, then only ask for
+// what changed since the catalog version they have. The
+// browser revalidates each request with the ETag it has
+// stored, so an unchanged menu comes back as a bodiless 304.
+
+export const MENU_API = "http://localhost:5000/api/menu";
+
+// Fired on this tab after the Menu Manager saves a change
+export const MENU_UPDATED_EVENT = "menuUpdated";
+
+// Full menu, or only the changes after `since` (a catalog version)
+export async function fetchMenu(since = null) {
+  const url = since === null ? MENU_API : `${MENU_API}?since=${since}`;
+  const response = await fetch(url, { cache: "no-cache" }); // Always send If-None-Match
+  if (!response.ok) throw new Error(`HTTP ${response.status}`);
+  return response.json();
+}
+
+// Items after applying a GET /api/menu response (full menu or delta)
+export function applyMenuChanges(items, data) {
+  if (data.full) return data.items;
+  if (data.items.length === 0 && data.removed.length === 0) return items;
+
+  const changed = new Map(data.items.map((item) => [item.id, item]));
+  const removed = new Set(data.removed);
+  const known = new Set(items.map((item) => item.id));
+  return items
+    .filter((item) => !removed.has(item.id))
+    .map((item) => changed.get(item.id) || item)
+    .concat(data.items.filter((item) => !known.has(item.id)));
+}
+
+// { beverages: [...], appetizers: [...], ... } like menuData
+export function groupByCategory(items) {
+  const grouped = {};
+  items.forEach((item) => {
+    (grouped[item.category] = grouped[item.category] || []).push(item);
+  });
+  return grouped;
+}